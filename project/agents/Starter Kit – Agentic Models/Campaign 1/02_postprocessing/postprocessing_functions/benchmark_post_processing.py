@@ -0,0 +1,330 @@
+"""
+Micro-benchmarks of the post-processing functions on the Campaign 1 fixtures and on synthetic inputs obtained by
+repeating the rows of the fixtures.
+
+Usage:
+    python benchmark_post_processing.py [--path_tables PATH] [--scale 100] [--days 365] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import timeit
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import post_processing_functions as ppf
+
+PATH_TABLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '01_pre_postprocessing',
+                           'input_from_api')
+PATH_LABEL_OBJECT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'label_objects.json')
+PATH_OUTPUT_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '03_post_postprocessing',
+                                'output_json')
+
+
+def _extract_df_from_json_file_reference(path_tables, table_name):
+    """
+    Reference implementation: stdlib json, row dicts and pandas type inference.
+    """
+    with open(os.path.join(path_tables, table_name + '.json')) as f:
+        json_report = json.load(f)
+    df_table = pd.DataFrame.from_dict(json_report['report_table'])
+    if 'date' in df_table.columns:
+        df_table['date'] = pd.to_datetime(df_table['date'])
+    if 'start_date' in df_table.columns:
+        df_table['start_date'] = pd.to_datetime(df_table['start_date'])
+    if 'end_date' in df_table.columns:
+        df_table['end_date'] = pd.to_datetime(df_table['end_date'])
+    return df_table
+
+
+def _extract_df_from_json_file_no_snapshot(path_tables, table_name):
+    pa = ppf.pa
+    ppf.pa = None
+    try:
+        return ppf._extract_df_from_json_file(path_tables, table_name)
+    finally:
+        ppf.pa = pa
+
+
+def _generate_scaled_tables(path_tables, path_dir_output, scale):
+    """
+    Write in path_dir_output the report tables of path_tables with their rows repeated scale times.
+    """
+    for table_name in ppf.REPORT_TABLE_SCHEMA:
+        with open(os.path.join(path_tables, table_name + '.json')) as f:
+            json_report = json.load(f)
+        json_report['report_table'] = json_report['report_table'] * scale
+        with open(os.path.join(path_dir_output, table_name + '.json'), 'w') as f:
+            json.dump(json_report, f)
+
+
+def _time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def benchmark_extract_df_from_json_file(path_tables, repeat):
+    """
+    Time the reference json parsing against the current _extract_df_from_json_file, both without snapshots and
+    reading an existing snapshot (only if pyarrow is installed).
+    """
+    rows = list()
+    for table_name in ppf.REPORT_TABLE_SCHEMA:
+        size_mb = os.path.getsize(os.path.join(path_tables, table_name + '.json')) / 2 ** 20
+        row = {
+            'table': table_name,
+            'size (MB)': round(size_mb, 2),
+            'reference (ms)': _time(lambda: _extract_df_from_json_file_reference(path_tables, table_name), repeat),
+            'typed columns (ms)': _time(lambda: _extract_df_from_json_file_no_snapshot(path_tables, table_name),
+                                        repeat)
+        }
+        if ppf.pa is not None:
+            ppf._extract_df_from_json_file(path_tables, table_name)
+            row['snapshot (ms)'] = _time(lambda: ppf._extract_df_from_json_file(path_tables, table_name), repeat)
+        rows.append(row)
+
+    df = pd.DataFrame(rows).set_index('table')
+    for col in [x for x in df.columns if x.endswith('(ms)')]:
+        df[col] = (df[col] * 1000).round(2)
+    df['speed-up'] = (df['reference (ms)'] / df['typed columns (ms)']).round(1)
+
+    return df
+
+
+def _densify_reference(df, df_scaffolding, index, columns, values):
+    """
+    Reference implementation: left merge on the scaffold, fillna, pivot and fillna.
+    """
+    df = df_scaffolding.merge(df, how='left', on=index + columns)
+    df[values] = df[values].fillna(0)
+    return df.pivot(index=index, columns=columns, values=values).fillna(0)
+
+
+def _peak_allocation(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_densify(path_tables, n_days, repeat):
+    """
+    Time and peak allocation of the reference densification against _densify, on grouped impacts covering 30% of
+    the keys of the scaffolds of the contacts by target and of the daily build-up over n_days.
+    """
+    with open(PATH_LABEL_OBJECT) as f:
+        label_object = json.load(f)
+    with open(os.path.join(path_tables, 'json_request.json')) as f:
+        target_name = [x['name_target'] for x in json.load(f)['target']]
+    target_name = target_name + ['A3+'] if 'A3+' not in target_name else target_name
+    df_date_range = pd.DataFrame(pd.date_range('2024-01-01', periods=n_days).tolist(), columns=['date'])
+
+    cases = {
+        'contacts by target': (['broadcaster', 'device_type', 'ad_type'], ['target_name'], None),
+        f'daily build-up ({n_days} days)': (['target_name', 'broadcaster', 'device_type', 'ad_type'], ['date'],
+                                            df_date_range)
+    }
+
+    rng = np.random.default_rng(0)
+    rows = list()
+    for case, (index, columns, df_range) in cases.items():
+        df_scaffolding = ppf._scaffolding_contacts(columns + index, label_object, target_name=target_name,
+                                                   df_date_range=df_range)
+        df = df_scaffolding.sample(frac=0.3, random_state=0)[index + columns]
+        df['num_impacts'] = rng.random(len(df)) * 1000
+
+        df_reference = _densify_reference(df, df_scaffolding, index, columns, 'num_impacts')
+        pd.testing.assert_frame_equal(df_reference, ppf._densify(df, df_scaffolding, index, columns, 'num_impacts'))
+
+        rows.append({
+            'case': case,
+            'cells': df_reference.size,
+            'reference (ms)': _time(lambda: _densify_reference(df, df_scaffolding, index, columns, 'num_impacts'),
+                                    repeat),
+            'densify (ms)': _time(lambda: ppf._densify(df, df_scaffolding, index, columns, 'num_impacts'), repeat),
+            'reference peak (kB)': _peak_allocation(
+                lambda: _densify_reference(df, df_scaffolding, index, columns, 'num_impacts')) / 1024,
+            'densify peak (kB)': _peak_allocation(
+                lambda: ppf._densify(df, df_scaffolding, index, columns, 'num_impacts')) / 1024
+        })
+
+    df = pd.DataFrame(rows).set_index('case')
+    for col in [x for x in df.columns if x.endswith('(ms)')]:
+        df[col] = (df[col] * 1000).round(2)
+    df['speed-up'] = (df['reference (ms)'] / df['densify (ms)']).round(1)
+    df['allocation reduction (%)'] = (100 * (1 - df['densify peak (kB)'] / df['reference peak (kB)'])).round(1)
+
+    return df.round(1)
+
+
+def _write_dict_reference(df, path_output_json, label_attribute_element, zoom_par):
+    """
+    Reference implementation: row dicts and json.dump with indent=3.
+    """
+    return_dict = dict()
+    return_dict['data'] = df.to_dict(orient='records')
+    return_dict['label_metadata'] = label_attribute_element
+    zoom_par = [0 if x is None else x for x in zoom_par]
+    if sum(zoom_par) == 0:
+        return_dict['zoom'] = None
+    else:
+        return_dict['zoom'] = {'min': zoom_par[0], 'max': zoom_par[1]}
+    with open(path_output_json, 'w') as f:
+        json.dump(return_dict, f, indent=3)
+
+    return path_output_json
+
+
+def benchmark_write_dict(path_dir_output, n_days, repeat):
+    """
+    Time and size of the reference json writing against _write_dict in the "pretty" and "compact" formats, and size
+    of the compact split payload, on the elements of the Campaign 1 outputs and on a synthetic daily build-up of 40
+    series over n_days.
+    """
+    cases = dict()
+    for file_name in sorted(x for x in os.listdir(PATH_OUTPUT_JSON) if x.endswith('.json')):
+        with open(os.path.join(PATH_OUTPUT_JSON, file_name)) as f:
+            json_element = json.load(f)
+        if 'data' not in json_element:
+            continue
+        cases[file_name[:-len('.json')]] = (pd.DataFrame(json_element['data']), json_element['label_metadata'])
+
+    rng = np.random.default_rng(0)
+    df_buildup = pd.DataFrame(rng.random((n_days, 40)).cumsum(axis=0) * 1000,
+                              columns=[f'series {i}' for i in range(40)])
+    df_buildup.insert(0, 'date', pd.date_range('2024-01-01', periods=n_days).strftime('%Y-%m-%d'))
+    cases[f'daily build-up ({n_days} days)'] = (df_buildup, {'series 0': {'color': '#000000'}})
+
+    path_reference = os.path.join(path_dir_output, 'reference.json')
+    path_pretty = os.path.join(path_dir_output, 'pretty.json')
+    path_compact = os.path.join(path_dir_output, 'compact.json')
+    path_split = os.path.join(path_dir_output, 'split.json')
+    rows = list()
+    for case, (df, label_metadata) in cases.items():
+        _write_dict_reference(df, path_reference, label_metadata, (None, None))
+        ppf._write_dict(df, path_pretty, label_metadata, (None, None), {'json_format': 'pretty'})
+        ppf._write_dict(df, path_compact, label_metadata, (None, None), {'json_format': 'compact'})
+        ppf._write_dict(df, path_split, label_metadata, (None, None), {'json_format': 'compact'}, 'split')
+
+        rows.append({
+            'element': case,
+            'rows': len(df),
+            'reference (ms)': _time(lambda: _write_dict_reference(df, path_reference, label_metadata, (None, None)),
+                                    repeat),
+            'pretty (ms)': _time(lambda: ppf._write_dict(df, path_pretty, label_metadata, (None, None),
+                                                         {'json_format': 'pretty'}), repeat),
+            'compact (ms)': _time(lambda: ppf._write_dict(df, path_compact, label_metadata, (None, None),
+                                                          {'json_format': 'compact'}), repeat),
+            'reference (kB)': os.path.getsize(path_reference) / 1024,
+            'compact (kB)': os.path.getsize(path_compact) / 1024,
+            'split (kB)': os.path.getsize(path_split) / 1024
+        })
+
+    df = pd.DataFrame(rows).set_index('element')
+    for col in [x for x in df.columns if x.endswith('(ms)')]:
+        df[col] = (df[col] * 1000).round(2)
+    df['speed-up'] = (df['reference (ms)'] / df['pretty (ms)']).round(1)
+    df['size reduction (%)'] = (100 * (1 - df['compact (kB)'] / df['reference (kB)'])).round(1)
+    df['split size reduction (%)'] = (100 * (1 - df['split (kB)'] / df['reference (kB)'])).round(1)
+
+    return df.round(1)
+
+
+def _write_excel_reference(path_output_excel, dict_to_write):
+    """
+    Reference implementation: to_excel in the in-memory workbook and one number format per sheet set column by column.
+    """
+    with pd.ExcelWriter(path_output_excel, engine='xlsxwriter') as writer:
+        for sheet_name, df in dict_to_write.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+            worksheet = writer.sheets[sheet_name]
+            format_num = writer.book.add_format({'num_format': '0.00'})
+            for col_num, _ in enumerate(df.columns):
+                worksheet.set_column(col_num, col_num, None, format_num)
+
+
+def benchmark_excel_writer(path_dir_output, n_days, repeat):
+    """
+    Time and peak allocation of the reference Excel writing against the constant memory writer, on synthetic
+    Build-up Contacts sheets of 10 targets, 5 types and n_days days for 1 and 4 campaign levels (parent and sg_code
+    children).
+    """
+    rng = np.random.default_rng(0)
+    path_reference = os.path.join(path_dir_output, 'reference.xlsx')
+    path_constant_memory = os.path.join(path_dir_output, 'constant_memory.xlsx')
+    rows = list()
+    for n_levels in [1, 4]:
+        index = pd.MultiIndex.from_product([['overall campaign'] + [f'SG{i}' for i in range(1, n_levels)],
+                                            [f'target {i}' for i in range(10)], [f'type {i}' for i in range(5)],
+                                            pd.date_range('2024-01-01', periods=n_days).strftime('%d-%m-%Y')],
+                                           names=['campaign level', 'target name', 'type', 'date'])
+        df = index.to_frame(index=False)
+        df['trps'] = (rng.random(len(df)) * 100).round(2)
+        df['contacts (000)'] = (rng.random(len(df)) * 1000).round(2)
+        for broadcaster in ['MTV TV', 'Sanoma TV', 'WBD TV']:
+            df[broadcaster] = rng.random(len(df)) > 0.5
+        dict_to_write = {'Build-up Contacts': df}
+
+        rows.append({
+            'rows': len(df),
+            'reference (ms)': _time(lambda: _write_excel_reference(path_reference, dict_to_write), repeat),
+            'constant memory (ms)': _time(lambda: ppf._write_excel_constant_memory(path_constant_memory, [], dict(),
+                                                                                   dict_to_write), repeat),
+            'reference peak (kB)': _peak_allocation(
+                lambda: _write_excel_reference(path_reference, dict_to_write)) / 1024,
+            'constant memory peak (kB)': _peak_allocation(
+                lambda: ppf._write_excel_constant_memory(path_constant_memory, [], dict(), dict_to_write)) / 1024
+        })
+
+    df = pd.DataFrame(rows).set_index('rows')
+    for col in [x for x in df.columns if x.endswith('(ms)')]:
+        df[col] = (df[col] * 1000).round(2)
+    df['speed-up'] = (df['reference (ms)'] / df['constant memory (ms)']).round(1)
+    df['allocation reduction (%)'] = (100 * (1 - df['constant memory peak (kB)'] / df['reference peak (kB)'])).round(1)
+
+    return df.round(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path_tables', default=PATH_TABLES, help='directory of the json files from the API')
+    parser.add_argument('--scale', type=int, default=100, help='row multiplier of the synthetic inputs')
+    parser.add_argument('--days', type=int, default=365, help='days of the synthetic daily build-up')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timings, the minimum is reported')
+    args = parser.parse_args()
+
+    print(f'json backend: {"orjson" if ppf.orjson is not None else "json"}, '
+          f'snapshots: {"pyarrow" if ppf.pa is not None else "disabled"}')
+
+    path_dir_tmp = tempfile.mkdtemp()
+    try:
+        path_fixture = os.path.join(path_dir_tmp, 'fixture')
+        shutil.copytree(args.path_tables, path_fixture)
+        print('\n_extract_df_from_json_file - Campaign 1 fixtures')
+        print(benchmark_extract_df_from_json_file(path_fixture, args.repeat).to_string())
+
+        path_scaled = os.path.join(path_dir_tmp, 'scaled')
+        os.makedirs(path_scaled)
+        _generate_scaled_tables(args.path_tables, path_scaled, args.scale)
+        print(f'\n_extract_df_from_json_file - synthetic inputs ({args.scale}x)')
+        print(benchmark_extract_df_from_json_file(path_scaled, args.repeat).to_string())
+
+        print('\n_densify - scaffold merge, fillna and pivot against reindex and unstack')
+        print(benchmark_densify(args.path_tables, args.days, args.repeat).to_string())
+
+        print('\n_write_dict - row dicts and json.dump against the column encoder')
+        print(benchmark_write_dict(path_dir_tmp, args.days, args.repeat).to_string())
+
+        print('\n_write_excel_constant_memory - in-memory workbook against rows streamed in constant_memory mode')
+        print(benchmark_excel_writer(path_dir_tmp, args.days, args.repeat).to_string())
+    finally:
+        shutil.rmtree(path_dir_tmp)
+
+
+if __name__ == '__main__':
+    main()
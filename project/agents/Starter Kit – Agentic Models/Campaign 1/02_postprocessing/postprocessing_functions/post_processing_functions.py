@@ -1,17 +1,377 @@
+import argparse
+import collections
+import functools
+import graphlib
+import gzip
+import hashlib
+import itertools
 import json
+import multiprocessing
 import os
 import shutil
+import struct
+import threading
+import time
+import tracemalloc
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from operator import methodcaller
 
 import numpy as np
 import pandas as pd
 import sys
 
+try:
+    import ijson
+    if tuple(int(x) for x in ijson.__version__.split('.')[:2]) < (3, 1):
+        # ijson.items(..., use_float=True) requires ijson>=3.1
+        ijson = None
+except ImportError:  # Without ijson the streaming ingest uses an incremental decoder built on the json module
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # Without orjson the json files are decoded with the standard library
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # Without pyarrow the tables are always parsed from the json files
+    pa = None
+
+try:
+    import zstandard
+except ImportError:  # Without zstandard the outputs can only be pre-compressed with gzip
+    zstandard = None
+
+try:
+    import xlsxwriter
+except ImportError:  # Only required to write the Excel files in constant memory mode
+    xlsxwriter = None
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, where the peak RSS is not profiled
+    resource = None
+
 DISNEY_TO_MTV_DATE = '2025-01-01'
 
+# Extension of the columnar snapshot (Arrow IPC) stored next to each json table from the API
+TABLE_SNAPSHOT_EXTENSION = '.arrow'
+
+# Opt-in profiling of the main functions: "1" records wall and CPU time, peak RSS growth, input rows and output bytes
+# of every element, "memory" also traces the Python allocations with tracemalloc (noticeably slower).
+# The JSON report is written in PROFILE_DIR_ENV_VAR, or in the output directory if not set
+PROFILE_ENV_VAR = 'POSTPROCESSING_PROFILE'
+PROFILE_DIR_ENV_VAR = 'POSTPROCESSING_PROFILE_DIR'
+
+# Universe used to compute TRPs and absolute reach, see UniverseIndex
+UNIVERSE_POLICIES = ['first_day', 'last_day', 'mean', 'daily']
+
+# Extension of the directories persisting the state of the build-up tables in incremental mode: the state file
+# BUILDUP_STATE_FILE, the index of the table and its columns in Arrow IPC files, one per run adding dates
+BUILDUP_STATE_EXTENSION = '.buildup'
+BUILDUP_STATE_FILE = 'state.json'
+
+# Days up to the last processed date whose rows from the API are checked at every run of the incremental mode: a
+# restated day among them rebuilds the state, an older restated day needs the state directory to be removed
+BUILDUP_RESTATEMENT_DAYS = 7
+
+# Default bound of the size of the output cache of main_postprocess_request (the least recently used outputs are
+# evicted first) and file of its hit/miss statistics, in the cache directory
+OUTPUT_CACHE_MAX_BYTES = 256 * 2 ** 20
+OUTPUT_CACHE_STATS_FILE = 'cache_stats.json'
+
+# Codecs of the pre-compressed copies of the json files of the elements: extension, default and maximum level.
+# When the outputs are compressed their raw and compressed sizes are listed in OUTPUT_MANIFEST_FILE, in the output
+# directory
+OUTPUT_COMPRESSIONS = {'gzip': ('.gz', 9, 9), 'zstd': ('.zst', 19, 22)}
+OUTPUT_MANIFEST_FILE = 'output_manifest.json'
+
+# Bundle of the json files of the elements, in the output directory: OUTPUT_BUNDLE_MAGIC, the length of the index
+# (4 bytes, little endian), the index (compact json) and the json files of the elements one after the other. The
+# index maps each python_element to its file_name and to the offset (from the end of the index) and length of its
+# json file, see read_bundle_element
+OUTPUT_BUNDLE_FILE = 'elements.bundle'
+OUTPUT_BUNDLE_MAGIC = b'PPBUNDLE'
+OUTPUT_BUNDLE_VERSION = 1
+
+# Cell formats of the Excel files: header and index cells as written by DataFrame.to_excel, numerical columns
+EXCEL_HEADER_FORMAT = {'bold': True, 'align': 'center', 'valign': 'top', 'top': 1, 'right': 1, 'bottom': 1, 'left': 1}
+EXCEL_NUMBER_FORMAT = {'num_format': '0.00'}
+
+# Known column types of the report_table attribute of the json files from the API
+REPORT_TABLE_SCHEMA = {
+    'impacts_by_sex_age': {'date': 'datetime64[ns]', 'broadcaster': 'object', 'device_type': 'object',
+                           'ad_type': 'object', 'sex': 'object', 'age_break': 'object', 'num_impacts': 'float64',
+                           'num_30sec_eq_impacts': 'float64'},
+    'impacts_in_target': {'target_name': 'object', 'date': 'datetime64[ns]', 'broadcaster': 'object',
+                          'device_type': 'object', 'ad_type': 'object', 'num_impacts': 'float64',
+                          'num_30sec_eq_impacts': 'float64'},
+    'r1plus_in_target_buildup': {'target_name': 'object', 'start_date': 'datetime64[ns]',
+                                 'end_date': 'datetime64[ns]', 'broadcaster': 'object', 'ad_type': 'object',
+                                 'reach': 'float64'},
+    'rf_in_target_overall': {'target_name': 'object', 'start_date': 'datetime64[ns]', 'end_date': 'datetime64[ns]',
+                             'broadcaster': 'object', 'ad_type': 'object', 'frequency': 'int64', 'reach': 'float64'},
+    'target_universe': {'date': 'datetime64[ns]', 'target_name': 'object', 'target_universe': 'int64'},
+    'tv_spot_schedule': {'id_spotgate': 'object', 'date': 'datetime64[ns]', 'start_time': 'object',
+                         'end_time': 'object', 'id_channel': 'object', 'num_ad_duration_sec': 'int64'},
+    'universe_by_sex_age': {'date': 'datetime64[ns]', 'sex': 'object', 'age_break': 'object', 'universe': 'int64'}
+}
+
+# Inputs of each intermediate dataframe: builder function -> tables from the API and other builders
+FRAME_DEPENDENCIES = {
+    '_universe_index': ['target_universe', 'universe_by_sex_age'],
+    '_contacts_cube_target': ['impacts_in_target'],
+    '_contacts_cube_sexage': ['impacts_by_sex_age'],
+    '_rf_cube': ['rf_in_target_overall'],
+    'postprocessing_standard_tabcontacts_df_contact_sexage_abs_raw': ['_contacts_cube_sexage'],
+    'postprocessing_standard_tabcontacts_df_contact_sexage_abs_30eq': ['_contacts_cube_sexage'],
+    'postprocessing_standard_tabcontacts_df_contact_sexage_trp_raw': ['_contacts_cube_sexage',
+                                                                      '_universe_index'],
+    'postprocessing_standard_tabcontacts_df_contact_sexage_trp_30eq': ['_contacts_cube_sexage',
+                                                                       '_universe_index'],
+    'postprocessing_standard_tabcontacts_df_contact_target_abs_raw': ['_contacts_cube_target'],
+    'postprocessing_standard_tabcontacts_df_contact_target_abs_30eq': ['_contacts_cube_target'],
+    'postprocessing_standard_tabcontacts_df_contact_target_trp_raw': ['_contacts_cube_target',
+                                                                      '_universe_index'],
+    'postprocessing_standard_tabcontacts_df_contact_target_trp_30eq': ['_contacts_cube_target',
+                                                                       '_universe_index'],
+    'postprocessing_standard_tabcontactsbu_df_contactcum_target_abs': ['impacts_in_target', '_contacts_cube_target'],
+    'postprocessing_standard_tabcontactsbu_df_contactcum_target_trp': ['impacts_in_target', '_contacts_cube_target',
+                                                                       '_universe_index'],
+    'postprocessing_standard_tabcontactsbu_df_contactdaily_target_abs': ['_contacts_cube_target'],
+    'postprocessing_standard_tabcontactsbu_df_contactdaily_target_trp': ['_contacts_cube_target',
+                                                                         '_universe_index'],
+    'postprocessing_standard_tabr1_df_reach_target_abs': ['r1plus_in_target_buildup', '_universe_index'],
+    'postprocessing_standard_tabr1_df_reach_target_perc': ['r1plus_in_target_buildup'],
+    'postprocessing_standard_tabrf_df_reach_target_abs': ['_rf_cube', '_universe_index',
+                                                          '_compute_contacts_abs_target'],
+    'postprocessing_standard_tabrf_df_reach_target_perc': ['_rf_cube', '_universe_index',
+                                                           '_compute_contacts_abs_target'],
+    'postprocessing_standard_tabr1bu_df_reach_target_abs': ['r1plus_in_target_buildup',
+                                                            '_universe_index'],
+    'postprocessing_standard_tabr1bu_df_reach_target_perc': ['r1plus_in_target_buildup',
+                                                             '_universe_index'],
+    'postprocessing_standard_tabsummary_df_contactreach_contact_target_abs_raw': ['impacts_in_target'],
+    'postprocessing_standard_tabsummary_df_contactreach_contact_target_perc_raw': ['impacts_in_target',
+                                                                                  '_universe_index'],
+    'postprocessing_standard_tabsummary_df_contactreach_reach_target_perc': ['_rf_cube'],
+    'postprocessing_standard_tabsummary_df_universe_target_abs': ['_universe_index'],
+    '_compute_contacts_abs_target': ['postprocessing_standard_tabsummary_df_contactreach_contact_target_abs_raw'],
+    '_compute_contact_total_trp_raw': ['impacts_by_sex_age', '_universe_index'],
+    '_compute_contact_total_trp_30eq': ['impacts_by_sex_age', '_universe_index']
+}
+
+# Inputs of each element function of element_config.json: python_function -> tables and builders
+ELEMENT_DEPENDENCIES = {
+    'postprocessing_standard_tabcontacts_table_contact_sexage_abs_raw': [
+        'postprocessing_standard_tabcontacts_df_contact_sexage_abs_raw'],
+    'postprocessing_standard_tabcontacts_plot_contact_sexage_abs_raw': [
+        'postprocessing_standard_tabcontacts_df_contact_sexage_abs_raw'],
+    'postprocessing_standard_tabcontacts_table_contact_sexage_trp_raw': [
+        'postprocessing_standard_tabcontacts_df_contact_sexage_trp_raw', '_compute_contact_total_trp_raw'],
+    'postprocessing_standard_tabcontacts_plot_contact_sexage_trp_raw': [
+        'postprocessing_standard_tabcontacts_df_contact_sexage_trp_raw'],
+    'postprocessing_standard_tabcontacts_table_contact_sexage_abs_30eq': [
+        'postprocessing_standard_tabcontacts_df_contact_sexage_abs_30eq'],
+    'postprocessing_standard_tabcontacts_plot_contact_sexage_abs_30eq': [
+        'postprocessing_standard_tabcontacts_df_contact_sexage_abs_30eq'],
+    'postprocessing_standard_tabcontacts_table_contact_sexage_trp_30eq': [
+        'postprocessing_standard_tabcontacts_df_contact_sexage_trp_30eq', '_compute_contact_total_trp_30eq'],
+    'postprocessing_standard_tabcontacts_plot_contact_sexage_trp_30eq': [
+        'postprocessing_standard_tabcontacts_df_contact_sexage_trp_30eq'],
+    'postprocessing_standard_tabcontacts_table_contact_target_abs_raw': [
+        'postprocessing_standard_tabcontacts_df_contact_target_abs_raw'],
+    'postprocessing_standard_tabcontacts_plot_contact_target_abs_raw': [
+        'postprocessing_standard_tabcontacts_df_contact_target_abs_raw'],
+    'postprocessing_standard_tabcontacts_table_contact_target_trp_raw': [
+        'postprocessing_standard_tabcontacts_df_contact_target_trp_raw'],
+    'postprocessing_standard_tabcontacts_plot_contact_target_trp_raw': [
+        'postprocessing_standard_tabcontacts_df_contact_target_trp_raw'],
+    'postprocessing_standard_tabcontacts_table_contact_target_abs_30eq': [
+        'postprocessing_standard_tabcontacts_df_contact_target_abs_30eq'],
+    'postprocessing_standard_tabcontacts_plot_contact_target_abs_30eq': [
+        'postprocessing_standard_tabcontacts_df_contact_target_abs_30eq'],
+    'postprocessing_standard_tabcontacts_table_contact_target_trp_30eq': [
+        'postprocessing_standard_tabcontacts_df_contact_target_trp_30eq'],
+    'postprocessing_standard_tabcontacts_plot_contact_target_trp_30eq': [
+        'postprocessing_standard_tabcontacts_df_contact_target_trp_30eq'],
+    'postprocessing_standard_tabcontactsbu_table_contactcum_target_abs': [
+        'postprocessing_standard_tabcontactsbu_df_contactcum_target_abs'],
+    'postprocessing_standard_tabcontactsbu_plot_contactcum_target_abs': [
+        'postprocessing_standard_tabcontactsbu_df_contactcum_target_abs'],
+    'postprocessing_standard_tabcontactsbu_table_contactcum_target_trp': [
+        'postprocessing_standard_tabcontactsbu_df_contactcum_target_trp'],
+    'postprocessing_standard_tabcontactsbu_plot_contactcum_target_trp': [
+        'postprocessing_standard_tabcontactsbu_df_contactcum_target_trp'],
+    'postprocessing_standard_tabcontactsbu_table_contactdaily_target_abs': [
+        'postprocessing_standard_tabcontactsbu_df_contactdaily_target_abs'],
+    'postprocessing_standard_tabcontactsbu_plot_contactdaily_target_abs': [
+        'postprocessing_standard_tabcontactsbu_df_contactdaily_target_abs'],
+    'postprocessing_standard_tabcontactsbu_table_contactdaily_target_trp': [
+        'postprocessing_standard_tabcontactsbu_df_contactdaily_target_trp'],
+    'postprocessing_standard_tabcontactsbu_plot_contactdaily_target_trp': [
+        'postprocessing_standard_tabcontactsbu_df_contactdaily_target_trp'],
+    'postprocessing_standard_tabr1_table_reach_target_abs': ['postprocessing_standard_tabr1_df_reach_target_abs'],
+    'postprocessing_standard_tabr1_plot_reach_target_abs': ['postprocessing_standard_tabr1_df_reach_target_abs'],
+    'postprocessing_standard_tabr1_table_reach_target_perc': ['postprocessing_standard_tabr1_df_reach_target_perc'],
+    'postprocessing_standard_tabr1_plot_reach_target_perc': ['postprocessing_standard_tabr1_df_reach_target_perc'],
+    'postprocessing_standard_tabrf_table_reach_target_abs': ['postprocessing_standard_tabrf_df_reach_target_abs'],
+    'postprocessing_standard_tabrf_plot_reach_target_abs': ['postprocessing_standard_tabrf_df_reach_target_abs'],
+    'postprocessing_standard_tabrf_table_reach_target_perc': ['postprocessing_standard_tabrf_df_reach_target_perc'],
+    'postprocessing_standard_tabrf_plot_reach_target_perc': ['postprocessing_standard_tabrf_df_reach_target_perc'],
+    'postprocessing_standard_tabr1bu_table_reach_target_abs': [
+        'postprocessing_standard_tabr1bu_df_reach_target_abs'],
+    'postprocessing_standard_tabr1bu_plot_reach_target_abs': ['postprocessing_standard_tabr1bu_df_reach_target_abs'],
+    'postprocessing_standard_tabr1bu_table_reach_target_perc': [
+        'postprocessing_standard_tabr1bu_df_reach_target_perc'],
+    'postprocessing_standard_tabr1bu_plot_reach_target_perc': [
+        'postprocessing_standard_tabr1bu_df_reach_target_perc'],
+    'postprocessing_standard_tabsummary_table_contactreach_target_abs': [
+        'postprocessing_standard_tabsummary_df_contactreach_contact_target_abs_raw',
+        'postprocessing_standard_tabsummary_df_contactreach_contact_target_perc_raw',
+        'postprocessing_standard_tabsummary_df_contactreach_reach_target_perc', '_universe_index'],
+    'postprocessing_standard_tabsummary_table_contactreach_target_perc': [
+        'postprocessing_standard_tabsummary_df_contactreach_contact_target_abs_raw',
+        'postprocessing_standard_tabsummary_df_contactreach_contact_target_perc_raw',
+        'postprocessing_standard_tabsummary_df_contactreach_reach_target_perc', '_universe_index'],
+    'postprocessing_standard_tabsummary_plot_contact_target_abs': [
+        'postprocessing_standard_tabcontacts_df_contact_target_abs_raw'],
+    'postprocessing_standard_tabsummary_plot_contact_target_perc': [
+        'postprocessing_standard_tabcontacts_df_contact_target_trp_raw'],
+    'postprocessing_standard_tabsummary_plot_contactcum_target_abs': [
+        'postprocessing_standard_tabcontactsbu_df_contactcum_target_abs'],
+    'postprocessing_standard_tabsummary_plot_contactcum_target_perc': [
+        'postprocessing_standard_tabcontactsbu_df_contactcum_target_trp'],
+    'postprocessing_standard_tabsummary_plot_reach1plus_target_abs': [
+        'postprocessing_standard_tabr1_df_reach_target_abs'],
+    'postprocessing_standard_tabsummary_plot_reach1plus_target_perc': [
+        'postprocessing_standard_tabr1_df_reach_target_perc'],
+    'postprocessing_standard_tabsummary_plot_reachfrequency_target_abs': [
+        'postprocessing_standard_tabrf_df_reach_target_abs'],
+    'postprocessing_standard_tabsummary_plot_reachfrequency_target_perc': [
+        'postprocessing_standard_tabrf_df_reach_target_perc'],
+    'postprocessing_standard_tabsummary_table_universe_target_abs': [
+        'postprocessing_standard_tabsummary_df_universe_target_abs']
+}
+
+# Tables which can be aggregated while streaming the json file: table name -> metrics to sum.
+# The remaining columns of the schema are the dimensions of the aggregation
+STREAMING_AGGREGATE_TABLES = {
+    'impacts_by_sex_age': ['num_impacts', 'num_30sec_eq_impacts'],
+    'impacts_in_target': ['num_impacts', 'num_30sec_eq_impacts']
+}
+
+# Dimension columns of the tables from the API converted to ordered Categoricals when the tables are read
+DIMENSION_COLUMNS = ['broadcaster', 'device_type', 'ad_type', 'sex', 'age_break', 'target_name']
+
+# Totals of the dimensions: code of the total -> codes it adds up, None for all the codes of the dimension
+ROLLUP_HIERARCHY = {
+    'broadcaster': {'all': None},
+    'ad_type': {'all': ['linear_static', 'dynamic'], 'all_onlinevideo': None}
+}
+
+# Grouping sets of the contacts of the summary: the totals of all the broadcasters by ad_type and total of ad_type
+SUMMARY_GROUPING_SETS = [
+    {'broadcaster': 'all', 'ad_type': 'linear_static'},
+    {'broadcaster': 'all', 'ad_type': 'dynamic'},
+    {'broadcaster': 'all', 'ad_type': 'all'},
+    {'broadcaster': 'all', 'ad_type': 'all_onlinevideo'}
+]
+
+# Formats of the json files of the elements: "pretty" indents them as json.dump(..., indent=3), "compact" has no
+# whitespace
+JSON_FORMATS = ['pretty', 'compact']
+
+# Schemas of the json files of the elements, chosen by the "payload" attribute of each element of
+# element_config.json: "records" (default) lists the rows as objects, "split" lists the column names and types
+# once and the values of each column as an array, with its version in the file
+PAYLOAD_SCHEMAS = ['records', 'split']
+SPLIT_PAYLOAD_VERSION = 1
+
+# Columns of the scaffolds which are not labels of label_objects.json
+SCAFFOLD_SPECIAL_COLUMNS = ['target_name', 'date', 'start_date', 'end_date', 'frequency']
+
+# Number of scaffolds kept in the cache of the process, the least recently used is evicted first
+SCAFFOLD_CACHE_SIZE = 128
+_scaffold_cache = collections.OrderedDict()
+_scaffold_cache_lock = threading.Lock()
+
+# Numerical sheets of the Excel file and the functions producing them, in the order they are written
+EXCEL_SHEET_BUILDERS = {
+    'Contacts by sex & age': '_excel_contact_sexage',
+    'Contacts': '_excel_contact_target',
+    'Build-up Contacts': '_excel_contact_bu_target',
+    'RCH 1+': '_excel_reach_1plus_target',
+    'Reach & Frequency': '_excel_rf_target',
+    'Build-up RCH 1+': '_excel_reach_bu_1plus_target'
+}
+
+# Inputs of each function producing a numerical sheet of the Excel file: builders of FRAME_DEPENDENCIES
+EXCEL_SHEET_DEPENDENCIES = {
+    '_excel_contact_sexage': ['postprocessing_standard_tabcontacts_df_contact_sexage_abs_raw',
+                              'postprocessing_standard_tabcontacts_df_contact_sexage_trp_raw'],
+    '_excel_contact_target': ['postprocessing_standard_tabcontacts_df_contact_target_abs_raw',
+                              'postprocessing_standard_tabcontacts_df_contact_target_trp_raw'],
+    '_excel_contact_bu_target': ['postprocessing_standard_tabcontactsbu_df_contactdaily_target_abs',
+                                 'postprocessing_standard_tabcontactsbu_df_contactdaily_target_trp'],
+    '_excel_reach_1plus_target': ['postprocessing_standard_tabr1_df_reach_target_abs',
+                                  'postprocessing_standard_tabr1_df_reach_target_perc'],
+    '_excel_rf_target': ['postprocessing_standard_tabrf_df_reach_target_abs',
+                         'postprocessing_standard_tabrf_df_reach_target_perc'],
+    '_excel_reach_bu_1plus_target': ['postprocessing_standard_tabr1bu_df_reach_target_abs',
+                                     'postprocessing_standard_tabr1bu_df_reach_target_perc']
+}
+
+
+def _memoize_frame(builder):
+    """
+    Decorator for the functions building an intermediate dataframe from (path_tables, label_object, campaign_par).
+    The dataframe is computed once per request and stored in campaign_par['frame_store'] under the key
+    (builder name, path_tables), so table and plot elements sharing the same builder do not rebuild it.
+    Each caller gets a deep copy, hence one element modifying its frame cannot corrupt the input of another one.
+    If no frame store is available the builder is simply executed.
+    """
+
+    @functools.wraps(builder)
+    def wrapper(path_tables, label_object, campaign_par):
+        return _get_frame(builder, path_tables, label_object, campaign_par)
+
+    return wrapper
+
+
+def _get_frame(builder, path_tables, label_object, campaign_par, copy=True):
+    """
+    Return the dataframe of the builder from campaign_par['frame_store'], computing it if not yet stored.
+    With copy=False the stored dataframe itself is returned (used to fill the store without copying).
+    """
+    frame_store = campaign_par.get('frame_store')
+    if frame_store is None:
+        return builder(path_tables, label_object, campaign_par)
+
+    key = (builder.__name__, os.path.normpath(path_tables))
+    if key not in frame_store:
+        frame_store[key] = builder(path_tables, label_object, campaign_par)
+
+    return frame_store[key].copy(deep=True) if copy else frame_store[key]
+
+
+def _memoize_shared(builder):
+    """
+    Same as _memoize_frame for the intermediates which are only read by their callers, such as the contacts cubes:
+    every caller gets the stored object itself, so it must never be modified.
+    """
+
+    @functools.wraps(builder)
+    def wrapper(path_tables, label_object, campaign_par):
+        return _get_frame(builder, path_tables, label_object, campaign_par, copy=False)
+
+    return wrapper
+
 # Contancts tab
 ## Sex Age
+@_memoize_frame
 def postprocessing_standard_tabcontacts_df_contact_sexage_abs_raw(path_tables, label_object, campaign_par):
     """
 
@@ -21,27 +381,14 @@ def postprocessing_standard_tabcontacts_df_contact_sexage_abs_raw(path_tables, l
     :return:
     """
 
-    # Read table
-    df_contact_sexage = _extract_df_from_json_file(path_tables, 'impacts_by_sex_age')
-
-    # Group data
-    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'sex', 'age_break']
-
-    if df_contact_sexage.empty:
-        df_contact_sexage[col_to_group + ['num_impacts']] = None
-
-    df_contact_sexage = df_contact_sexage.groupby(col_to_group, as_index=False)['num_impacts'].sum()
-
     # Scaffolding
+    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'sex', 'age_break']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object)
 
-    df_contact_sexage = df_scaffolding.merge(df_contact_sexage, how='left', on=col_to_group)
-    df_contact_sexage['num_impacts'] = df_contact_sexage['num_impacts'].fillna(0)
-
-    # Pivot Table
-    df_contact_sexage = df_contact_sexage.pivot(columns=['sex', 'age_break'],
-                                                index=['broadcaster', 'device_type', 'ad_type'],
-                                                values='num_impacts').fillna(0)
+    # Pivot Table of the contacts cube on the keys of the scaffold
+    df_contact_sexage = _densify_cube(_contacts_cube_sexage(path_tables, label_object, campaign_par), 'num_impacts',
+                                      df_scaffolding, index=['broadcaster', 'device_type', 'ad_type'],
+                                      columns=['sex', 'age_break'])
 
     df_contact_sexage['_total'] = df_contact_sexage.sum(axis=1)
 
@@ -72,27 +419,17 @@ def postprocessing_standard_tabcontacts_df_contact_sexage_abs_raw(path_tables, l
     return df_contact_sexage
 
 
+@_memoize_frame
 def postprocessing_standard_tabcontacts_df_contact_sexage_abs_30eq(path_tables, label_object, campaign_par):
-    df_contact_sexage = _extract_df_from_json_file(path_tables, 'impacts_by_sex_age')
-
-    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'sex', 'age_break']
-
-    if df_contact_sexage.empty:
-        df_contact_sexage[col_to_group + ['num_30sec_eq_impacts']] = None
-
-    # Group data
-    df_contact_sexage = df_contact_sexage.groupby(col_to_group, as_index=False)['num_30sec_eq_impacts'].sum()
-
     # Scaffolding
+    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'sex', 'age_break']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object)
 
-    df_contact_sexage = df_scaffolding.merge(df_contact_sexage, how='left', on=col_to_group)
-    df_contact_sexage['num_30sec_eq_impacts'] = df_contact_sexage['num_30sec_eq_impacts'].fillna(0)
-
-    # Pivot Table
-    df_contact_sexage = df_contact_sexage.pivot(columns=['sex', 'age_break'],
-                                                index=['broadcaster', 'device_type', 'ad_type'],
-                                                values='num_30sec_eq_impacts').fillna(0)
+    # Pivot Table of the contacts cube on the keys of the scaffold
+    df_contact_sexage = _densify_cube(_contacts_cube_sexage(path_tables, label_object, campaign_par),
+                                      'num_30sec_eq_impacts', df_scaffolding,
+                                      index=['broadcaster', 'device_type', 'ad_type'],
+                                      columns=['sex', 'age_break'])
 
     df_contact_sexage['_total'] = df_contact_sexage.sum(axis=1)
 
@@ -123,6 +460,7 @@ def postprocessing_standard_tabcontacts_df_contact_sexage_abs_30eq(path_tables,
     return df_contact_sexage
 
 
+@_memoize_frame
 def postprocessing_standard_tabcontacts_df_contact_sexage_trp_raw(path_tables, label_object, campaign_par):
     """
 
@@ -132,34 +470,18 @@ def postprocessing_standard_tabcontacts_df_contact_sexage_trp_raw(path_tables, l
     :return:
     """
 
-    # Read table
-    df_contact_sexage = _extract_df_from_json_file(path_tables, 'impacts_by_sex_age')
-    df_universe_by_sexage = _extract_df_from_json_file(path_tables, 'universe_by_sex_age')
-    df_universe_by_sexage = df_universe_by_sexage[df_universe_by_sexage['date'] == df_universe_by_sexage['date'].min()]
-
-    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'sex', 'age_break']
-
-    if df_contact_sexage.empty:
-        df_contact_sexage[col_to_group + ['num_impacts']] = None
-
-    # Group data
-    df_contact_sexage = df_contact_sexage.groupby(col_to_group, as_index=False)['num_impacts'].sum()
-
-    # Compute TRPs
-    df_contact_sexage = df_contact_sexage.merge(df_universe_by_sexage.drop(columns=['date']), on=['sex', 'age_break'])
-    df_contact_sexage['num_trp'] = df_contact_sexage['num_impacts'] / df_contact_sexage['universe'] * 100
-    df_contact_sexage = df_contact_sexage.drop(columns=['num_impacts', 'universe'])
-
     # Scaffolding
+    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'sex', 'age_break']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object)
 
-    df_contact_sexage = df_scaffolding.merge(df_contact_sexage, how='left', on=col_to_group)
-    df_contact_sexage['num_trp'] = df_contact_sexage['num_trp'].fillna(0)
+    # Pivot Table of the contacts cube on the keys of the scaffold
+    df_contact_sexage = _densify_cube(_contacts_cube_sexage(path_tables, label_object, campaign_par), 'num_impacts',
+                                      df_scaffolding, index=['broadcaster', 'device_type', 'ad_type'],
+                                      columns=['sex', 'age_break'])
 
-    # Pivot Table
-    df_contact_sexage = df_contact_sexage.pivot(columns=['sex', 'age_break'],
-                                                index=['broadcaster', 'device_type', 'ad_type'],
-                                                values='num_trp').fillna(0)
+    # Compute TRPs
+    universe = _universe_index(path_tables, label_object, campaign_par).universe('sexage')
+    df_contact_sexage = _compute_trp_wide(df_contact_sexage, universe, ['sex', 'age_break'])
 
     df_contact_sexage['_total'] = df_contact_sexage.sum(axis=1)
     df_contact_sexage = df_contact_sexage.reset_index()
@@ -187,35 +509,21 @@ def postprocessing_standard_tabcontacts_df_contact_sexage_trp_raw(path_tables, l
     return df_contact_sexage
 
 
+@_memoize_frame
 def postprocessing_standard_tabcontacts_df_contact_sexage_trp_30eq(path_tables, label_object, campaign_par):
-    # Read table
-    df_contact_sexage = _extract_df_from_json_file(path_tables, 'impacts_by_sex_age')
-    df_universe_by_sexage = _extract_df_from_json_file(path_tables, 'universe_by_sex_age')
-    df_universe_by_sexage = df_universe_by_sexage[df_universe_by_sexage['date'] == df_universe_by_sexage['date'].min()]
-
-    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'sex', 'age_break']
-
-    if df_contact_sexage.empty:
-        df_contact_sexage[col_to_group + ['num_30sec_eq_impacts']] = None
-
-    # Group data
-    df_contact_sexage = df_contact_sexage.groupby(col_to_group, as_index=False)['num_30sec_eq_impacts'].sum()
-
-    # Compute TRPs
-    df_contact_sexage = df_contact_sexage.merge(df_universe_by_sexage.drop(columns=['date']), on=['sex', 'age_break'])
-    df_contact_sexage['num_trp'] = df_contact_sexage['num_30sec_eq_impacts'] / df_contact_sexage['universe'] * 100
-    df_contact_sexage = df_contact_sexage.drop(columns=['num_30sec_eq_impacts', 'universe'])
-
     # Scaffolding
+    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'sex', 'age_break']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object)
 
-    df_contact_sexage = df_scaffolding.merge(df_contact_sexage, how='left', on=col_to_group)
-    df_contact_sexage['num_trp'] = df_contact_sexage['num_trp'].fillna(0)
+    # Pivot Table of the contacts cube on the keys of the scaffold
+    df_contact_sexage = _densify_cube(_contacts_cube_sexage(path_tables, label_object, campaign_par),
+                                      'num_30sec_eq_impacts', df_scaffolding,
+                                      index=['broadcaster', 'device_type', 'ad_type'],
+                                      columns=['sex', 'age_break'])
 
-    # Pivot Table
-    df_contact_sexage = df_contact_sexage.pivot(columns=['sex', 'age_break'],
-                                                index=['broadcaster', 'device_type', 'ad_type'],
-                                                values='num_trp').fillna(0)
+    # Compute TRPs
+    universe = _universe_index(path_tables, label_object, campaign_par).universe('sexage')
+    df_contact_sexage = _compute_trp_wide(df_contact_sexage, universe, ['sex', 'age_break'])
 
     df_contact_sexage['_total'] = df_contact_sexage.sum(axis=1)
     df_contact_sexage = df_contact_sexage.reset_index()
@@ -243,6 +551,7 @@ def postprocessing_standard_tabcontacts_df_contact_sexage_trp_30eq(path_tables,
     return df_contact_sexage
 
 
+@_memoize_frame
 def postprocessing_standard_tabcontacts_df_contact_target_abs_raw(path_tables, label_object, campaign_par):
     """
 
@@ -255,27 +564,14 @@ def postprocessing_standard_tabcontacts_df_contact_target_abs_raw(path_tables, l
     # Read campaign data
     target_list = campaign_par['target_name']
 
-    # Read table
-    df_contact_target = _extract_df_from_json_file(path_tables, 'impacts_in_target')
-
-    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'target_name']
-
-    if df_contact_target.empty:
-        df_contact_target[col_to_group + ['num_impacts']] = None
-
-    # Group data
-    df_contact_target = df_contact_target.groupby(col_to_group, as_index=False)['num_impacts'].sum()
-
     # Scaffolding
+    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'target_name']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object, target_name=target_list)
 
-    df_contact_target = df_scaffolding.merge(df_contact_target, how='left', on=col_to_group)
-    df_contact_target['num_impacts'] = df_contact_target['num_impacts'].fillna(0)
-
-    # Pivot Table
-    df_contact_target = df_contact_target.pivot(columns=['target_name'],
-                                                index=['broadcaster', 'device_type', 'ad_type'],
-                                                values='num_impacts').fillna(0)
+    # Pivot Table of the contacts cube on the keys of the scaffold
+    df_contact_target = _densify_cube(_contacts_cube_target(path_tables, label_object, campaign_par), 'num_impacts',
+                                      df_scaffolding, index=['broadcaster', 'device_type', 'ad_type'],
+                                      columns=['target_name'])
 
     df_contact_target['_total'] = df_contact_target.sum(axis=1)
     df_contact_target = df_contact_target / 1000
@@ -308,31 +604,20 @@ def postprocessing_standard_tabcontacts_df_contact_target_abs_raw(path_tables, l
     return df_contact_target
 
 
+@_memoize_frame
 def postprocessing_standard_tabcontacts_df_contact_target_abs_30eq(path_tables, label_object, campaign_par):
     # Read campaign data
     target_list = campaign_par['target_name']
 
-    # Read table
-    df_contact_target = _extract_df_from_json_file(path_tables, 'impacts_in_target')
-
-    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'target_name']
-
-    if df_contact_target.empty:
-        df_contact_target[col_to_group + ['num_30sec_eq_impacts']] = None
-
-    # Group data
-    df_contact_target = df_contact_target.groupby(col_to_group, as_index=False)['num_30sec_eq_impacts'].sum()
-
     # Scaffolding
+    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'target_name']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object, target_name=target_list)
 
-    df_contact_target = df_scaffolding.merge(df_contact_target, how='left', on=col_to_group)
-    df_contact_target['num_30sec_eq_impacts'] = df_contact_target['num_30sec_eq_impacts'].fillna(0)
-
-    # Pivot Table
-    df_contact_target = df_contact_target.pivot(columns=['target_name'],
-                                                index=['broadcaster', 'device_type', 'ad_type'],
-                                                values='num_30sec_eq_impacts').fillna(0)
+    # Pivot Table of the contacts cube on the keys of the scaffold
+    df_contact_target = _densify_cube(_contacts_cube_target(path_tables, label_object, campaign_par),
+                                      'num_30sec_eq_impacts', df_scaffolding,
+                                      index=['broadcaster', 'device_type', 'ad_type'],
+                                      columns=['target_name'])
 
     df_contact_target['_total'] = df_contact_target.sum(axis=1)
     df_contact_target = df_contact_target / 1000
@@ -365,6 +650,7 @@ def postprocessing_standard_tabcontacts_df_contact_target_abs_30eq(path_tables,
     return df_contact_target
 
 
+@_memoize_frame
 def postprocessing_standard_tabcontacts_df_contact_target_trp_raw(path_tables, label_object, campaign_par):
     """
 
@@ -377,33 +663,18 @@ def postprocessing_standard_tabcontacts_df_contact_target_trp_raw(path_tables, l
     # Read campaign data
     target_list = campaign_par['target_name']
 
-    # Read table
-    df_contact_target = _extract_df_from_json_file(path_tables, 'impacts_in_target')
-    df_universe_by_target = _extract_df_from_json_file(path_tables, 'target_universe')
-    df_universe_by_target = df_universe_by_target[df_universe_by_target['date'] == df_universe_by_target['date'].min()]
-
-    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'target_name']
-
-    if df_contact_target.empty:
-        df_contact_target[col_to_group + ['num_impacts']] = None
-
-    # Group data
-    df_contact_target = df_contact_target.groupby(col_to_group, as_index=False)['num_impacts'].sum()
-
-    df_contact_target = df_contact_target.merge(df_universe_by_target.drop(columns=['date']), on=['target_name'])
-    df_contact_target['num_trp'] = df_contact_target['num_impacts'] / df_contact_target['target_universe'] * 100
-    df_contact_target = df_contact_target.drop(columns=['num_impacts', 'target_universe'])
-
     # Scaffolding
+    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'target_name']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object, target_name=target_list)
 
-    df_contact_target = df_scaffolding.merge(df_contact_target, how='left', on=col_to_group)
-    df_contact_target['num_trp'] = df_contact_target['num_trp'].fillna(0)
+    # Pivot Table of the contacts cube on the keys of the scaffold
+    df_contact_target = _densify_cube(_contacts_cube_target(path_tables, label_object, campaign_par), 'num_impacts',
+                                      df_scaffolding, index=['broadcaster', 'device_type', 'ad_type'],
+                                      columns=['target_name'])
 
-    # Pivot Table
-    df_contact_target = df_contact_target.pivot(columns=['target_name'],
-                                                index=['broadcaster', 'device_type', 'ad_type'],
-                                                values='num_trp').fillna(0)
+    # Compute TRPs
+    universe = _universe_index(path_tables, label_object, campaign_par).universe('target')
+    df_contact_target = _compute_trp_wide(df_contact_target, universe, ['target_name'])
 
     df_contact_target['_total'] = df_contact_target.sum(axis=1)
     df_contact_target = df_contact_target.reset_index()
@@ -435,38 +706,24 @@ def postprocessing_standard_tabcontacts_df_contact_target_trp_raw(path_tables, l
     return df_contact_target
 
 
+@_memoize_frame
 def postprocessing_standard_tabcontacts_df_contact_target_trp_30eq(path_tables, label_object, campaign_par):
     # Read campaign data
     target_list = campaign_par['target_name']
 
-    # Read table
-    df_contact_target = _extract_df_from_json_file(path_tables, 'impacts_in_target')
-    df_universe_by_target = _extract_df_from_json_file(path_tables, 'target_universe')
-    df_universe_by_target = df_universe_by_target[df_universe_by_target['date'] == df_universe_by_target['date'].min()]
-
-    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'target_name']
-
-    if df_contact_target.empty:
-        df_contact_target[col_to_group + ['num_30sec_eq_impacts']] = None
-
-    # Group data
-    df_contact_target = df_contact_target.groupby(col_to_group, as_index=False)['num_30sec_eq_impacts'].sum()
-
-    df_contact_target = df_contact_target.merge(df_universe_by_target.drop(columns=['date']), on=['target_name'])
-    df_contact_target['num_trp'] = df_contact_target['num_30sec_eq_impacts'] / df_contact_target[
-        'target_universe'] * 100
-    df_contact_target = df_contact_target.drop(columns=['num_30sec_eq_impacts', 'target_universe'])
-
     # Scaffolding
+    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'target_name']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object, target_name=target_list)
 
-    df_contact_target = df_scaffolding.merge(df_contact_target, how='left', on=col_to_group)
-    df_contact_target['num_trp'] = df_contact_target['num_trp'].fillna(0)
+    # Pivot Table of the contacts cube on the keys of the scaffold
+    df_contact_target = _densify_cube(_contacts_cube_target(path_tables, label_object, campaign_par),
+                                      'num_30sec_eq_impacts', df_scaffolding,
+                                      index=['broadcaster', 'device_type', 'ad_type'],
+                                      columns=['target_name'])
 
-    # Pivot Table
-    df_contact_target = df_contact_target.pivot(columns=['target_name'],
-                                                index=['broadcaster', 'device_type', 'ad_type'],
-                                                values='num_trp').fillna(0)
+    # Compute TRPs
+    universe = _universe_index(path_tables, label_object, campaign_par).universe('target')
+    df_contact_target = _compute_trp_wide(df_contact_target, universe, ['target_name'])
 
     df_contact_target['_total'] = df_contact_target.sum(axis=1)
     df_contact_target = df_contact_target.reset_index()
@@ -497,6 +754,7 @@ def postprocessing_standard_tabcontacts_df_contact_target_trp_30eq(path_tables,
     return df_contact_target
 
 
+@_memoize_frame
 def postprocessing_standard_tabcontactsbu_df_contactcum_target_abs(path_tables, label_object, campaign_par):
     """
 
@@ -510,35 +768,24 @@ def postprocessing_standard_tabcontactsbu_df_contactcum_target_abs(path_tables,
     target_list = campaign_par['target_name']
     df_date_range = campaign_par['df_date_range']
 
-    # Read table
-    df_contact_target_bu = _extract_df_from_json_file(path_tables, 'impacts_in_target')
-
-    col_to_group = ['date', 'broadcaster', 'device_type', 'ad_type', 'target_name']
-
-    if df_contact_target_bu.empty:
-        df_contact_target_bu[col_to_group + ['num_impacts']] = None
-
-    # Group data
-    df_contact_target_bu = df_contact_target_bu.groupby(col_to_group, as_index=False)['num_impacts'].sum()
-
     # Scaffolding
+    col_to_group = ['date', 'broadcaster', 'device_type', 'ad_type', 'target_name']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object, target_name=target_list,
                                            df_date_range=df_date_range)
 
-    df_contact_target_bu = df_scaffolding.merge(df_contact_target_bu, how='left', on=col_to_group)
-    df_contact_target_bu['num_impacts'] = df_contact_target_bu['num_impacts'].fillna(0)
+    # Read table
+    df_contact_target_bu = _read_table(path_tables, 'impacts_in_target', campaign_par)
 
-    # Compute cumulative
-    col_to_sort = ['date', 'broadcaster', 'device_type', 'ad_type', 'target_name']
-    df_contact_target_bu = df_contact_target_bu.sort_values(col_to_sort)
-    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'target_name']
-    df_contact_target_bu['num_impacts'] = df_contact_target_bu.groupby(col_to_group, as_index=False)[
-        'num_impacts'].cumsum()
+    # Pivot Table of the contacts cube on the keys of the scaffold, cumulated over the dates (in incremental mode only
+    # the dates after the previous run are densified)
+    def densify_dates(df_scaffolding_dates):
+        return _densify_cube(_contacts_cube_target(path_tables, label_object, campaign_par), 'num_impacts',
+                             df_scaffolding_dates, index=['target_name', 'broadcaster', 'device_type', 'ad_type'],
+                             columns=['date'])
 
-    # Pivot Table
-    df_contact_target_bu = df_contact_target_bu.pivot(columns=['date'],
-                                                      index=['target_name', 'broadcaster', 'device_type', 'ad_type'],
-                                                      values='num_impacts').fillna(0)
+    df_contact_target_bu = _buildup_incremental('postprocessing_standard_tabcontactsbu_df_contactcum_target_abs',
+                                                path_tables, campaign_par, df_scaffolding, 'date', densify_dates,
+                                                df_contact_target_bu, cumulative=True)
 
     df_contact_target_bu = df_contact_target_bu / 1000
 
@@ -570,9 +817,10 @@ def postprocessing_standard_tabcontactsbu_df_contactcum_target_abs(path_tables,
     return df_contact_target_bu
 
 
+@_memoize_frame
 def postprocessing_standard_tabcontactsbu_df_contactcum_target_trp(path_tables, label_object, campaign_par):
     """
-    # DUBBIO! Usare sempre universo primo giorno?
+    TRPs on the universe of the targets chosen by campaign_par['universe_policy'], see UniverseIndex.
 
     :param str path_tables: path of the directory which the json files are stored
     :param label_object:
@@ -584,42 +832,30 @@ def postprocessing_standard_tabcontactsbu_df_contactcum_target_trp(path_tables,
     target_list = campaign_par['target_name']
     df_date_range = campaign_par['df_date_range']
 
-    # Read table
-    df_contact_target_bu = _extract_df_from_json_file(path_tables, 'impacts_in_target')
-    df_universe_by_target = _extract_df_from_json_file(path_tables, 'target_universe')
-    df_universe_by_target = df_universe_by_target[df_universe_by_target['date'] == df_universe_by_target['date'].min()]
-
-    col_to_group = ['date', 'broadcaster', 'device_type', 'ad_type', 'target_name']
-
-    if df_contact_target_bu.empty:
-        df_contact_target_bu[col_to_group + ['num_impacts']] = None
-
-    # Group data
-    df_contact_target_bu = df_contact_target_bu.groupby(col_to_group, as_index=False)['num_impacts'].sum()
-
-    df_contact_target_bu = df_contact_target_bu.merge(df_universe_by_target.drop(columns=['date']), on=['target_name'])
-    df_contact_target_bu['num_trp'] = df_contact_target_bu['num_impacts'] / df_contact_target_bu[
-        'target_universe'] * 100
-    df_contact_target_bu = df_contact_target_bu.drop(columns=['num_impacts', 'target_universe'])
-
     # Scaffolding
+    col_to_group = ['date', 'broadcaster', 'device_type', 'ad_type', 'target_name']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object, target_name=target_list,
                                            df_date_range=df_date_range)
 
-    df_contact_target_bu = df_scaffolding.merge(df_contact_target_bu, how='left', on=col_to_group)
-    df_contact_target_bu['num_trp'] = df_contact_target_bu['num_trp'].fillna(0)
+    # Read table
+    df_contact_target_bu = _read_table(path_tables, 'impacts_in_target', campaign_par)
 
-    # Compute cumulative
-    col_to_sort = ['date', 'broadcaster', 'device_type', 'ad_type', 'target_name']
-    df_contact_target_bu = df_contact_target_bu.sort_values(col_to_sort)
-    col_to_group = ['broadcaster', 'device_type', 'ad_type', 'target_name']
-    df_contact_target_bu['num_trp'] = df_contact_target_bu.groupby(col_to_group, as_index=False)[
-        'num_trp'].cumsum()
+    # Pivot Table of the contacts cube on the keys of the scaffold, TRPs cumulated over the dates (in incremental mode
+    # only the dates after the previous run are densified)
+    universe_index = _universe_index(path_tables, label_object, campaign_par)
 
-    # Pivot Table
-    df_contact_target_bu = df_contact_target_bu.pivot(columns=['date'],
-                                                      index=['target_name', 'broadcaster', 'device_type', 'ad_type'],
-                                                      values='num_trp').fillna(0)
+    def densify_dates(df_scaffolding_dates):
+        df_contact_target_dates = _densify_cube(_contacts_cube_target(path_tables, label_object, campaign_par),
+                                                'num_impacts', df_scaffolding_dates,
+                                                index=['target_name', 'broadcaster', 'device_type', 'ad_type'],
+                                                columns=['date'])
+        return _compute_trp_wide(df_contact_target_dates,
+                                 universe_index.by_date('target', df_contact_target_dates.columns), ['target_name'])
+
+    df_contact_target_bu = _buildup_incremental('postprocessing_standard_tabcontactsbu_df_contactcum_target_trp',
+                                                path_tables, campaign_par, df_scaffolding, 'date', densify_dates,
+                                                df_contact_target_bu, cumulative=True,
+                                                fingerprint=universe_index.fingerprint('target'))
 
     df_contact_target_bu['_total'] = df_contact_target_bu.sum(axis=1)
     df_contact_target_bu = df_contact_target_bu.reset_index()
@@ -654,6 +890,7 @@ def postprocessing_standard_tabcontactsbu_df_contactcum_target_trp(path_tables,
     return df_contact_target_bu
 
 
+@_memoize_frame
 def postprocessing_standard_tabcontactsbu_df_contactdaily_target_abs(path_tables, label_object, campaign_par):
     """
 
@@ -667,28 +904,15 @@ def postprocessing_standard_tabcontactsbu_df_contactdaily_target_abs(path_tables
     target_list = campaign_par['target_name']
     df_date_range = campaign_par['df_date_range']
 
-    # Read table
-    df_contact_target_bu = _extract_df_from_json_file(path_tables, 'impacts_in_target')
-
-    col_to_group = ['date', 'broadcaster', 'device_type', 'ad_type', 'target_name']
-
-    if df_contact_target_bu.empty:
-        df_contact_target_bu[col_to_group + ['num_impacts']] = None
-
-    # Group data
-    df_contact_target_bu = df_contact_target_bu.groupby(col_to_group, as_index=False)['num_impacts'].sum()
-
     # Scaffolding
+    col_to_group = ['date', 'broadcaster', 'device_type', 'ad_type', 'target_name']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object, target_name=target_list,
                                            df_date_range=df_date_range)
 
-    df_contact_target_bu = df_scaffolding.merge(df_contact_target_bu, how='left', on=col_to_group)
-    df_contact_target_bu['num_impacts'] = df_contact_target_bu['num_impacts'].fillna(0)
-
-    # Pivot Table
-    df_contact_target_bu = df_contact_target_bu.pivot(columns=['date'],
-                                                      index=['target_name', 'broadcaster', 'device_type', 'ad_type'],
-                                                      values='num_impacts').fillna(0)
+    # Pivot Table of the contacts cube on the keys of the scaffold
+    df_contact_target_bu = _densify_cube(_contacts_cube_target(path_tables, label_object, campaign_par), 'num_impacts',
+                                         df_scaffolding, index=['target_name', 'broadcaster', 'device_type', 'ad_type'],
+                                         columns=['date'])
 
     df_contact_target_bu = df_contact_target_bu / 1000
 
@@ -720,6 +944,7 @@ def postprocessing_standard_tabcontactsbu_df_contactdaily_target_abs(path_tables
     return df_contact_target_bu
 
 
+@_memoize_frame
 def postprocessing_standard_tabcontactsbu_df_contactdaily_target_trp(path_tables, label_object, campaign_par):
     """
 
@@ -733,35 +958,19 @@ def postprocessing_standard_tabcontactsbu_df_contactdaily_target_trp(path_tables
     target_list = campaign_par['target_name']
     df_date_range = campaign_par['df_date_range']
 
-    # Read table
-    df_contact_target_bu = _extract_df_from_json_file(path_tables, 'impacts_in_target')
-    df_universe_by_target = _extract_df_from_json_file(path_tables, 'target_universe')
-    df_universe_by_target = df_universe_by_target[df_universe_by_target['date'] == df_universe_by_target['date'].min()]
-
-    col_to_group = ['date', 'broadcaster', 'device_type', 'ad_type', 'target_name']
-
-    if df_contact_target_bu.empty:
-        df_contact_target_bu[col_to_group + ['num_impacts']] = None
-
-    # Group data
-    df_contact_target_bu = df_contact_target_bu.groupby(col_to_group, as_index=False)['num_impacts'].sum()
-
-    df_contact_target_bu = df_contact_target_bu.merge(df_universe_by_target.drop(columns=['date']), on=['target_name'])
-    df_contact_target_bu['num_trp'] = df_contact_target_bu['num_impacts'] / df_contact_target_bu[
-        'target_universe'] * 100
-    df_contact_target_bu = df_contact_target_bu.drop(columns=['num_impacts', 'target_universe'])
-
     # Scaffolding
+    col_to_group = ['date', 'broadcaster', 'device_type', 'ad_type', 'target_name']
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object, target_name=target_list,
                                            df_date_range=df_date_range)
 
-    df_contact_target_bu = df_scaffolding.merge(df_contact_target_bu, how='left', on=col_to_group)
-    df_contact_target_bu['num_trp'] = df_contact_target_bu['num_trp'].fillna(0)
+    # Pivot Table of the contacts cube on the keys of the scaffold
+    df_contact_target_bu = _densify_cube(_contacts_cube_target(path_tables, label_object, campaign_par), 'num_impacts',
+                                         df_scaffolding, index=['target_name', 'broadcaster', 'device_type', 'ad_type'],
+                                         columns=['date'])
 
-    # Pivot Table
-    df_contact_target_bu = df_contact_target_bu.pivot(columns=['date'],
-                                                      index=['target_name', 'broadcaster', 'device_type', 'ad_type'],
-                                                      values='num_trp').fillna(0)
+    # Compute TRPs
+    universe = _universe_index(path_tables, label_object, campaign_par).by_date('target', df_contact_target_bu.columns)
+    df_contact_target_bu = _compute_trp_wide(df_contact_target_bu, universe, ['target_name'])
 
     df_contact_target_bu['_total'] = df_contact_target_bu.sum(axis=1)
     df_contact_target_bu = df_contact_target_bu.reset_index()
@@ -791,9 +1000,10 @@ def postprocessing_standard_tabcontactsbu_df_contactdaily_target_trp(path_tables
     return df_contact_target_bu
 
 
+@_memoize_frame
 def postprocessing_standard_tabr1_df_reach_target_abs(path_tables, label_object, campaign_par):
     """
-    Usare universo target primo giorno?
+    Universe of the targets chosen by campaign_par['universe_policy'], see UniverseIndex.
     :param path_tables:
     :param label_object:
     :param campaign_par:
@@ -805,13 +1015,14 @@ def postprocessing_standard_tabr1_df_reach_target_abs(path_tables, label_object,
     max_freq = campaign_par["max_freq"]
 
     # Read table
-    df_reach_target = _extract_df_from_json_file(path_tables, 'r1plus_in_target_buildup')
+    df_reach_target = _read_table(path_tables, 'r1plus_in_target_buildup', campaign_par)
     df_reach_target = df_reach_target[df_reach_target["end_date"] == df_reach_target["end_date"].max()]
-    df_universe_by_target = _extract_df_from_json_file(path_tables, 'target_universe')
-    df_universe_by_target = df_universe_by_target[df_universe_by_target['date'] == df_universe_by_target['date'].min()]
-    df_reach_target = df_reach_target.merge(df_universe_by_target, on='target_name')
-    df_reach_target['reach'] = df_reach_target['reach'] * df_reach_target['target_universe'] / 1000
-    df_reach_target = df_reach_target.drop(columns=['target_universe', 'date'])
+    universe_index = _universe_index(path_tables, label_object, campaign_par)
+    df_reach_target = df_reach_target.assign(universe=universe_index.lookup('target', [df_reach_target['target_name']],
+                                                                            df_reach_target['end_date']))
+    df_reach_target = df_reach_target.dropna(subset=['universe'])
+    df_reach_target['reach'] = df_reach_target['reach'] * df_reach_target['universe'] / 1000
+    df_reach_target = df_reach_target.drop(columns=['universe'])
 
     # Scaffolding
     col_to_group = ['target_name', 'broadcaster', 'ad_type']
@@ -851,9 +1062,9 @@ def postprocessing_standard_tabr1_df_reach_target_abs(path_tables, label_object,
     return df_reach_target
 
 
+@_memoize_frame
 def postprocessing_standard_tabr1_df_reach_target_perc(path_tables, label_object, campaign_par):
     """
-    Usare universo target primo giorno?
     :param path_tables:
     :param label_object:
     :param campaign_par:
@@ -865,7 +1076,7 @@ def postprocessing_standard_tabr1_df_reach_target_perc(path_tables, label_object
     max_freq = campaign_par["max_freq"]
 
     # Read table
-    df_reach_target = _extract_df_from_json_file(path_tables, 'r1plus_in_target_buildup')
+    df_reach_target = _read_table(path_tables, 'r1plus_in_target_buildup', campaign_par)
     df_reach_target = df_reach_target[df_reach_target["end_date"] == df_reach_target["end_date"].max()]
 
     df_reach_target['reach'] = df_reach_target['reach'] * 100
@@ -908,9 +1119,10 @@ def postprocessing_standard_tabr1_df_reach_target_perc(path_tables, label_object
     return df_reach_target
 
 
+@_memoize_frame
 def postprocessing_standard_tabrf_df_reach_target_abs(path_tables, label_object, campaign_par):
     """
-    Usare universo target primo giorno?
+    Universe of the targets chosen by campaign_par['universe_policy'], see UniverseIndex.
     :param path_tables:
     :param label_object:
     :param campaign_par:
@@ -920,38 +1132,21 @@ def postprocessing_standard_tabrf_df_reach_target_abs(path_tables, label_object,
     target_list = campaign_par['target_name']
     max_freq = campaign_par["max_freq"]
 
-    # Read table
-    df_reach_target = _extract_df_from_json_file(path_tables, 'rf_in_target_overall')
-    df_universe_by_target = _extract_df_from_json_file(path_tables, 'target_universe')
-    df_universe_by_target = df_universe_by_target[df_universe_by_target['date'] == df_universe_by_target['date'].min()]
-
-    # Calculate absolute reach by target
-    df_reach_target = df_reach_target.merge(df_universe_by_target, on='target_name')
-    df_reach_target['reach'] = df_reach_target['reach'] * df_reach_target['target_universe']
-    df_reach_target = df_reach_target.drop(columns=['target_universe', 'date'])
-
-    # Group data
-    df_reach_target = df_reach_target[df_reach_target["frequency"] > 0]
-    df_reach_target = df_reach_target.drop(columns=["start_date", "end_date"])
+    # Calculate absolute reach by target: rf cube scaled by the universe of each target, the targets without
+    # universe are 0
+    rf_cube = _rf_cube(path_tables, label_object, campaign_par)
+    universe = _universe_index(path_tables, label_object, campaign_par).universe('target')
+    rf = _rf_kernel(rf_cube, scale=universe.reindex(rf_cube['axes']['target_name']).fillna(0).to_numpy())
 
     # Scaffolding
     col_to_join = ['target_name', 'broadcaster', 'ad_type', 'frequency']
     df_scaffolding = _scaffolding_rf(col_to_join, label_object, target_name=target_list, max_freq=max_freq)
     df_scaffolding = df_scaffolding[df_scaffolding["frequency"] > 0]
-    df_reach_target = df_scaffolding.merge(df_reach_target, how='left', on=col_to_join)
-    df_reach_target['reach'] = df_reach_target['reach'].fillna(0)
-
-    # Cumsum
-    col_to_sort = ['target_name', 'broadcaster', 'ad_type', 'frequency']
-    df_reach_target = df_reach_target.sort_values(col_to_sort, ascending=[True, True, True, False])
-    col_to_group = ['target_name', 'broadcaster', 'ad_type']
-    df_reach_target['reach'] = df_reach_target.groupby(col_to_group, as_index=False)['reach'].cumsum()
-
-    # Pivot Table
-    df_reach_target['frequency'] = df_reach_target['frequency'].astype(str)
-    df_reach_target = df_reach_target.pivot(index=['target_name', 'broadcaster', 'ad_type'],
-                                            columns=['frequency'],
-                                            values='reach').fillna(0)
+    # Pivot Table of the reach N+ on the keys of the scaffold
+    df_reach_target = _densify_cube(rf, 'reach_plus', df_scaffolding, index=['target_name', 'broadcaster', 'ad_type'],
+                                    columns=['frequency'])
+    df_reach_target.columns = df_reach_target.columns.astype(str)
+    df_reach_target = df_reach_target[sorted(df_reach_target.columns)]
 
     df_reach_target['_total'] = df_reach_target.sum(axis=1)
     df_reach_target = df_reach_target.reset_index()
@@ -995,9 +1190,10 @@ def postprocessing_standard_tabrf_df_reach_target_abs(path_tables, label_object,
     return df_reach_target
 
 
+@_memoize_frame
 def postprocessing_standard_tabrf_df_reach_target_perc(path_tables, label_object, campaign_par):
     """
-    Usare universo target primo giorno?
+    Universe of the targets chosen by campaign_par['universe_policy'], see UniverseIndex.
     :param path_tables:
     :param label_object:
     :param campaign_par:
@@ -1007,31 +1203,18 @@ def postprocessing_standard_tabrf_df_reach_target_perc(path_tables, label_object
     target_list = campaign_par['target_name']
     max_freq = campaign_par["max_freq"]
 
-    # Read table
-    df_reach_target = _extract_df_from_json_file(path_tables, 'rf_in_target_overall')
-
-    # Group data
-    df_reach_target = df_reach_target[df_reach_target["frequency"] > 0]
-    df_reach_target = df_reach_target.drop(columns=["start_date", "end_date"])
+    # Reach N+ from the rf cube
+    rf = _rf_kernel(_rf_cube(path_tables, label_object, campaign_par))
 
     # Scaffolding
     col_to_join = ['target_name', 'broadcaster', 'ad_type', 'frequency']
     df_scaffolding = _scaffolding_rf(col_to_join, label_object, target_name=target_list, max_freq=max_freq)
     df_scaffolding = df_scaffolding[df_scaffolding["frequency"] > 0]
-    df_reach_target = df_scaffolding.merge(df_reach_target, how='left', on=col_to_join)
-    df_reach_target['reach'] = df_reach_target['reach'].fillna(0)
-
-    # Cumsum
-    col_to_sort = ['target_name', 'broadcaster', 'ad_type', 'frequency']
-    df_reach_target = df_reach_target.sort_values(col_to_sort, ascending=[True, True, True, False])
-    col_to_group = ['target_name', 'broadcaster', 'ad_type']
-    df_reach_target['reach'] = df_reach_target.groupby(col_to_group, as_index=False)['reach'].cumsum()
-
-    # Pivot Table
-    df_reach_target['frequency'] = df_reach_target['frequency'].astype(str)
-    df_reach_target = df_reach_target.pivot(index=['target_name', 'broadcaster', 'ad_type'],
-                                            columns=['frequency'],
-                                            values='reach').fillna(0)
+    # Pivot Table of the reach N+ on the keys of the scaffold
+    df_reach_target = _densify_cube(rf, 'reach_plus', df_scaffolding, index=['target_name', 'broadcaster', 'ad_type'],
+                                    columns=['frequency'])
+    df_reach_target.columns = df_reach_target.columns.astype(str)
+    df_reach_target = df_reach_target[sorted(df_reach_target.columns)]
 
     df_reach_target['_total'] = df_reach_target.sum(axis=1)
     df_reach_target = df_reach_target.reset_index()
@@ -1054,8 +1237,7 @@ def postprocessing_standard_tabrf_df_reach_target_perc(path_tables, label_object
     df_contacts_abs = _compute_contacts_abs_target(path_tables, label_object, campaign_par)
 
     # Universe by target
-    df_universe = _extract_df_from_json_file(path_tables, 'target_universe')
-    df_universe = df_universe[['target_name', 'target_universe']].drop_duplicates()
+    df_universe = _universe_index(path_tables, label_object, campaign_par).universe('target').reset_index()
     df_universe = df_universe.rename(columns={'target_name': 'Target name',
                                               'target_universe': 'Target universe'})
 
@@ -1085,9 +1267,10 @@ def postprocessing_standard_tabrf_df_reach_target_perc(path_tables, label_object
     return df_reach_target
 
 
+@_memoize_frame
 def postprocessing_standard_tabr1bu_df_reach_target_abs(path_tables, label_object, campaign_par):
     """
-    Usare universo target primo giorno?
+    Universe of the targets chosen by campaign_par['universe_policy'], see UniverseIndex.
     :param path_tables:
     :param label_object:
     :param campaign_par:
@@ -1098,25 +1281,28 @@ def postprocessing_standard_tabr1bu_df_reach_target_abs(path_tables, label_objec
     df_period_range = campaign_par['df_period_range']
 
     # Read table
-    df_reach_target = _extract_df_from_json_file(path_tables, 'r1plus_in_target_buildup')
-
-    df_universe_by_target = _extract_df_from_json_file(path_tables, 'target_universe')
-    df_universe_by_target = df_universe_by_target[df_universe_by_target['date'] == df_universe_by_target['date'].min()]
-    df_reach_target = df_reach_target.merge(df_universe_by_target, on='target_name')
-    df_reach_target['reach'] = df_reach_target['reach'] * df_reach_target['target_universe'] / 1000
-    df_reach_target = df_reach_target.drop(columns=['target_universe', 'date'])
+    df_reach_target = _read_table(path_tables, 'r1plus_in_target_buildup', campaign_par)
+    universe_index = _universe_index(path_tables, label_object, campaign_par)
 
     # Scaffolding
     col_to_group = ['target_name', 'end_date', 'broadcaster', 'ad_type']
     df_scaffolding = _scaffolding_rf(col_to_group, label_object, target_name=target_list,
                                      df_period_range=df_period_range)
-    df_reach_target = df_scaffolding.merge(df_reach_target, how='left', on=col_to_group)
-    df_reach_target['reach'] = df_reach_target['reach'].fillna(0)
 
-    # Pivot Table
-    df_reach_target = df_reach_target.pivot(index=['target_name', 'broadcaster', 'ad_type'],
-                                            columns=['end_date'],
-                                            values='reach').fillna(0)
+    # Pivot Table on the keys of the scaffold (in incremental mode only the end dates after the previous run are
+    # densified)
+    def densify_dates(df_scaffolding_dates):
+        df_reach_dates = df_reach_target[df_reach_target['end_date'] >= df_scaffolding_dates['end_date'].min()]
+        df_reach_dates = df_reach_dates.assign(universe=universe_index.lookup(
+            'target', [df_reach_dates['target_name']], df_reach_dates['end_date'])).dropna(subset=['universe'])
+        df_reach_dates['reach'] = df_reach_dates['reach'] * df_reach_dates['universe'] / 1000
+        df_reach_dates = df_reach_dates.drop(columns=['universe'])
+        return _densify(df_reach_dates, df_scaffolding_dates, index=['target_name', 'broadcaster', 'ad_type'],
+                        columns=['end_date'], values='reach')
+
+    df_reach_target = _buildup_incremental('postprocessing_standard_tabr1bu_df_reach_target_abs', path_tables,
+                                           campaign_par, df_scaffolding, 'end_date', densify_dates, df_reach_target,
+                                           fingerprint=universe_index.fingerprint('target'))
 
     df_reach_target['_total'] = df_reach_target.sum(axis=1)
     df_reach_target = df_reach_target.reset_index()
@@ -1141,9 +1327,10 @@ def postprocessing_standard_tabr1bu_df_reach_target_abs(path_tables, label_objec
     return df_reach_target
 
 
+@_memoize_frame
 def postprocessing_standard_tabr1bu_df_reach_target_perc(path_tables, label_object, campaign_par):
     """
-    Usare universo target primo giorno?
+    Universe of the targets chosen by campaign_par['universe_policy'], see UniverseIndex.
     :param path_tables:
     :param label_object:
     :param campaign_par:
@@ -1154,24 +1341,28 @@ def postprocessing_standard_tabr1bu_df_reach_target_perc(path_tables, label_obje
     df_period_range = campaign_par['df_period_range']
 
     # Read table
-    df_reach_target = _extract_df_from_json_file(path_tables, 'r1plus_in_target_buildup')
-    df_universe_by_target = _extract_df_from_json_file(path_tables, 'target_universe')
-    df_universe_by_target = df_universe_by_target[df_universe_by_target['date'] == df_universe_by_target['date'].min()]
-    df_reach_target = df_reach_target.merge(df_universe_by_target, on='target_name')
-    df_reach_target['reach'] = df_reach_target['reach'] * 100
-    df_reach_target = df_reach_target.drop(columns=['target_universe', 'date'])
+    df_reach_target = _read_table(path_tables, 'r1plus_in_target_buildup', campaign_par)
+    universe_index = _universe_index(path_tables, label_object, campaign_par)
 
     # Scaffolding
     col_to_group = ['target_name', 'end_date', 'broadcaster', 'ad_type']
     df_scaffolding = _scaffolding_rf(col_to_group, label_object, target_name=target_list,
                                      df_period_range=df_period_range)
-    df_reach_target = df_scaffolding.merge(df_reach_target, how='left', on=col_to_group)
-    df_reach_target['reach'] = df_reach_target['reach'].fillna(0)
 
-    # Pivot Table
-    df_reach_target = df_reach_target.pivot(index=['target_name', 'broadcaster', 'ad_type'],
-                                            columns=['end_date'],
-                                            values='reach').fillna(0)
+    # Pivot Table on the keys of the scaffold (in incremental mode only the end dates after the previous run are
+    # densified)
+    def densify_dates(df_scaffolding_dates):
+        df_reach_dates = df_reach_target[df_reach_target['end_date'] >= df_scaffolding_dates['end_date'].min()]
+        df_reach_dates = df_reach_dates.assign(universe=universe_index.lookup(
+            'target', [df_reach_dates['target_name']], df_reach_dates['end_date'])).dropna(subset=['universe'])
+        df_reach_dates['reach'] = df_reach_dates['reach'] * 100
+        df_reach_dates = df_reach_dates.drop(columns=['universe'])
+        return _densify(df_reach_dates, df_scaffolding_dates, index=['target_name', 'broadcaster', 'ad_type'],
+                        columns=['end_date'], values='reach')
+
+    df_reach_target = _buildup_incremental('postprocessing_standard_tabr1bu_df_reach_target_perc', path_tables,
+                                           campaign_par, df_scaffolding, 'end_date', densify_dates, df_reach_target,
+                                           fingerprint=universe_index.fingerprint('target'))
 
     df_reach_target['_total'] = df_reach_target.sum(axis=1)
     df_reach_target = df_reach_target.reset_index()
@@ -1196,6 +1387,7 @@ def postprocessing_standard_tabr1bu_df_reach_target_perc(path_tables, label_obje
     return df_reach_target
 
 
+@_memoize_frame
 def postprocessing_standard_tabsummary_df_contactreach_contact_target_abs_raw(path_tables, label_object, campaign_par):
     """
 
@@ -1209,7 +1401,7 @@ def postprocessing_standard_tabsummary_df_contactreach_contact_target_abs_raw(pa
     target_list = campaign_par['target_name']
 
     # Read table
-    df_contact_target = _extract_df_from_json_file(path_tables, 'impacts_in_target')
+    df_contact_target = _read_table(path_tables, 'impacts_in_target', campaign_par)
 
     col_to_group = ['broadcaster', 'ad_type', 'target_name']
 
@@ -1217,35 +1409,12 @@ def postprocessing_standard_tabsummary_df_contactreach_contact_target_abs_raw(pa
         df_contact_target[col_to_group + ['num_impacts']] = None
 
     # Group data
-    df_contact_target = df_contact_target.groupby(col_to_group, as_index=False)['num_impacts'].sum()
-
-    # Compute Contacts Totals including Online video
-    df_target_total_all_onlinevideo = df_contact_target.groupby(['target_name'], as_index=False)['num_impacts'].sum()
-    df_target_total_all_onlinevideo['broadcaster'] = 'all'
-    df_target_total_all_onlinevideo['ad_type'] = 'all_onlinevideo'
-
-    # Compute Contacts Totals Linear and BVOD
-    mask = df_contact_target['ad_type'].isin(['linear_static', 'dynamic'])
-    df_target_total_all = df_contact_target[mask].groupby(['target_name'], as_index=False)['num_impacts'].sum()
-    df_target_total_all['broadcaster'] = 'all'
-    df_target_total_all['ad_type'] = 'all'
-
-    # Compute Contacts Linear Total
-    mask = df_contact_target['ad_type'] == 'linear_static'
-    df_target_total_linear = df_contact_target[mask].groupby(['target_name'], as_index=False)['num_impacts'].sum()
-    df_target_total_linear['broadcaster'] = 'all'
-    df_target_total_linear['ad_type'] = 'linear_static'
-
-    # Compute Contacts BVOD Total
-    mask = df_contact_target['ad_type'] == 'dynamic'
-    df_target_total_dynamic = df_contact_target[mask].groupby(['target_name'], as_index=False)['num_impacts'].sum()
-    df_target_total_dynamic['broadcaster'] = 'all'
-    df_target_total_dynamic['ad_type'] = 'dynamic'
-
-    # Concat Totals
+    df_contact_target = df_contact_target.groupby(col_to_group, as_index=False, observed=True)['num_impacts'].sum()
+
+    # Compute Contacts Totals of all the broadcasters: Linear, BVOD, Linear and BVOD, including Online video
     df_contact_target_total = pd.concat(
-        [df_contact_target, df_target_total_linear, df_target_total_dynamic, df_target_total_all,
-         df_target_total_all_onlinevideo], ignore_index=True)
+        [df_contact_target, _rollup(df_contact_target, col_to_group, ['num_impacts'], SUMMARY_GROUPING_SETS)],
+        ignore_index=True)
 
     # Scaffolding
     df_scaffolding = _scaffolding_rf(col_to_group, label_object, target_name=target_list)
@@ -1284,6 +1453,7 @@ def postprocessing_standard_tabsummary_df_contactreach_contact_target_abs_raw(pa
     return df_contact_target_total
 
 
+@_memoize_frame
 def postprocessing_standard_tabsummary_df_contactreach_contact_target_perc_raw(path_tables, label_object, campaign_par):
     """
 
@@ -1297,9 +1467,8 @@ def postprocessing_standard_tabsummary_df_contactreach_contact_target_perc_raw(p
     target_list = campaign_par['target_name']
 
     # Read table
-    df_contact_target = _extract_df_from_json_file(path_tables, 'impacts_in_target')
-    df_universe_by_target = _extract_df_from_json_file(path_tables, 'target_universe')
-    df_universe_by_target = df_universe_by_target[df_universe_by_target['date'] == df_universe_by_target['date'].min()]
+    df_contact_target = _read_table(path_tables, 'impacts_in_target', campaign_par)
+    universe_index = _universe_index(path_tables, label_object, campaign_par)
 
     col_to_group = ['broadcaster', 'ad_type', 'target_name']
 
@@ -1307,39 +1476,17 @@ def postprocessing_standard_tabsummary_df_contactreach_contact_target_perc_raw(p
         df_contact_target[col_to_group + ['num_impacts']] = None
 
     # Group data
-    df_contact_target = df_contact_target.groupby(col_to_group, as_index=False)['num_impacts'].sum()
-
-    df_contact_target = df_contact_target.merge(df_universe_by_target.drop(columns=['date']), on=['target_name'])
-    df_contact_target['num_trp'] = df_contact_target['num_impacts'] / df_contact_target['target_universe'] * 100
-    df_contact_target = df_contact_target.drop(columns=['num_impacts', 'target_universe'])
-
-    # Compute Contacts Totals including Online video
-    df_target_total_all_onlinevideo = df_contact_target.groupby(['target_name'], as_index=False)['num_trp'].sum()
-    df_target_total_all_onlinevideo['broadcaster'] = 'all'
-    df_target_total_all_onlinevideo['ad_type'] = 'all_onlinevideo'
-
-    # Compute Contacts Totals Linear and BVOD
-    mask = df_contact_target['ad_type'].isin(['linear_static', 'dynamic'])
-    df_target_total_all = df_contact_target[mask].groupby(['target_name'], as_index=False)['num_trp'].sum()
-    df_target_total_all['broadcaster'] = 'all'
-    df_target_total_all['ad_type'] = 'all'
-
-    # Compute Contacts Linear Total
-    mask = df_contact_target['ad_type'] == 'linear_static'
-    df_target_total_linear = df_contact_target[mask].groupby(['target_name'], as_index=False)['num_trp'].sum()
-    df_target_total_linear['broadcaster'] = 'all'
-    df_target_total_linear['ad_type'] = 'linear_static'
-
-    # Compute Contacts BVOD Total
-    mask = df_contact_target['ad_type'] == 'dynamic'
-    df_target_total_dynamic = df_contact_target[mask].groupby(['target_name'], as_index=False)['num_trp'].sum()
-    df_target_total_dynamic['broadcaster'] = 'all'
-    df_target_total_dynamic['ad_type'] = 'dynamic'
-
-    # Concat Totals
+    df_contact_target = df_contact_target.groupby(col_to_group, as_index=False, observed=True)['num_impacts'].sum()
+
+    df_contact_target['universe'] = universe_index.lookup('target', [df_contact_target['target_name']])
+    df_contact_target = df_contact_target.dropna(subset=['universe'])
+    df_contact_target['num_trp'] = df_contact_target['num_impacts'] / df_contact_target['universe'] * 100
+    df_contact_target = df_contact_target.drop(columns=['num_impacts', 'universe'])
+
+    # Compute Contacts Totals of all the broadcasters: Linear, BVOD, Linear and BVOD, including Online video
     df_contact_target_total = pd.concat(
-        [df_contact_target, df_target_total_linear, df_target_total_dynamic, df_target_total_all,
-         df_target_total_all_onlinevideo], ignore_index=True)
+        [df_contact_target, _rollup(df_contact_target, col_to_group, ['num_trp'], SUMMARY_GROUPING_SETS)],
+        ignore_index=True)
 
     # Scaffolding
     df_scaffolding = _scaffolding_rf(col_to_group, label_object, target_name=target_list)
@@ -1377,9 +1524,9 @@ def postprocessing_standard_tabsummary_df_contactreach_contact_target_perc_raw(p
     return df_contact_target_total
 
 
+@_memoize_frame
 def postprocessing_standard_tabsummary_df_contactreach_reach_target_perc(path_tables, label_object, campaign_par):
     """
-    Usare universo target primo giorno?
     :param path_tables:
     :param label_object:
     :param campaign_par:
@@ -1390,29 +1537,18 @@ def postprocessing_standard_tabsummary_df_contactreach_reach_target_perc(path_ta
     target_list = campaign_par['target_name']
     max_freq = campaign_par["max_freq"]
 
-    # Read table
-    df_reach_target = _extract_df_from_json_file(path_tables, 'rf_in_target_overall')
-
-    df_reach_target = df_reach_target.drop(columns=["start_date", "end_date"])
+    # Reach N+ from the rf cube
+    rf = _rf_kernel(_rf_cube(path_tables, label_object, campaign_par))
 
     # Scaffolding
     col_to_join = ['target_name', 'broadcaster', 'ad_type', 'frequency']
     df_scaffolding = _scaffolding_rf(col_to_join, label_object, target_name=target_list, max_freq=max_freq)
     df_scaffolding = df_scaffolding[df_scaffolding["frequency"] > 0]
-    df_reach_target = df_scaffolding.merge(df_reach_target, how='left', on=col_to_join)
-    df_reach_target['reach'] = df_reach_target['reach'].fillna(0)
-
-    # Cumsum
-    col_to_sort = ['target_name', 'broadcaster', 'ad_type', 'frequency']
-    df_reach_target = df_reach_target.sort_values(col_to_sort, ascending=[True, True, True, False])
-    col_to_group = ['target_name', 'broadcaster', 'ad_type']
-    df_reach_target['reach'] = df_reach_target.groupby(col_to_group, as_index=False)['reach'].cumsum()
-
-    # Pivot Table
-    df_reach_target['frequency'] = df_reach_target['frequency'].astype(str)
-    df_reach_target = df_reach_target.pivot(index=['target_name', 'broadcaster', 'ad_type'],
-                                            columns=['frequency'],
-                                            values='reach').fillna(0)
+    # Pivot Table of the reach N+ on the keys of the scaffold
+    df_reach_target = _densify_cube(rf, 'reach_plus', df_scaffolding, index=['target_name', 'broadcaster', 'ad_type'],
+                                    columns=['frequency'])
+    df_reach_target.columns = df_reach_target.columns.astype(str)
+    df_reach_target = df_reach_target[sorted(df_reach_target.columns)]
     df_reach_target['_total'] = df_reach_target.sum(axis=1)
     df_reach_target = df_reach_target.reset_index()
 
@@ -1435,17 +1571,14 @@ def postprocessing_standard_tabsummary_df_contactreach_reach_target_perc(path_ta
     return df_reach_target
 
 
+@_memoize_frame
 def postprocessing_standard_tabsummary_df_universe_target_abs(path_tables, label_object, campaign_par):
     # Read campaign data
     target_list = campaign_par['target_name']
-    min_date = campaign_par['df_date_range']['date'].min()
-
-    # Read table
-    df_universe = _extract_df_from_json_file(path_tables, 'target_universe')
 
-    df_universe = df_universe[df_universe['target_name'].isin(target_list) & (df_universe['date'] == min_date)]
-
-    df_universe = df_universe.drop(columns=['date'])
+    # Universe of the targets of the request
+    df_universe = _universe_index(path_tables, label_object, campaign_par).universe('target').reset_index()
+    df_universe = df_universe[df_universe['target_name'].isin(target_list)]
 
     return df_universe
 
@@ -1456,13 +1589,14 @@ def postprocessing_standard_tabcontacts_table_contact_sexage_abs_raw(path_tables
                                                                      label_attribute_element,
                                                                      campaign_par, element_obj):
     df = postprocessing_standard_tabcontacts_df_contact_sexage_abs_raw(path_tables, label_object, campaign_par)
-    df = _compute_total(df)
+    df = _compute_total(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1476,7 +1610,8 @@ def postprocessing_standard_tabcontacts_plot_contact_sexage_abs_raw(path_tables,
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1490,13 +1625,14 @@ def postprocessing_standard_tabcontacts_table_contact_sexage_trp_raw(path_tables
 
     df = df.drop(columns='Total')
     df = df.merge(df_a3plus, on='Type')
-    df = _compute_total(df)
+    df = _compute_total(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1510,7 +1646,8 @@ def postprocessing_standard_tabcontacts_plot_contact_sexage_trp_raw(path_tables,
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1518,13 +1655,14 @@ def postprocessing_standard_tabcontacts_table_contact_sexage_abs_30eq(path_table
                                                                       label_attribute_element,
                                                                       campaign_par, element_obj):
     df = postprocessing_standard_tabcontacts_df_contact_sexage_abs_30eq(path_tables, label_object, campaign_par)
-    df = _compute_total(df)
+    df = _compute_total(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1538,13 +1676,14 @@ def postprocessing_standard_tabcontacts_table_contact_sexage_trp_30eq(path_table
 
     df = df.drop(columns='Total')
     df = df.merge(df_a3plus, on='Type')
-    df = _compute_total(df)
+    df = _compute_total(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1558,7 +1697,8 @@ def postprocessing_standard_tabcontacts_plot_contact_sexage_abs_30eq(path_tables
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1572,7 +1712,8 @@ def postprocessing_standard_tabcontacts_plot_contact_sexage_trp_30eq(path_tables
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1582,13 +1723,14 @@ def postprocessing_standard_tabcontacts_table_contact_target_abs_raw(path_tables
                                                                      label_attribute_element,
                                                                      campaign_par, element_obj):
     df = postprocessing_standard_tabcontacts_df_contact_target_abs_raw(path_tables, label_object, campaign_par)
-    df = _compute_total(df)
+    df = _compute_total(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1601,7 +1743,8 @@ def postprocessing_standard_tabcontacts_plot_contact_target_abs_raw(path_tables,
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1609,13 +1752,14 @@ def postprocessing_standard_tabcontacts_table_contact_target_trp_raw(path_tables
                                                                      label_attribute_element,
                                                                      campaign_par, element_obj):
     df = postprocessing_standard_tabcontacts_df_contact_target_trp_raw(path_tables, label_object, campaign_par)
-    df = _compute_total(df)
+    df = _compute_total(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1628,7 +1772,8 @@ def postprocessing_standard_tabcontacts_plot_contact_target_trp_raw(path_tables,
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1636,13 +1781,14 @@ def postprocessing_standard_tabcontacts_table_contact_target_abs_30eq(path_table
                                                                       label_attribute_element,
                                                                       campaign_par, element_obj):
     df = postprocessing_standard_tabcontacts_df_contact_target_abs_30eq(path_tables, label_object, campaign_par)
-    df = _compute_total(df)
+    df = _compute_total(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1650,13 +1796,14 @@ def postprocessing_standard_tabcontacts_table_contact_target_trp_30eq(path_table
                                                                       label_attribute_element,
                                                                       campaign_par, element_obj):
     df = postprocessing_standard_tabcontacts_df_contact_target_trp_30eq(path_tables, label_object, campaign_par)
-    df = _compute_total(df)
+    df = _compute_total(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1669,7 +1816,8 @@ def postprocessing_standard_tabcontacts_plot_contact_target_abs_30eq(path_tables
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1682,7 +1830,8 @@ def postprocessing_standard_tabcontacts_plot_contact_target_trp_30eq(path_tables
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1690,13 +1839,14 @@ def postprocessing_standard_tabcontactsbu_table_contactcum_target_abs(path_table
                                                                       label_attribute_element, campaign_par,
                                                                       element_obj):
     df = postprocessing_standard_tabcontactsbu_df_contactcum_target_abs(path_tables, label_object, campaign_par)
-    df = _compute_total_buildup(df)
+    df = _compute_total_buildup(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1709,7 +1859,8 @@ def postprocessing_standard_tabcontactsbu_plot_contactcum_target_abs(path_tables
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1717,13 +1868,14 @@ def postprocessing_standard_tabcontactsbu_table_contactcum_target_trp(path_table
                                                                       label_attribute_element, campaign_par,
                                                                       element_obj):
     df = postprocessing_standard_tabcontactsbu_df_contactcum_target_trp(path_tables, label_object, campaign_par)
-    df = _compute_total_buildup(df)
+    df = _compute_total_buildup(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1736,7 +1888,8 @@ def postprocessing_standard_tabcontactsbu_plot_contactcum_target_trp(path_tables
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1744,13 +1897,14 @@ def postprocessing_standard_tabcontactsbu_table_contactdaily_target_abs(path_tab
                                                                         label_attribute_element,
                                                                         campaign_par, element_obj):
     df = postprocessing_standard_tabcontactsbu_df_contactdaily_target_abs(path_tables, label_object, campaign_par)
-    df = _compute_total_buildup(df)
+    df = _compute_total_buildup(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1763,7 +1917,8 @@ def postprocessing_standard_tabcontactsbu_plot_contactdaily_target_abs(path_tabl
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1771,13 +1926,14 @@ def postprocessing_standard_tabcontactsbu_table_contactdaily_target_trp(path_tab
                                                                         label_attribute_element,
                                                                         campaign_par, element_obj):
     df = postprocessing_standard_tabcontactsbu_df_contactdaily_target_trp(path_tables, label_object, campaign_par)
-    df = _compute_total_buildup(df)
+    df = _compute_total_buildup(df, label_object)
 
     # Round to the first decimal value
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1790,7 +1946,8 @@ def postprocessing_standard_tabcontactsbu_plot_contactdaily_target_trp(path_tabl
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1802,7 +1959,8 @@ def postprocessing_standard_tabr1_table_reach_target_abs(path_tables, path_outpu
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1814,7 +1972,8 @@ def postprocessing_standard_tabr1_plot_reach_target_abs(path_tables, path_output
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1826,7 +1985,8 @@ def postprocessing_standard_tabr1_table_reach_target_perc(path_tables, path_outp
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1838,7 +1998,8 @@ def postprocessing_standard_tabr1_plot_reach_target_perc(path_tables, path_outpu
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1851,7 +2012,8 @@ def postprocessing_standard_tabrf_plot_reach_target_abs(path_tables, path_output
 
     df = df.drop(columns='Average freq')
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1863,7 +2025,8 @@ def postprocessing_standard_tabrf_table_reach_target_abs(path_tables, path_outpu
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1875,7 +2038,8 @@ def postprocessing_standard_tabrf_table_reach_target_perc(path_tables, path_outp
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1888,7 +2052,8 @@ def postprocessing_standard_tabrf_plot_reach_target_perc(path_tables, path_outpu
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1900,7 +2065,8 @@ def postprocessing_standard_tabr1bu_table_reach_target_abs(path_tables, path_out
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1912,7 +2078,8 @@ def postprocessing_standard_tabr1bu_plot_reach_target_abs(path_tables, path_outp
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1924,7 +2091,8 @@ def postprocessing_standard_tabr1bu_table_reach_target_perc(path_tables, path_ou
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -1936,7 +2104,8 @@ def postprocessing_standard_tabr1bu_plot_reach_target_perc(path_tables, path_out
     df = df.round(1)
 
     p = _write_dict(df, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -2030,12 +2199,13 @@ def postprocessing_standard_tabsummary_table_universe_target_abs(path_tables, pa
 
     return_dict = df.to_dict(orient='dict')['target_universe']
     with open(path_output_json, 'w') as f:
-        json.dump(return_dict, f, indent=3)
+        f.write(_json_text(return_dict, campaign_par.get('json_format', 'pretty')))
 
     return path_output_json
 
 
 def generatefile_standard_resultexcel(path_tables, path_dir_output, label_object, campaign_par):
+    t_start = time.perf_counter()
     children_request = _extract_child_id(path_tables)
 
     dict_to_write = dict()
@@ -2060,56 +2230,17 @@ def generatefile_standard_resultexcel(path_tables, path_dir_output, label_object
 
     # Lookup table in scope (added to all the Excel sheets with the only exception of the Info Tab)
     df_lookup_in_scope = _generate_df_lookup_in_scope()
-    df_lookup_in_scope = _update_df_lookup_in_scope(path_tables, label_object, df_lookup_in_scope)
-
-    # Contacts (000 and trp) sex age group
-    df_contacts_by_sexage = _excel_contact_sexage(campaign_par, label_object, path_tables, None)
-    df_contacts_by_sexage = _handle_child_reports(campaign_par, children_request, df_contacts_by_sexage,
-                                                  label_object, path_tables, _excel_contact_sexage)
-    child_request = None
-    df_contacts_by_sexage = pd.merge(df_contacts_by_sexage, df_lookup_in_scope, how='left', on='type')
-
-    dict_to_write['Contacts by sex & age'] = df_contacts_by_sexage
-
-    # Contacts by target
-    df_contacts_by_target = _excel_contact_target(campaign_par, label_object, path_tables, child_request)
-    df_contacts_by_target = _handle_child_reports(campaign_par, children_request, df_contacts_by_target,
-                                                  label_object, path_tables, _excel_contact_target)
-    df_contacts_by_target = pd.merge(df_contacts_by_target, df_lookup_in_scope, how='left', on='type')
+    df_lookup_in_scope = _update_df_lookup_in_scope(path_tables, label_object, df_lookup_in_scope, campaign_par)
 
-    dict_to_write['Contacts'] = df_contacts_by_target
+    # Numerical sheets of the parent and of the child requests, computed concurrently
+    t_sheets = time.perf_counter()
+    dict_sheet, excel_timing = _compute_excel_sheets(campaign_par, children_request, label_object, path_tables)
+    t_assemble = time.perf_counter()
+    excel_timing['setup'] = t_sheets - t_start
+    excel_timing['sheets'] = t_assemble - t_sheets
 
-    # Build-up Contacts
-    df_contactsbu_daily = _excel_contact_bu_target(campaign_par, label_object, path_tables, child_request)
-    df_contactsbu_daily = _handle_child_reports(campaign_par, children_request, df_contactsbu_daily,
-                                                label_object, path_tables, _excel_contact_bu_target)
-    df_contactsbu_daily = pd.merge(df_contactsbu_daily, df_lookup_in_scope, how='left', on='type')
-
-    dict_to_write['Build-up Contacts'] = df_contactsbu_daily
-
-    # RCH 1+
-    df_reach_1plus = _excel_reach_1plus_target(campaign_par, label_object, path_tables, child_request)
-    df_reach_1plus = _handle_child_reports(campaign_par, children_request, df_reach_1plus,
-                                           label_object, path_tables, _excel_reach_1plus_target)
-    df_reach_1plus = pd.merge(df_reach_1plus, df_lookup_in_scope, how='left', on='type')
-
-    dict_to_write['RCH 1+'] = df_reach_1plus
-
-    # Reach & Frequency
-    df_rf = _excel_rf_target(campaign_par, label_object, path_tables, child_request)
-    df_rf = _handle_child_reports(campaign_par, children_request, df_rf,
-                                  label_object, path_tables, _excel_rf_target)
-    df_rf = pd.merge(df_rf, df_lookup_in_scope, how='left', on='type')
-
-    dict_to_write['Reach & Frequency'] = df_rf
-
-    # Build-up RCH 1+
-    df_reach_bu = _excel_reach_bu_1plus_target(campaign_par, label_object, path_tables, child_request)
-    df_reach_bu = _handle_child_reports(campaign_par, children_request, df_reach_bu,
-                                        label_object, path_tables, _excel_reach_bu_1plus_target)
-    df_reach_bu = pd.merge(df_reach_bu, df_lookup_in_scope, how='left', on='type')
-
-    dict_to_write['Build-up RCH 1+'] = df_reach_bu
+    for sheet_name, df in dict_sheet.items():
+        dict_to_write[sheet_name] = pd.merge(df, df_lookup_in_scope, how='left', on='type')
 
     # Definitions
     df_definitions = _excel_definitions()
@@ -2123,8 +2254,7 @@ def generatefile_standard_resultexcel(path_tables, path_dir_output, label_object
         sg_no_impressions = set()  # Set which is designed to host spotgate codes with no impressions associated
 
         # Dataframes corresponding each to an Excel sheet containing numerical data
-        df_to_parse = [df_contacts_by_sexage, df_contacts_by_target, df_contactsbu_daily, df_reach_1plus, df_rf,
-                       df_reach_bu]
+        df_to_parse = [dict_to_write[x] for x in EXCEL_SHEET_BUILDERS]
 
         for df in df_to_parse:
             # If there is any sg code which is not associated to impressions, update the set containing sg codes with no impressions
@@ -2139,57 +2269,131 @@ def generatefile_standard_resultexcel(path_tables, path_dir_output, label_object
             df_note = pd.DataFrame()
 
     else:
-        if df_contacts_by_sexage.empty:
+        if dict_to_write['Contacts by sex & age'].empty:
             df_note = pd.DataFrame({
                 '0': [f'No impressions were found for all the selected Spotgate codes during the selected period.']
             }, index=["Note"])
         else:
             df_note = pd.DataFrame()
 
-    with pd.ExcelWriter(path_output_excel, engine='xlsxwriter') as writer:
+    t_write = time.perf_counter()
+    excel_timing['assemble'] = t_write - t_assemble
+
+    # Blocks of the info tab, from its second row: dataframe, header and rows to the next block
+    info_blocks = [(df_campaign_name, False, 2)]
+    if not df_warning.empty:
+        info_blocks.append((df_warning, False, 2))
+    info_blocks += [(df_target_name, False, 2), (df_sgcode, True, len(df_sgcode) + 2), (df_broadcaster, False, 1),
+                    (df_channel, False, 1), (df_device_type, False, 1), (df_online_video, False, 2),
+                    (df_note, False, 0)]
+
+    # Auto-fit column width based on max text length in each column (including index columns), adding a buffer
+    # for spacing
+    info_width = {col_num: max(df_campaign_name[value].astype(str).map(len).max(), len(str(value))) + 2
+                  for col_num, value in enumerate(df_campaign_name.columns.values)}
+
+    if campaign_par.get('excel_constant_memory'):
+        _write_excel_constant_memory(path_output_excel, info_blocks, info_width, dict_to_write)
+    else:
+        with pd.ExcelWriter(path_output_excel, engine='xlsxwriter') as writer:
+
+            # Write info tab
+            i = 1
+            for df, header, n_rows in info_blocks:
+                df.to_excel(writer, sheet_name='Info', header=header, index=True, startcol=0, startrow=i)
+                i = i + n_rows
+
+            # Access the worksheet and set column width
+            worksheet = writer.sheets['Info']
+            for col_num, width in info_width.items():
+                worksheet.set_column(col_num, col_num, width)
+
+            for sheet_name, df in dict_to_write.items():
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+                worksheet = writer.sheets[sheet_name]
+                format_num = writer.book.add_format(EXCEL_NUMBER_FORMAT)
+
+                for col_num, _ in enumerate(df.columns):
+                    worksheet.set_column(col_num, col_num, None, format_num)
+
+    excel_timing['write'] = time.perf_counter() - t_write
+    excel_timing['total'] = time.perf_counter() - t_start
+    campaign_par['excel_timing'] = excel_timing
+    if campaign_par.get('print_timing'):
+        print(_format_excel_timing(excel_timing))
 
-        # Write info tab
+    return path_output_excel
+
+
+def _write_excel_constant_memory(path_output_excel, info_blocks, info_width, dict_to_write):
+    """
+    Write the Excel file with the cells of DataFrame.to_excel, in the constant_memory mode of xlsxwriter: the rows
+    of each sheet are streamed from the dataframes and flushed to disk one at a time, so that the memory of the
+    workbook does not grow with the size of the sheets.
+    The cell formats are created once per workbook and the column formats set before the rows, since each row is
+    written with the formats in place when it is flushed.
+
+    :param list info_blocks: Blocks of the info tab (dataframe, header, rows to the next block), from its second row.
+    :param dict info_width: Width of the columns of the info tab.
+    :param dict dict_to_write: Dataframe of each numerical sheet, written without index.
+    """
+    if xlsxwriter is None:
+        raise ValueError("The constant memory Excel writer requires the xlsxwriter package")
+
+    workbook = xlsxwriter.Workbook(path_output_excel, {'constant_memory': True})
+    try:
+        header_format = workbook.add_format(EXCEL_HEADER_FORMAT)
+        number_format = workbook.add_format(EXCEL_NUMBER_FORMAT)
+
+        worksheet = workbook.add_worksheet('Info')
+        for col_num, width in info_width.items():
+            worksheet.set_column(col_num, col_num, width)
         i = 1
-        df_campaign_name.to_excel(writer, sheet_name='Info', header=None, index=True, startcol=0, startrow=i)
-        i = i + 2
-        if not df_warning.empty:
-            df_warning.to_excel(writer, sheet_name='Info', header=None, index=True, startcol=0, startrow=i)
-            i = i + 2
-        df_target_name.to_excel(writer, sheet_name='Info', header=None, index=True, startcol=0, startrow=i)
-        i = i + 2
-        df_sgcode.to_excel(writer, sheet_name='Info', header=True, index=True, startcol=0, startrow=i)
-        i = i + len(df_sgcode) + 2
-        df_broadcaster.to_excel(writer, sheet_name='Info', header=False, index=True, startcol=0, startrow=i)
-        i = i + 1
-        df_channel.to_excel(writer, sheet_name='Info', header=False, index=True, startcol=0, startrow=i)
-        i = i + 1
-        df_device_type.to_excel(writer, sheet_name='Info', header=False, index=True, startcol=0, startrow=i)
-        i = i + 1
-        df_online_video.to_excel(writer, sheet_name='Info', header=False, index=True, startcol=0, startrow=i)
-        i = i + 2
-        df_note.to_excel(writer, sheet_name='Info', header=False, index=True, startcol=0, startrow=i)
-
-        # Access the worksheet and set column width
-        worksheet = writer.sheets['Info']
-
-        # Auto-fit column width based on max text length in each column
-        for col_num, value in enumerate(df_campaign_name.columns.values):
-            # Adjust to fit text, including index columns
-            max_len = max(
-                df_campaign_name[value].astype(str).map(len).max(),  # Find longest text in data
-                len(str(value))  # Find longest text in headers
-            )
-            worksheet.set_column(col_num, col_num, max_len + 2)  # Set column width, adding a buffer for spacing
+        for df, header, n_rows in info_blocks:
+            _write_excel_rows(worksheet, i, _excel_frame_rows(df, header, True), header_format)
+            i = i + n_rows
 
         for sheet_name, df in dict_to_write.items():
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
-            worksheet = writer.sheets[sheet_name]
-            format_num = writer.book.add_format({'num_format': '0.00'})
+            worksheet = workbook.add_worksheet(sheet_name)
+            if len(df.columns):
+                worksheet.set_column(0, len(df.columns) - 1, None, number_format)
+            _write_excel_rows(worksheet, 0, _excel_frame_rows(df, True, False), header_format)
+    finally:
+        workbook.close()
+
+    return path_output_excel
+
 
-            for col_num, _ in enumerate(df.columns):
-                worksheet.set_column(col_num, col_num, None, format_num)
+def _excel_frame_rows(df, header, index):
+    """
+    Rows of the cells written by df.to_excel(header=header, index=index), for flat columns and index: lists of
+    (value, header cell) from the first column, None for the cells left empty.
+    """
+    if header:
+        # The name of the index is written in the header row, if any
+        yield [(df.index.name, True) if df.index.name else None] * bool(index) + [(x, True) for x in df.columns]
+    labels = df.index if index else itertools.repeat(None)
+    for label, values in zip(labels, df.itertuples(index=False, name=None)):
+        yield [(label, True)] * bool(index) + [(x, False) for x in values]
 
-    return path_dir_output
+
+def _write_excel_rows(worksheet, startrow, rows, header_format):
+    """
+    Write the rows of cells of _excel_frame_rows from startrow, converting the values as DataFrame.to_excel does:
+    missing values are left empty and infinite values written as text.
+    """
+    for row_num, row in enumerate(rows, startrow):
+        for col_num, cell in enumerate(row):
+            if cell is None:
+                continue
+            value, is_header = cell
+            if isinstance(value, np.generic):
+                value = value.item()
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                value = ''
+            elif isinstance(value, float) and np.isinf(value):
+                value = 'inf' if value > 0 else '-inf'
+            worksheet.write(row_num, col_num, value, header_format if is_header else None)
 
 
 def _extract_child_id(path_tables):
@@ -2202,44 +2406,183 @@ def _extract_child_id(path_tables):
     return children_request
 
 
-def _handle_child_reports(campaign_par, children_request, df, label_object, path_tables, table_to_produce):
-    # If there is one or more child
-    if children_request:
-        df_cont = list()
-        for child_dir_name, child_request in children_request.items():
-            child_path_tables = f"{path_tables}/{child_dir_name}"
+def _get_mp_context():
+    # fork lets the workers inherit the tables already loaded by the parent (copy-on-write)
+    return multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
 
-            # Generate the child table from the provided function
-            df_child_table = table_to_produce(campaign_par, label_object, child_path_tables, child_request)
 
-            # Sum all values in numerical columns and check if the sum is 0
-            numerical_cols = df_child_table.select_dtypes(include=['number']).columns
-            has_zero_sum_in_all_num_columns = df_child_table[numerical_cols].sum().eq(0).all()
+def _excel_child_sheets(campaign_par, label_object, path_tables, child_request):
+    """
+    Produce all the numerical sheets of a child request. The tables of the child are read once and shared by the
+    sheets through the stores of campaign_par.
+    A sheet is returned as None when all its numerical columns sum to 0 (no impressions for the child).
+    """
+    campaign_par = dict(campaign_par, table_store=dict(), frame_store=dict())
+    this_mod = sys.modules[__name__]
 
-            # Append child data only if there exists at least one non-zero value
-            if not has_zero_sum_in_all_num_columns:
-                df_cont.append(df_child_table)
+    dict_sheet = dict()
+    for sheet_name, function_name in EXCEL_SHEET_BUILDERS.items():
+        df_child_table = getattr(this_mod, function_name)(campaign_par, label_object, path_tables, child_request)
 
-        df = pd.concat([df] + df_cont, ignore_index=False)
-    return df
+        # Sum all values in numerical columns and check if the sum is 0
+        numerical_cols = df_child_table.select_dtypes(include=['number']).columns
+        has_zero_sum_in_all_num_columns = df_child_table[numerical_cols].sum().eq(0).all()
 
+        # Keep child data only if there exists at least one non-zero value
+        dict_sheet[sheet_name] = None if has_zero_sum_in_all_num_columns else df_child_table
 
-def _excel_reach_bu_1plus_target(campaign_par, label_object, path_tables, child_request):
-    df_reach_bu_abs = postprocessing_standard_tabr1bu_df_reach_target_abs(path_tables, label_object, campaign_par)
-    df_reach_bu_perc = postprocessing_standard_tabr1bu_df_reach_target_perc(path_tables, label_object, campaign_par)
-    df_reach_bu_abs = df_reach_bu_abs.melt(id_vars=["Target name", "Type"], value_name="num_reach",
-                                           var_name=["date"])
-    df_reach_bu_perc = df_reach_bu_perc.melt(id_vars=["Target name", "Type"], value_name="perc_reach",
-                                             var_name=["date"])
-    df_reach_bu = df_reach_bu_abs.merge(df_reach_bu_perc, on=['Type', 'Target name', 'date'])
+    return dict_sheet
 
-    # If child_request is None -> parent request
-    if not child_request:
-        df_reach_bu['campaign level'] = 'overall campaign'
-    else:  # if child_request is not None -> child request
-        df_reach_bu['campaign level'] = child_request['id']
 
-    col_order = ['campaign level', 'Target name', 'Type', 'date', 'perc_reach', 'num_reach']
+def _timed_call(function_name, *args):
+    """
+    Run the function of the module and return its result with the elapsed wall time in seconds.
+    """
+    t_start = time.perf_counter()
+    result = getattr(sys.modules[__name__], function_name)(*args)
+    return result, time.perf_counter() - t_start
+
+
+def _excel_worker_call(function_name, *args):
+    """
+    Run a sheet task in a worker process as _timed_call, also returning the rows of the tables read by the task when
+    the tables read are recorded (see _profile_call).
+    """
+    campaign_par = args[0] if function_name == '_excel_child_sheets' else _excel_worker_state['campaign_par']
+    table_reads = campaign_par.get('table_reads')
+    if table_reads is not None:
+        table_reads.clear()
+    result, elapsed = _timed_call(function_name, *args)
+    return result, elapsed, table_reads
+
+
+# State of the parent request shared by the sheets run in a worker process, set once by _init_excel_worker
+_excel_worker_state = dict()
+
+
+def _init_excel_worker(excel_state):
+    _excel_worker_state.update(excel_state)
+
+
+def _excel_parent_sheet(function_name):
+    """
+    Produce a numerical sheet of the parent request in a worker process, from the state set by _init_excel_worker.
+    """
+    state = _excel_worker_state
+    return getattr(sys.modules[__name__], function_name)(state['campaign_par'], state['label_object'],
+                                                         state['path_tables'], None)
+
+
+def _compute_excel_sheets(campaign_par, children_request, label_object, path_tables):
+    """
+    Produce the numerical sheets of the Excel file: one task per sheet of the parent request plus one task per child
+    request (producing all the sheets of the child). The tasks are independent and run on a pool of
+    campaign_par['n_workers'] processes (serially if not set or 1).
+    Before the pool is created the parent loads the tables of the sheets and computes the intermediate dataframes
+    needed by more than one sheet (see EXCEL_SHEET_DEPENDENCIES): the workers inherit them with the rest of the state
+    of the parent through fork (where available, otherwise they receive a copy when they start), and the parent tasks
+    only send the name of their function. Child frames are concatenated after the parent frame in the order of
+    children_request, as in a serial run.
+
+    :return: (dict sheet name -> dataframe, dict with the wall time of every task)
+    """
+    # The stores of the parent are not needed by the children and are not sent to the workers
+    campaign_par_child = {k: v for k, v in campaign_par.items() if k not in ['table_store', 'frame_store']}
+
+    tasks = [(sheet_name, function_name, (campaign_par, label_object, path_tables, None))
+             for sheet_name, function_name in EXCEL_SHEET_BUILDERS.items()]
+    tasks += [(child_request['id'], '_excel_child_sheets',
+               (campaign_par_child, label_object, f"{path_tables}/{child_dir_name}", child_request))
+              for child_dir_name, child_request in children_request.items()]
+
+    n_workers = min(campaign_par.get('n_workers') or 1, len(tasks))
+    if n_workers <= 1:
+        results = [_timed_call(function_name, *args) for _, function_name, args in tasks]
+    else:
+        sheet_nodes = list()
+        for function_name in EXCEL_SHEET_BUILDERS.values():
+            graph = dict()
+            for node in EXCEL_SHEET_DEPENDENCIES[function_name]:
+                graph.update(_node_dependencies(node))
+            sheet_nodes.append(list(graphlib.TopologicalSorter(graph).static_order()))
+        node_sheets = collections.Counter(x for nodes in sheet_nodes for x in nodes)
+
+        # Tables of the sheets, then the intermediates shared by several sheets in topological order
+        for table_name in REPORT_TABLE_SCHEMA:
+            if table_name in node_sheets and os.path.isfile(os.path.join(path_tables, table_name + '.json')):
+                _read_table(path_tables, table_name, campaign_par)
+        for nodes in sheet_nodes:
+            for node in nodes:
+                if node not in REPORT_TABLE_SCHEMA and node_sheets[node] > 1:
+                    _compute_node(node, path_tables, label_object, campaign_par)
+
+        excel_state = {'campaign_par': campaign_par, 'label_object': label_object, 'path_tables': path_tables}
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=_get_mp_context(), initializer=_init_excel_worker,
+                                 initargs=(excel_state,)) as pool:
+            futures = [pool.submit(_excel_worker_call, '_excel_parent_sheet', function_name)
+                       for function_name in EXCEL_SHEET_BUILDERS.values()]
+            futures += [pool.submit(_excel_worker_call, function_name, *args)
+                        for _, function_name, args in tasks[len(EXCEL_SHEET_BUILDERS):]]
+            results = list()
+            for future in futures:
+                result, elapsed, table_reads = future.result()
+                if table_reads:
+                    campaign_par['table_reads'].update(table_reads)
+                results.append((result, elapsed))
+
+    dict_sheet = {sheet_name: df for (sheet_name, _, _), (df, _) in zip(tasks[:len(EXCEL_SHEET_BUILDERS)], results)}
+    child_sheets = [x for x, _ in results[len(EXCEL_SHEET_BUILDERS):]]
+    for sheet_name in dict_sheet:
+        dict_sheet[sheet_name] = _handle_child_reports(child_sheets, dict_sheet[sheet_name], sheet_name)
+
+    excel_timing = {
+        'n_workers': n_workers,
+        'tasks': {task_name: elapsed for (task_name, _, _), (_, elapsed) in zip(tasks, results)}
+    }
+
+    return dict_sheet, excel_timing
+
+
+def _format_excel_timing(excel_timing):
+    """
+    Summary of the timing of generatefile_standard_resultexcel. The critical path goes through the slowest sheet
+    task, since the sheets are assembled and written only when all the tasks are completed.
+    """
+    task_name, task_elapsed = max(excel_timing['tasks'].items(), key=lambda x: x[1])
+    lines = [f"Excel export: {excel_timing['total']:.3f} s with {excel_timing['n_workers']} worker(s)",
+             f"  critical path: setup {excel_timing['setup']:.3f} s -> {task_name} {task_elapsed:.3f} s "
+             f"(sheets {excel_timing['sheets']:.3f} s) -> assemble {excel_timing['assemble']:.3f} s -> "
+             f"write {excel_timing['write']:.3f} s",
+             "  sheet tasks:"]
+    for task_name, task_elapsed in sorted(excel_timing['tasks'].items(), key=lambda x: -x[1]):
+        lines.append(f"    {task_name:<30} {task_elapsed:.3f} s")
+    return '\n'.join(lines)
+
+
+def _handle_child_reports(child_sheets, df, sheet_name):
+    # If there is one or more child
+    if child_sheets:
+        df_cont = [x[sheet_name] for x in child_sheets if x[sheet_name] is not None]
+        df = pd.concat([df] + df_cont, ignore_index=False)
+    return df
+
+
+def _excel_reach_bu_1plus_target(campaign_par, label_object, path_tables, child_request):
+    df_reach_bu_abs = postprocessing_standard_tabr1bu_df_reach_target_abs(path_tables, label_object, campaign_par)
+    df_reach_bu_perc = postprocessing_standard_tabr1bu_df_reach_target_perc(path_tables, label_object, campaign_par)
+    df_reach_bu_abs = df_reach_bu_abs.melt(id_vars=["Target name", "Type"], value_name="num_reach",
+                                           var_name="date")
+    df_reach_bu_perc = df_reach_bu_perc.melt(id_vars=["Target name", "Type"], value_name="perc_reach",
+                                             var_name="date")
+    df_reach_bu = df_reach_bu_abs.merge(df_reach_bu_perc, on=['Type', 'Target name', 'date'])
+
+    # If child_request is None -> parent request
+    if not child_request:
+        df_reach_bu['campaign level'] = 'overall campaign'
+    else:  # if child_request is not None -> child request
+        df_reach_bu['campaign level'] = child_request['id']
+
+    col_order = ['campaign level', 'Target name', 'Type', 'date', 'perc_reach', 'num_reach']
     df_reach_bu = df_reach_bu[col_order]
     rename_col = {'Type': 'type', 'Target name': 'target name', 'perc_reach': 'reach (%)', 'num_reach': 'reach (000)'}
     df_reach_bu = df_reach_bu.rename(columns=rename_col)
@@ -2260,9 +2603,9 @@ def _excel_rf_target(campaign_par, label_object, path_tables, child_request):
     df_rf_perc = postprocessing_standard_tabrf_df_reach_target_perc(path_tables, label_object, campaign_par)
     df_rf_perc = df_rf_perc.drop(columns='Average freq')
     df_rf_abs = df_rf_abs.melt(id_vars=["Target name", "Type"], value_name="num_reach",
-                               var_name=["frequency"])
+                               var_name="frequency")
     df_rf_perc = df_rf_perc.melt(id_vars=["Target name", "Type"], value_name="perc_reach",
-                                 var_name=["frequency"])
+                                 var_name="frequency")
     df_rf = df_rf_abs.merge(df_rf_perc, on=['Type', 'Target name', 'frequency'])
 
     # If child_request is None -> parent request
@@ -2290,9 +2633,9 @@ def _excel_reach_1plus_target(campaign_par, label_object, path_tables, child_req
     df_reach_1plus_abs = postprocessing_standard_tabr1_df_reach_target_abs(path_tables, label_object, campaign_par)
     df_reach_1plus_perc = postprocessing_standard_tabr1_df_reach_target_perc(path_tables, label_object, campaign_par)
     df_reach_1plus_abs = df_reach_1plus_abs.melt(id_vars=["Target name"], value_name="num_reach",
-                                                 var_name=["type"])
+                                                 var_name="type")
     df_reach_1plus_perc = df_reach_1plus_perc.melt(id_vars=["Target name"], value_name="perc_reach",
-                                                   var_name=["type"])
+                                                   var_name="type")
     df_reach_1plus = df_reach_1plus_abs.merge(df_reach_1plus_perc, on=['type', 'Target name']).sort_values('Target name')
 
     if not child_request:
@@ -2323,9 +2666,9 @@ def _excel_contact_bu_target(campaign_par, label_object, path_tables, child_requ
                                                                                                label_object,
                                                                                                campaign_par)
     df_contactsbu_daily_abs = df_contactsbu_daily_abs.melt(id_vars=["Type", "Target name"], value_name="num_contact",
-                                                           var_name=["date"])
+                                                           var_name="date")
     df_contactsbu_daily_trp = df_contactsbu_daily_trp.melt(id_vars=["Type", "Target name"], value_name="num_trp",
-                                                           var_name=["date"])
+                                                           var_name="date")
     df_contactsbu_daily = df_contactsbu_daily_abs.merge(df_contactsbu_daily_trp, on=['Type', 'Target name', 'date'])
     if not child_request:
         df_contactsbu_daily['campaign level'] = 'overall campaign'
@@ -2353,9 +2696,9 @@ def _excel_contact_target(campaign_par, label_object, path_tables, child_request
     df_contacts_by_target_trp = postprocessing_standard_tabcontacts_df_contact_target_trp_raw(path_tables, label_object,
                                                                                               campaign_par)
     df_contacts_by_target_abs = df_contacts_by_target_abs.melt(id_vars=["Type"], value_name="num_contact",
-                                                               var_name=["target_name"])
+                                                               var_name="target_name")
     df_contacts_by_target_trp = df_contacts_by_target_trp.melt(id_vars=["Type"], value_name="num_trp",
-                                                               var_name=["target_name"])
+                                                               var_name="target_name")
     df_contacts_by_target = df_contacts_by_target_abs.merge(df_contacts_by_target_trp, on=['Type', 'target_name'])
 
     if not child_request:
@@ -2384,9 +2727,9 @@ def _excel_contact_sexage(campaign_par, label_object, path_tables, child_request
     df_contacts_by_sexage_trp = postprocessing_standard_tabcontacts_df_contact_sexage_trp_raw(path_tables, label_object,
                                                                                               campaign_par)
     df_contacts_by_sexage_abs = df_contacts_by_sexage_abs.melt(id_vars=["Type"], value_name="num_contact",
-                                                               var_name=["sexage_group"])
+                                                               var_name="sexage_group")
     df_contacts_by_sexage_trp = df_contacts_by_sexage_trp.melt(id_vars=["Type"], value_name="num_trp",
-                                                               var_name=["sexage_group"])
+                                                               var_name="sexage_group")
     df_contacts_by_sexage = df_contacts_by_sexage_abs.merge(df_contacts_by_sexage_trp, on=['Type', 'sexage_group'])
 
     # If child_request is None -> parent request
@@ -2426,90 +2769,537 @@ def _excel_definitions():
     return df
 
 
-def _write_dict(df, path_output_json, label_attribute_element, zoom_par):
-    return_dict = dict()
-    return_dict['data'] = df.to_dict(orient='records')
-    return_dict['label_metadata'] = label_attribute_element
+def _write_dict(df, path_output_json, label_attribute_element, zoom_par, campaign_par=None, payload='records'):
+    """
+    Write the json file of an element: the data of df in the schema payload (see PAYLOAD_SCHEMAS), the label
+    metadata and the default zoom.
+    The file is written straight from the columns of df in the format campaign_par['json_format'] (see
+    JSON_FORMATS), "pretty" records being the text of json.dump(..., indent=3) of df.to_dict(orient='records').
+    """
+    json_format = (campaign_par or dict()).get('json_format', 'pretty')
+    if json_format not in JSON_FORMATS:
+        raise ValueError(f"Unknown json format {json_format}, use one of {JSON_FORMATS}")
+    if payload not in PAYLOAD_SCHEMAS:
+        raise ValueError(f"Unknown payload {payload}, use one of {PAYLOAD_SCHEMAS}")
+
     zoom_par = [0 if x is None else x for x in zoom_par]
-    if sum(zoom_par) == 0:
-        return_dict['zoom'] = None
+    zoom = None if sum(zoom_par) == 0 else {'min': zoom_par[0], 'max': zoom_par[1]}
+
+    if payload == 'records':
+        fields = [('data', _records_json(df, json_format))]
+    else:
+        sep = ', ' if json_format == 'pretty' else ','
+        fields = [('schema', '"split"'), ('version', str(SPLIT_PAYLOAD_VERSION)),
+                  ('columns', '[' + sep.join(_key_json(x) for x in df.columns) + ']'),
+                  ('dtypes', '[' + sep.join('"{}"'.format(_payload_dtype(df.iloc[:, j])) for j in range(df.shape[1]))
+                   + ']'),
+                  ('data', _columns_json(df, json_format))]
+    fields += [('label_metadata', _json_text(label_attribute_element, json_format)),
+               ('zoom', _json_text(zoom, json_format))]
+
+    if json_format == 'pretty':
+        text = '{\n' + ',\n'.join('   "{}": {}'.format(k, v.replace('\n', '\n   ') if k in ['label_metadata', 'zoom']
+                                                        else v) for k, v in fields) + '\n}'
     else:
-        return_dict['zoom'] = {'min': zoom_par[0], 'max': zoom_par[1]}
+        text = '{' + ','.join('"{}":{}'.format(k, v) for k, v in fields) + '}'
+
     with open(path_output_json, 'w') as f:
-        json.dump(return_dict, f, indent=3)
+        f.write(text)
 
     return path_output_json
 
 
-def _scaffolding_contacts(col_to_scaf, label_object, target_name=None, df_date_range=None):
-    dict_col = {x: list(label_object['replace'][x].keys()) for x in label_object['replace']}
-    df_cont = list()
-    for x in col_to_scaf:
-        if x not in ['target_name', 'date', 'start_date', 'end_date', 'frequency']:
-            values = dict_col[x]
-            if x in ['broadcaster', 'ad_type']:
-                values.remove('all')
-            df_cont.append(pd.DataFrame(dict_col[x], columns=[x]))
+def _json_text(obj, json_format):
+    if json_format == 'pretty':
+        return json.dumps(obj, indent=3)
+    return json.dumps(obj, separators=(',', ':'))
 
-    if len(df_cont) == 1:
-        return df_cont[0]
 
-    df_out = df_cont[0]
+def _records_json(df, json_format):
+    """
+    JSON array of the rows of df as objects, as json.dumps of df.to_dict(orient='records') with the separators and
+    indentation of json_format (the array being at the first level of indentation), built column by column.
+    """
+    if not df.columns.is_unique:
+        # to_dict keeps the last of the duplicated columns
+        return _json_text(df.to_dict(orient='records'), json_format).replace('\n', '\n   ')
+    if len(df) == 0:
+        return '[]'
+    if len(df.columns) == 0:
+        return _json_text([dict()] * len(df), json_format).replace('\n', '\n   ')
+
+    keys = [_key_json(x) for x in df.columns]
+    if json_format == 'pretty':
+        prefixes = ['         {}: '.format(x) for x in keys]
+        sep, start, end, row_sep = ',\n', '      {\n', '\n      }', ',\n'
+    else:
+        prefixes = ['{}:'.format(x) for x in keys]
+        sep, start, end, row_sep = ',', '{', '}', ','
 
-    for t in df_cont[1:]:
-        df_out = df_out.merge(t, how='cross')
+    columns = [[prefix + x for x in _column_json(df.iloc[:, j])] for j, prefix in enumerate(prefixes)]
+    rows = [start + sep.join(x) + end for x in zip(*columns)]
+    if json_format == 'pretty':
+        return '[\n' + row_sep.join(rows) + '\n   ]'
+    return '[' + row_sep.join(rows) + ']'
 
-    if target_name is not None:
-        df_target = pd.DataFrame(target_name, columns=['target_name'])
-        df_out = df_out.merge(df_target, how='cross')
 
-    if df_date_range is not None:
-        df_out = df_out.merge(df_date_range, how='cross')
+def _columns_json(df, json_format):
+    """
+    JSON array of the columns of df, each as the array of its values (split payload).
+    """
+    if df.shape[1] == 0:
+        return '[]'
+    sep = ', ' if json_format == 'pretty' else ','
+    columns = ['[' + sep.join(_column_json(df.iloc[:, j])) + ']' for j in range(df.shape[1])]
+    if json_format == 'pretty':
+        return '[\n      ' + ',\n      '.join(columns) + '\n   ]'
+    return '[' + ','.join(columns) + ']'
 
-    # Remove no sense combination
-    if 'ad_type' in df_out.columns and 'broadcaster' in df_out.columns:
-        remove_raw = -((df_out['ad_type'] == 'dynamic') & (df_out['broadcaster'] == 'other'))
-        df_out = df_out[remove_raw]
 
-    return df_out
+def _key_json(x):
+    """
+    JSON text of the column name x as json.dumps converts the keys of a dict (non string keys included).
+    """
+    return json.dumps({x: 0}, separators=(',', ':'))[1:-3]
+
+
+def _payload_dtype(column):
+    """
+    Type of the values of a column declared in the split payload: "float", "int", "bool" or "string".
+    """
+    return {'f': 'float', 'i': 'int', 'u': 'int', 'b': 'bool'}.get(column.dtype.kind, 'string')
+
+
+def read_split_payload(json_element):
+    """
+    Return the data of the json content of an element written with the "split" payload as a DataFrame, the columns
+    having the dtypes declared in the payload (the nullable dtypes for the numerical columns with missing values, the
+    missing strings being None).
+    """
+    if json_element.get('schema') != 'split':
+        raise ValueError(f"Unknown payload {json_element.get('schema')}, the element is not a split payload")
+    if json_element['version'] != SPLIT_PAYLOAD_VERSION:
+        raise ValueError(f"Unknown split payload version {json_element['version']}")
+
+    df = pd.DataFrame({j: pd.Series(values, dtype=object) for j, values in enumerate(json_element['data'])},
+                      columns=range(len(json_element['columns'])))
+    for j, payload_dtype in enumerate(json_element['dtypes']):
+        # null is a missing value, NaN a float
+        has_null = any(x is None for x in json_element['data'][j])
+        if payload_dtype == 'float':
+            df[j] = df[j].astype('Float64' if has_null else 'float64')
+        elif payload_dtype == 'int':
+            df[j] = df[j].astype('Int64' if has_null else 'int64')
+        elif payload_dtype == 'bool':
+            df[j] = df[j].astype('boolean' if has_null else 'bool')
+    df.columns = json_element['columns']
+
+    return df
+
+
+def _column_json(column):
+    """
+    JSON texts of the cells of a column, as json.dumps writes the values of DataFrame.to_dict(orient='records'): the
+    missing values of the nullable dtypes (pd.NA) are null.
+    """
+    kind = column.dtype.kind
+    if isinstance(column.dtype, pd.api.extensions.ExtensionDtype) and kind in 'fiub':
+        # Nullable dtypes: the values are written as their numpy dtype, the missing ones as null
+        is_na = column.isna().to_numpy()
+        texts = _column_json(pd.Series(column.to_numpy(dtype=column.dtype.numpy_dtype, na_value=0)))
+        return ['null' if y else x for x, y in zip(texts, is_na)]
+    if kind == 'f':
+        values = column.to_numpy(dtype='float64')
+        texts = list(map(float.__repr__, values.tolist()))
+        for i in np.flatnonzero(~np.isfinite(values)):
+            texts[i] = 'NaN' if np.isnan(values[i]) else ('Infinity' if values[i] > 0 else '-Infinity')
+        return texts
+    if kind in 'iu':
+        return list(map(int.__repr__, column.to_numpy().tolist()))
+    if kind == 'b':
+        return ['true' if x else 'false' for x in column.to_numpy().tolist()]
+
+    # Labels and other objects: each distinct label is encoded once. Only the strings are cached, the other values
+    # being equal across types (1 == 1.0 == True, 0.0 == -0.0) with different texts
+    cache = dict()
+    texts = list()
+    for x in column.astype(object).tolist():
+        if isinstance(x, str):
+            text = cache.get(x)
+            if text is None:
+                text = cache[x] = json.dumps(x)
+        elif x is pd.NA:
+            text = 'null'
+        else:
+            text = json.dumps(x.item() if isinstance(x, np.generic) else x)
+        texts.append(text)
+    return texts
+
+
+def _scaffolding_contacts(col_to_scaf, label_object, target_name=None, df_date_range=None):
+    return _get_scaffold('contacts', col_to_scaf, label_object, target_name, df_date_range, None)
 
 
 def _scaffolding_rf(col_to_scaf, label_object, target_name=None, df_period_range=None, max_freq=None):
-    dict_col = {x: list(label_object['replace'][x].keys()) for x in label_object['replace']}
-    df_cont = list()
-    for x in col_to_scaf:
-        if x not in ['target_name', 'date', 'start_date', 'end_date', 'frequency']:
-            df_cont.append(pd.DataFrame(dict_col[x], columns=[x]))
+    return _get_scaffold('rf', col_to_scaf, label_object, target_name, df_period_range, max_freq)
 
-    if len(df_cont) == 1:
-        return df_cont[0]
 
-    df_out = df_cont[0]
+def _get_scaffold(kind, col_to_scaf, label_object, target_name, df_range, max_freq):
+    """
+    Return the scaffold from the cache of the process, building it on a miss. The key holds everything the scaffold
+    depends on: the labels of its columns, the target list, the content of the date/period range and max_freq.
+    """
+    dims = [x for x in col_to_scaf if x not in SCAFFOLD_SPECIAL_COLUMNS]
+    range_key = None
+    if df_range is not None:
+        range_key = (tuple(df_range.columns),
+                     hashlib.sha1(pd.util.hash_pandas_object(df_range, index=False).values.tobytes()).hexdigest())
+    key = (kind, tuple(col_to_scaf), tuple(tuple(label_object['replace'][x]) for x in dims),
+           None if target_name is None else tuple(target_name), range_key, max_freq)
+
+    with _scaffold_cache_lock:
+        df_out = _scaffold_cache.get(key)
+        if df_out is not None:
+            _scaffold_cache.move_to_end(key)
+
+    if df_out is None:
+        df_out = _build_scaffold(kind, dims, label_object, target_name, df_range, max_freq)
+        with _scaffold_cache_lock:
+            _scaffold_cache[key] = df_out
+            while len(_scaffold_cache) > SCAFFOLD_CACHE_SIZE:
+                _scaffold_cache.popitem(last=False)
+
+    return df_out.copy(deep=False)
+
+
+def _build_scaffold(kind, dims, label_object, target_name, df_range, max_freq):
+    """
+    Build the dense grid of keys of a table: the product of the labels of dims, the targets, the rows of the
+    date/period range and the frequencies from 0 to max_freq, in this order (the first factor varies slowest), without
+    the combinations which cannot exist.
+    The product is computed on the positions of the values with MultiIndex.from_product and the impossible
+    combinations are dropped with masks on the positions, before any value is materialised.
+    """
+    factors = list()
+    for x in dims:
+        values = list(label_object['replace'][x].keys())
+        if kind == 'contacts' and x in ['broadcaster', 'ad_type']:
+            values.remove('all')
+        factors.append(pd.DataFrame(values, columns=[x]))
 
-    for t in df_cont[1:]:
-        df_out = df_out.merge(t, how='cross')
+    if len(factors) == 1:
+        return factors[0]
 
     if target_name is not None:
-        df_target = pd.DataFrame(target_name, columns=['target_name'])
-        df_out = df_out.merge(df_target, how='cross')
+        factors.append(pd.DataFrame(target_name, columns=['target_name']))
 
-    if df_period_range is not None:
-        df_out = df_out.merge(df_period_range, how='cross')
+    if df_range is not None:
+        factors.append(df_range)
 
     if max_freq is not None:
-        df_freq = pd.DataFrame(list(range(0, max_freq + 1)), columns=['frequency'])
-        df_out = df_out.merge(df_freq, how='cross')
+        factors.append(pd.DataFrame(list(range(0, max_freq + 1)), columns=['frequency']))
+
+    index = pd.MultiIndex.from_product([range(len(x)) for x in factors])
+    codes = dict()
+    for x, level_codes in zip(factors, index.codes):
+        codes.update({col: (x[col], np.asarray(level_codes)) for col in x.columns})
 
     # Remove no sense combination
-    if 'ad_type' in df_out.columns and 'broadcaster' in df_out.columns:
-        remove_raw = -((df_out['ad_type'] == 'dynamic') & (df_out['broadcaster'] == 'other'))
-        df_out = df_out[remove_raw]
-        remove_raw = -((df_out['ad_type'] == 'all') & (df_out['broadcaster'] != 'all'))
-        df_out = df_out[remove_raw]
+    keep = np.ones(len(index), dtype=bool)
+    if 'ad_type' in codes and 'broadcaster' in codes:
+        keep &= ~(_scaffold_eq(codes['ad_type'], 'dynamic') & _scaffold_eq(codes['broadcaster'], 'other'))
+        if kind == 'rf':
+            keep &= ~(_scaffold_eq(codes['ad_type'], 'all') & ~_scaffold_eq(codes['broadcaster'], 'all'))
+
+    positions = np.flatnonzero(keep)
+    df_out = pd.concat([x.take(level_codes[positions]).reset_index(drop=True)
+                        for x, level_codes in zip(factors, index.codes)], axis=1)
+    if len(positions) < len(keep):
+        df_out.index = positions
 
     return df_out
 
 
+def _scaffold_eq(column_codes, value):
+    """
+    Mask of the rows of a scaffold where the column is equal to value, computed on the positions of the labels.
+    """
+    values, level_codes = column_codes
+    return np.isin(level_codes, np.flatnonzero(values.to_numpy() == value))
+
+
+def _align_to_scaffold(df, df_scaffolding, keys, values):
+    """
+    Series of the column values of df on the keys of the scaffold, in the order of the scaffold: the keys of the
+    scaffold missing in df are 0 and the keys of df missing in the scaffold are dropped. Same values as a left merge
+    of the scaffold with df followed by fillna(0), without copying the other columns.
+
+    :param df: dataframe with one row per key
+    """
+    series = pd.Series(df[values].to_numpy(), index=pd.MultiIndex.from_frame(df[keys]), name=values)
+    series = series.reindex(pd.MultiIndex.from_frame(df_scaffolding[keys]), fill_value=0)
+    if series.hasnans:
+        series = series.fillna(0)
+    return series
+
+
+def _densify(df, df_scaffolding, index, columns, values):
+    """
+    Wide table of the column values of df on the keys of the scaffold, with one row per combination of index and one
+    column per combination of columns, sorted as DataFrame.pivot sorts them; the cells without a key in the scaffold
+    are 0. Replaces the left merge on the scaffold, fillna, pivot and fillna with one reindex and one unstack.
+    """
+    return _align_to_scaffold(df, df_scaffolding, index + columns, values).unstack(columns, fill_value=0)
+
+
+def _densify_cube(cube, metric, df_scaffolding, index, columns):
+    """
+    Same wide table as _densify, read from a contacts cube instead of a grouped dataframe: the cube is sliced on the
+    values of the keys of the scaffold and summed over its other axes. The values of the scaffold missing in the cube
+    are 0. The scaffolds only remove combinations of the index keys, hence only the rows are filtered.
+
+    :param cube: output of _contacts_cube_target or _contacts_cube_sexage
+    :param str metric: 'num_impacts' or 'num_30sec_eq_impacts'
+    """
+    keys = index + columns
+    axes = cube['axes']
+    levels = {x: pd.Index(df_scaffolding[x].unique()).sort_values() for x in keys}
+
+    values = cube[metric].sum(axis=tuple(i for i, x in enumerate(axes) if x not in keys))
+    kept = [x for x in axes if x in keys]
+
+    # A zero slice is appended to every axis, so the values missing in the cube (position -1) take it
+    values = np.pad(values, [(0, 1)] * values.ndim)
+    for i, x in enumerate(kept):
+        values = values.take(axes[x].get_indexer(levels[x]), axis=i)
+
+    values = values.transpose([kept.index(x) for x in keys])
+    values = values.reshape(int(np.prod([len(levels[x]) for x in index])), -1)
+
+    rows = pd.MultiIndex.from_product([levels[x] for x in index], names=index)
+    if len(columns) == 1:
+        cols = levels[columns[0]].rename(columns[0])
+    else:
+        cols = pd.MultiIndex.from_product([levels[x] for x in columns], names=columns)
+
+    df_out = pd.DataFrame(values, index=rows, columns=cols)
+    return df_out[rows.isin(pd.MultiIndex.from_frame(df_scaffolding[index]))]
+
+
+def _compute_trp_wide(df, universe, keys):
+    """
+    TRPs of a wide table of impacts: impacts / universe * 100. The universe is either a Series of
+    UniverseIndex.universe, matched on the keys found in the columns or in the index of df, or a dataframe of
+    UniverseIndex.by_date, matched on the key found in the index of df and on the dates of its columns. The cells
+    without universe are 0, as the rows dropped by an inner merge with the universe before densifying.
+    """
+    if isinstance(universe, pd.DataFrame):
+        universe = universe.reindex(index=df.index.get_level_values(keys[0]), columns=df.columns)
+        df = df / universe.to_numpy()
+    elif keys == [x for x in df.columns.names if x in keys]:
+        df = df.div(universe.reindex(df.columns), axis=1)
+    else:
+        df = df.div(universe, axis=0, level=keys[0])
+    return (df * 100).fillna(0)
+
+
+def _buildup_incremental(builder_name, path_tables, campaign_par, df_scaffolding, date_col, densify_dates, df_table,
+                         cumulative=False, fingerprint=None):
+    """
+    Wide build-up table with one column per date of the scaffold, cumulated over the dates if cumulative.
+
+    Without campaign_par['incremental_state'] (or without pyarrow) the table is simply densify_dates(df_scaffolding).
+    Otherwise it is the directory where the columns of the previous runs of the campaign are persisted, up to the
+    last processed date, i.e. the last date delivered by the API (the running cumulative sums of a cumulative table
+    are its column of that date): densify_dates is called only on the rows of the scaffold after that date, the new
+    columns are appended to the stored ones, and only the columns of the dates processed by this run are written.
+    Of the table from the API only the rows of the last BUILDUP_RESTATEMENT_DAYS processed days and of the new dates
+    are hashed.
+    The state is ignored, and rebuilt, if json_request.json, the keys of the scaffold, its first date or fingerprint
+    (e.g. of the universe used to compute TRPs) changed, or if the API restated one of the last
+    BUILDUP_RESTATEMENT_DAYS processed days, i.e. its rows in the table changed.
+
+    :param str date_col: column of the dates in the scaffold and in df_table, becoming the columns of the table
+    :param densify_dates: function(df_scaffolding of some dates) -> wide table of these dates, not cumulated
+    :param df_table: table from the API densified by densify_dates, the dates of the scaffold after its last date
+        have no data yet and are computed again at the next run
+    :param str fingerprint: hash of the other inputs of the table, such as UniverseIndex.fingerprint
+    """
+    path_state_dir = campaign_par.get('incremental_state')
+    dates = df_scaffolding[date_col]
+    df_wide = None
+    state = None
+
+    if path_state_dir is not None and pa is not None:
+        path_state = os.path.join(path_state_dir, '{}_{}{}'.format(
+            builder_name, hashlib.sha1(os.path.normpath(path_tables).encode()).hexdigest()[:12],
+            BUILDUP_STATE_EXTENSION))
+        state_fingerprint = _buildup_fingerprint(path_tables, df_scaffolding, date_col, fingerprint)
+        state = _read_buildup_state(path_state)
+        if state is not None and state['fingerprint'] == state_fingerprint and state['last_date'] <= dates.max():
+            # The last days already processed must not have been restated by the API
+            restatement_start = state['last_date'] - pd.Timedelta(days=BUILDUP_RESTATEMENT_DAYS)
+            if _date_hashes(df_table, date_col, restatement_start, state['last_date']) == state['date_hashes']:
+                df_wide = _read_buildup_columns(path_state, state, date_col)
+        if df_wide is None:
+            state = None
+        else:
+            is_new_date = (dates > state['last_date']).to_numpy()
+            if is_new_date.any():
+                df_new = densify_dates(df_scaffolding[is_new_date])
+                if cumulative:
+                    # Same additions as a cumsum over all the dates, starting from the running sums
+                    df_new = pd.concat([df_wide.iloc[:, -1:], df_new], axis=1).cumsum(axis=1).iloc[:, 1:]
+                df_wide = pd.concat([df_wide, df_new], axis=1)
+
+    if df_wide is None:
+        df_wide = densify_dates(df_scaffolding)
+        if cumulative:
+            df_wide = df_wide.cumsum(axis=1)
+
+    last_data_date = _last_date(df_table, date_col)
+    if path_state_dir is not None and pa is not None and pd.notna(last_data_date):
+        last_date = min(last_data_date, dates.max())
+        first_date = pd.NaT if state is None else state['last_date']
+        if state is None or last_date > first_date:
+            date_hashes = _date_hashes(df_table, date_col, last_date - pd.Timedelta(days=BUILDUP_RESTATEMENT_DAYS),
+                                       last_date)
+            is_new_column = np.asarray(df_wide.columns <= last_date)
+            if state is not None:
+                is_new_column &= np.asarray(df_wide.columns > first_date)
+            _write_buildup_state(path_state, state, {'fingerprint': state_fingerprint, 'last_date': last_date,
+                                                     'date_hashes': date_hashes}, df_wide.loc[:, is_new_column])
+
+    return df_wide
+
+
+def _last_date(df, date_col):
+    """
+    Last date of the column of the table, NaT if the table is empty.
+    """
+    return df[date_col].max() if date_col in df.columns else pd.NaT
+
+
+def _buildup_fingerprint(path_tables, df_scaffolding, date_col, fingerprint=None):
+    """
+    Hash of what the stored build-up table depends on, apart from the rows of the table from the API: the request,
+    the keys of the scaffold, its first date and fingerprint.
+    """
+    keys = df_scaffolding.drop(columns=[x for x in df_scaffolding.columns if x.endswith('date')]).drop_duplicates()
+    digest = hashlib.sha1(pd.util.hash_pandas_object(keys, index=False).values.tobytes())
+    digest.update(_file_sha256(os.path.join(path_tables, 'json_request.json')).encode())
+    digest.update(str(df_scaffolding[date_col].min()).encode())
+    if fingerprint is not None:
+        digest.update(fingerprint.encode())
+    return digest.hexdigest()
+
+
+def _date_hashes(df, date_col, start_date, end_date):
+    """
+    Hash of the rows of the table of each date after start_date up to end_date, whatever their order, keyed by the
+    date in ISO format.
+    """
+    if date_col not in df.columns:
+        return dict()
+    df = df[(df[date_col] > start_date) & (df[date_col] <= end_date)]
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    df_dates = pd.DataFrame({'date': df[date_col].to_numpy(), 'hash': row_hashes}).sort_values(['date', 'hash'])
+    return {pd.Timestamp(date).isoformat(): hashlib.sha1(x.to_numpy().tobytes()).hexdigest()
+            for date, x in df_dates.groupby('date')['hash']}
+
+
+def _read_buildup_state(path_state):
+    """
+    Return the build-up state stored by _write_buildup_state, last_date as a Timestamp, None if missing or
+    unreadable.
+    """
+    try:
+        with open(os.path.join(path_state, BUILDUP_STATE_FILE)) as f:
+            state = json.load(f)
+        state['last_date'] = pd.Timestamp(state['last_date'])
+        return state
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _read_buildup_columns(path_state, state, date_col):
+    """
+    Return the wide table stored in the files of the state, None if one of them is missing or unreadable.
+    """
+    try:
+        with pa.memory_map(os.path.join(path_state, state['index_file'])) as source:
+            index = pa.ipc.open_file(source).read_all().to_pandas().index
+        chunks = list()
+        for file_name in state['column_files']:
+            with pa.memory_map(os.path.join(path_state, file_name)) as source:
+                chunks.append(pa.ipc.open_file(source).read_all().to_pandas())
+    except (OSError, KeyError, pa.ArrowException):
+        return None
+
+    df_wide = pd.concat(chunks, axis=1) if chunks else pd.DataFrame(index=range(len(index)))
+    df_wide.index = index
+    df_wide.columns = pd.DatetimeIndex(pd.to_datetime(df_wide.columns), name=date_col)
+    return df_wide
+
+
+def _write_buildup_state(path_state, state, new_state, df_columns):
+    """
+    Store the build-up state: the columns of df_columns in a new Arrow IPC file, listed in the state file after the
+    column files of state (the state read at the beginning of the run, None if the state is rebuilt, the index of
+    df_columns being stored too). The state file is written last and the files it no longer lists are removed; a
+    directory which is not writable is silently skipped.
+    """
+    if state is None:
+        new_state['index_file'] = 'index_{}.arrow'.format(new_state['fingerprint'][:12])
+        new_state['column_files'] = list()
+    else:
+        new_state['index_file'] = state['index_file']
+        new_state['column_files'] = list(state['column_files'])
+
+    try:
+        os.makedirs(path_state, exist_ok=True)
+        if state is None:
+            _write_ipc_file(os.path.join(path_state, new_state['index_file']),
+                            pa.Table.from_pandas(df_columns.iloc[:, :0], preserve_index=True))
+        if df_columns.shape[1]:
+            file_name = 'columns_{:%Y%m%d}_{:%Y%m%d}.arrow'.format(df_columns.columns[0], df_columns.columns[-1])
+            df_columns = df_columns.set_axis([x.isoformat() for x in df_columns.columns], axis=1)
+            _write_ipc_file(os.path.join(path_state, file_name), pa.Table.from_pandas(df_columns, preserve_index=False))
+            new_state['column_files'].append(file_name)
+
+        path_tmp = '{}.{}.{}.tmp'.format(os.path.join(path_state, BUILDUP_STATE_FILE), os.getpid(),
+                                         threading.get_ident())
+        try:
+            with open(path_tmp, 'w') as f:
+                json.dump(dict(new_state, last_date=new_state['last_date'].isoformat()), f)
+            os.replace(path_tmp, os.path.join(path_state, BUILDUP_STATE_FILE))
+        finally:
+            if os.path.exists(path_tmp):
+                os.remove(path_tmp)
+
+        kept = set(new_state['column_files']) | {new_state['index_file'], BUILDUP_STATE_FILE}
+        for file_name in os.listdir(path_state):
+            if file_name not in kept and not file_name.endswith('.tmp'):
+                os.remove(os.path.join(path_state, file_name))
+    except (OSError, pa.ArrowException):
+        pass
+
+
+def _write_ipc_file(path_file, table):
+    """
+    Write the Arrow table as an IPC file atomically, through a temporary file of the process and thread.
+    """
+    path_tmp = '{}.{}.{}.tmp'.format(path_file, os.getpid(), threading.get_ident())
+    try:
+        with pa.OSFile(path_tmp, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(path_tmp, path_file)
+    finally:
+        if os.path.exists(path_tmp):
+            os.remove(path_tmp)
+
+
 def _generate_df_lookup_in_scope():
     data = {
         "type": [
@@ -2616,20 +3406,21 @@ def _get_selected_online_video(request_json):
     return df_online_video
 
 
-def _update_df_lookup_in_scope(path_tables, label_object, df_lookup_in_scope):
+def _update_df_lookup_in_scope(path_tables, label_object, df_lookup_in_scope, campaign_par):
     """
     Check the presence of MTV, Sanoma Streaming services and MTV, Sanoma, Other (broadcaster) TV data in the contacts table.
     Then, update the lookup dataframe by setting to False values in columns whose name corresponds to missing atomic
     elements (or groups of them).
     """
-    df_contacts_by_target = _extract_df_from_json_file(path_tables, 'impacts_in_target')
+    df_contacts_by_target = _read_table(path_tables, 'impacts_in_target', campaign_par)
 
     col_to_filter = ['broadcaster', 'device_type', 'ad_type']
 
     if df_contacts_by_target.empty:
         df_contacts_by_target[col_to_filter] = None
 
-    df_atomic_elements = df_contacts_by_target[col_to_filter].drop_duplicates()
+    # Labels are replaced on plain strings, the categories of the dimension columns are not renamed
+    df_atomic_elements = df_contacts_by_target[col_to_filter].drop_duplicates().astype(object)
 
     df_atomic_elements['broadcaster'] = df_atomic_elements['broadcaster'].replace(
         label_object['replace']['broadcaster'])
@@ -2676,21 +3467,681 @@ def _extract_df_from_json_file(path_tables, table_name):
     """
     Return the pandas dataframe from the report_table attribute of the json file from the API
 
+    When pyarrow is installed the parsed table is also stored as a columnar snapshot next to the json file, and
+    the following reads load the snapshot instead of parsing the json again.
+
+    :param str path_tables: path of the directory which the json files are stored
+    :return: pd.DataFrame
+    """
+    path_json = os.path.join(path_tables, table_name + '.json')
+
+    df_table = _read_table_snapshot(path_json)
+    if df_table is not None:
+        return df_table
+
+    json_report = _load_json_file(path_json)
+
+    df_table = _build_df_from_report_table(json_report['report_table'], REPORT_TABLE_SCHEMA.get(table_name))
+    if df_table is None:
+        df_table = pd.DataFrame.from_dict(json_report['report_table'])
+        if 'date' in df_table.columns:
+            df_table['date'] = pd.to_datetime(df_table['date'])
+        if 'start_date' in df_table.columns:
+            df_table['start_date'] = pd.to_datetime(df_table['start_date'])
+        if 'end_date' in df_table.columns:
+            df_table['end_date'] = pd.to_datetime(df_table['end_date'])
+
+    _write_table_snapshot(path_json, df_table)
+
+    return df_table
+
+
+def _load_json_file(path_json):
+    """
+    Decode the json file with orjson when installed, with the standard library otherwise.
+    """
+    if orjson is not None:
+        with open(path_json, 'rb') as f:
+            return orjson.loads(f.read())
+
+    with open(path_json) as f:
+        return json.load(f)
+
+
+def _build_df_from_report_table(report_table, schema):
+    """
+    Build the dataframe column by column from the rows of the report_table, casting each column to the type found
+    in the schema and parsing the dates as ISO 8601 days.
+    Return None when the table has no known schema, is empty, or its rows do not match the schema, so that the
+    caller can fall back to the pandas type inference.
+
+    :param list report_table: rows of the report_table attribute of the json file
+    :param dict schema: column name -> numpy/pandas type, taken from REPORT_TABLE_SCHEMA
+    :return: pd.DataFrame or None
+    """
+    if not schema or not report_table:
+        return None
+
+    # Keep the column order of the json file
+    col_names = list(report_table[0].keys())
+    if set(col_names) != set(schema):
+        return None
+
+    dict_col = dict()
+    try:
+        for col in col_names:
+            values = [row[col] for row in report_table]
+            col_type = schema[col]
+            if col_type == 'datetime64[ns]':
+                # Dates are ISO 8601 days (YYYY-MM-DD): a finer unit means the column holds datetimes instead
+                array_col = np.array(values, dtype='datetime64')
+                if array_col.dtype != np.dtype('datetime64[D]'):
+                    return None
+                dict_col[col] = array_col.astype('datetime64[ns]')
+            elif col_type == 'int64':
+                array_col = np.asarray(values)
+                if array_col.dtype.kind != 'i':
+                    return None
+                dict_col[col] = array_col.astype(np.int64, copy=False)
+            elif col_type == 'float64':
+                dict_col[col] = np.asarray(values, dtype=np.float64)
+            else:
+                dict_col[col] = np.asarray(values, dtype=object)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    return pd.DataFrame(dict_col)
+
+
+def _file_sha256(path_file):
+    sha256 = hashlib.sha256()
+    with open(path_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _read_table_snapshot(path_json):
+    """
+    Return the dataframe stored in the snapshot of the json file, or None if the snapshot is missing or stale.
+
+    The snapshot is valid if size and modification time of the json file are the ones recorded when it was written.
+    If only the modification time changed (e.g. the file was copied) the content hash decides, and a valid snapshot
+    is rewritten with the new modification time.
+
+    :param str path_json: path of the json file from the API
+    :return: pd.DataFrame or None
+    """
+    path_snapshot = os.path.splitext(path_json)[0] + TABLE_SNAPSHOT_EXTENSION
+    if pa is None or not os.path.isfile(path_snapshot):
+        return None
+
+    stat_json = os.stat(path_json)
+    try:
+        with pa.memory_map(path_snapshot) as source:
+            reader = pa.ipc.open_file(source)
+            metadata = reader.schema.metadata or dict()
+            if metadata.get(b'json_size') != str(stat_json.st_size).encode():
+                return None
+            is_same_mtime = metadata.get(b'json_mtime_ns') == str(stat_json.st_mtime_ns).encode()
+            if not is_same_mtime and metadata.get(b'json_sha256') != _file_sha256(path_json).encode():
+                return None
+            df_table = reader.read_all().to_pandas()
+    except (OSError, pa.ArrowException):
+        return None
+
+    if not is_same_mtime:
+        _write_table_snapshot(path_json, df_table)
+
+    return df_table
+
+
+def _write_table_snapshot(path_json, df_table):
+    """
+    Store the dataframe as an Arrow IPC file next to the json file, together with size, modification time and hash
+    of the json file used to invalidate it.
+    Nothing is written if pyarrow is not installed; a directory which is not writable is silently skipped.
+
+    :param str path_json: path of the json file from the API
+    :param pd.DataFrame df_table: dataframe parsed from the json file
+    """
+    if pa is None:
+        return
+
+    path_snapshot = os.path.splitext(path_json)[0] + TABLE_SNAPSHOT_EXTENSION
+    stat_json = os.stat(path_json)
+    try:
+        table = pa.Table.from_pandas(df_table, preserve_index=False)
+        metadata = dict(table.schema.metadata or dict())
+        metadata.update({
+            b'json_size': str(stat_json.st_size).encode(),
+            b'json_mtime_ns': str(stat_json.st_mtime_ns).encode(),
+            b'json_sha256': _file_sha256(path_json).encode()
+        })
+        # The workers of a pool missing the same snapshot write it through their own temporary files
+        _write_ipc_file(path_snapshot, table.replace_schema_metadata(metadata))
+    except (OSError, pa.ArrowException):
+        pass
+
+
+def _read_table(path_tables, table_name, campaign_par):
+    """
+    Return the table from the per-request table store found in campaign_par['table_store'].
+    The json file is read and parsed only the first time a (path_tables, table_name) couple is requested; the
+    following calls get a shallow copy of the stored dataframe, so columns can be added or replaced freely but
+    values must never be modified in place.
+    If campaign_par['dimension_categories'] is set, the dimension columns are stored as ordered Categoricals.
+    If no table store is available the json file is read every time.
+
     :param str path_tables: path of the directory which the json files are stored
+    :param str table_name: name of the json file without extension
+    :param campaign_par:
     :return: pd.DataFrame
     """
-    with open(os.path.join(path_tables, table_name + '.json')) as f:
-        json_report = json.load(f)
-    df_table = pd.DataFrame.from_dict(json_report['report_table'])
-    if 'date' in df_table.columns:
-        df_table['date'] = pd.to_datetime(df_table['date'])
-    if 'start_date' in df_table.columns:
-        df_table['start_date'] = pd.to_datetime(df_table['start_date'])
-    if 'end_date' in df_table.columns:
-        df_table['end_date'] = pd.to_datetime(df_table['end_date'])
+    table_store = campaign_par.get('table_store')
+    table_reads = campaign_par.get('table_reads')
+    if table_store is None:
+        df_table = _extract_df_from_json_file(path_tables, table_name)
+        if table_reads is not None:
+            table_reads[(os.path.normpath(path_tables), table_name)] = len(df_table)
+        return df_table
+
+    key = (os.path.normpath(path_tables), table_name)
+    if key not in table_store:
+        if campaign_par.get('streaming_ingest') and table_name in STREAMING_AGGREGATE_TABLES:
+            df_table = _extract_aggregated_df_from_json_stream(path_tables, table_name)
+        else:
+            df_table = _extract_df_from_json_file(path_tables, table_name)
+        if campaign_par.get('dimension_categories'):
+            df_table = _to_ordered_categoricals(df_table, campaign_par['dimension_categories'])
+        table_store[key] = df_table
+    if table_reads is not None:
+        # Rows of the tables read, recorded while profiling (see _profile_call)
+        table_reads[key] = len(table_store[key])
+
+    return table_store[key].copy(deep=False)
+
+
+def _dimension_categories(label_object, target_name):
+    """
+    Categories of each column of DIMENSION_COLUMNS: the order of label_object['order'] if defined, then the other
+    labels of label_object['replace']; the targets of the campaign for target_name.
+    """
+    dimension_categories = dict()
+    for x in DIMENSION_COLUMNS:
+        if x == 'target_name':
+            categories = list(target_name)
+        else:
+            categories = label_object['order'].get(x, list()) + list(label_object['replace'].get(x, dict()).keys())
+        dimension_categories[x] = list(dict.fromkeys(categories))
+    return dimension_categories
+
+
+def _to_ordered_categoricals(df_table, dimension_categories):
+    """
+    Convert the dimension columns of the table to ordered Categoricals: sorting, grouping and pivoting then work on
+    small integer codes instead of hashing strings. The values missing in dimension_categories are appended to the
+    categories, in lexicographic order, so no value is lost.
+    Only the observed values must be used when grouping (observed=True).
+    """
+    for x, categories in dimension_categories.items():
+        if x in df_table.columns and df_table[x].dtype == object:
+            values = pd.Categorical(df_table[x])
+            known = set(categories)
+            categories = categories + [y for y in values.categories if y not in known]
+            df_table[x] = values.set_categories(categories, ordered=True)
     return df_table
 
 
+class UniverseIndex:
+    """
+    Universe of the targets and of the sex and age groups of a request by date, built once from the tables
+    target_universe and universe_by_sex_age and shared by all the TRPs and reach conversions.
+
+    Each kind of universe ("target": target_name, "sexage": sex x age_break) is stored as a matrix keys x dates, NaN
+    where the API has no universe. The policy selects the universe dividing the impacts (TRPs) and multiplying the
+    reach percentages (absolute reach):
+    - "first_day": universe of the first date of the table, the default
+    - "last_day": universe of the last date of the table
+    - "mean": average universe over the dates of the table
+    - "daily": universe of the date of each value, the dates missing from the table taking the previous date (or the
+      first one); the values which are not by date, such as the totals of the campaign, use "mean"
+    Every policy is a column or a reduction of the matrices, so switching policy does not read the tables again.
+    """
+    KINDS = {
+        'target': ('target_universe', ['target_name'], 'target_universe'),
+        'sexage': ('universe_by_sex_age', ['sex', 'age_break'], 'universe')
+    }
+
+    def __init__(self, tables, policy='first_day'):
+        """
+        :param dict tables: kind -> dataframe of its table from the API
+        :param str policy: policy used when a method is called without one, see UNIVERSE_POLICIES
+        """
+        self.policy = self._check_policy(policy)
+        self.matrices = dict()
+        self.dtypes = dict()
+        for kind, df in tables.items():
+            _, keys, universe_col = self.KINDS[kind]
+            # Keys in the order of the table, dates sorted
+            matrix = df.pivot_table(index=keys, columns='date', values=universe_col, aggfunc='first', observed=True,
+                                    sort=False)
+            self.matrices[kind] = matrix.sort_index(axis=1).astype(float)
+            self.dtypes[kind] = df[universe_col].dtype
+
+    def _check_policy(self, policy):
+        policy = self.policy if policy is None else policy
+        if policy not in UNIVERSE_POLICIES:
+            raise ValueError(f"Unknown universe policy {policy}, use one of {UNIVERSE_POLICIES}")
+        return policy
+
+    def universe(self, kind, policy=None):
+        """
+        Universe of each key of the kind, without the keys having no universe.
+        """
+        policy = self._check_policy(policy)
+        matrix = self.matrices[kind]
+        if matrix.shape[1] == 0:
+            return pd.Series(index=matrix.index, dtype=self.dtypes[kind], name=self.KINDS[kind][2])
+
+        if policy in ['first_day', 'last_day']:
+            # A single date of the table, with its own type
+            universe = matrix.iloc[:, 0 if policy == 'first_day' else -1].dropna().astype(self.dtypes[kind])
+        else:
+            universe = matrix.mean(axis=1).dropna()
+            # A constant universe keeps the type of the table
+            if self.dtypes[kind].kind in 'iu' and np.array_equal(universe, np.round(universe)):
+                universe = universe.astype(self.dtypes[kind])
+        return universe.rename(self.KINDS[kind][2])
+
+    def by_date(self, kind, dates, policy=None):
+        """
+        Universe of each key of the kind (rows) on each of the dates (columns), NaN for the keys having no universe.
+        With a policy other than "daily" all the dates have the same universe.
+        """
+        policy = self._check_policy(policy)
+        dates = pd.DatetimeIndex(dates)
+        matrix = self.matrices[kind]
+        if policy != 'daily':
+            universe = self.universe(kind, policy).reindex(matrix.index)
+            return pd.DataFrame(np.repeat(universe.to_numpy(dtype=float)[:, None], len(dates), axis=1),
+                                index=matrix.index, columns=dates)
+
+        matrix = matrix.reindex(columns=matrix.columns.union(dates)).ffill(axis=1).bfill(axis=1)
+        return matrix.reindex(columns=dates)
+
+    def lookup(self, kind, keys, dates=None, policy=None):
+        """
+        Universe of each row given by the arrays of keys (one per key of the kind) and, with the "daily" policy, by
+        the array of dates; NaN for the rows having no universe.
+        """
+        policy = self._check_policy(policy)
+        keys = pd.MultiIndex.from_arrays(keys) if len(keys) > 1 else pd.Index(keys[0])
+        # The keys not found (position -1) take the trailing NaN
+        if policy != 'daily' or dates is None:
+            universe = self.universe(kind, policy)
+            return np.append(universe.to_numpy(dtype=float), np.nan)[universe.index.get_indexer(keys)]
+
+        dates = pd.DatetimeIndex(dates)
+        matrix = self.by_date(kind, dates.unique(), policy)
+        values = np.vstack([matrix.to_numpy(), np.full((1, matrix.shape[1]), np.nan)])
+        return values[matrix.index.get_indexer(keys), matrix.columns.get_indexer(dates)]
+
+    def fingerprint(self, kind, policy=None):
+        """
+        Hash of the universe of the kind the tables already computed depend on: with the "daily" policy the universe
+        of the first date, the following dates being assumed not restated by the API.
+        """
+        policy = self._check_policy(policy)
+        universe = self.universe(kind, 'first_day' if policy == 'daily' else policy)
+        digest = hashlib.sha1(policy.encode())
+        digest.update(pd.util.hash_pandas_object(universe).values.tobytes())
+        return digest.hexdigest()
+
+
+@_memoize_shared
+def _universe_index(path_tables, label_object, campaign_par):
+    """
+    UniverseIndex of the request, with the policy campaign_par['universe_policy'].
+    """
+    tables = {kind: _read_table(path_tables, table_name, campaign_par)
+              for kind, (table_name, _, _) in UniverseIndex.KINDS.items()}
+    return UniverseIndex(tables, campaign_par.get('universe_policy', 'first_day'))
+
+
+@_memoize_shared
+def _contacts_cube_target(path_tables, label_object, campaign_par):
+    """
+    Contacts cube of impacts_in_target, on the axes date x broadcaster x device_type x ad_type x target_name.
+    """
+    df_contact_target = _read_table(path_tables, 'impacts_in_target', campaign_par)
+    return _build_contacts_cube(df_contact_target, ['date', 'broadcaster', 'device_type', 'ad_type', 'target_name'],
+                                label_object, campaign_par)
+
+
+@_memoize_shared
+def _contacts_cube_sexage(path_tables, label_object, campaign_par):
+    """
+    Contacts cube of impacts_by_sex_age, on the axes date x broadcaster x device_type x ad_type x sex x age_break.
+    """
+    df_contact_sexage = _read_table(path_tables, 'impacts_by_sex_age', campaign_par)
+    return _build_contacts_cube(df_contact_sexage, ['date', 'broadcaster', 'device_type', 'ad_type', 'sex',
+                                                    'age_break'], label_object, campaign_par)
+
+
+def _build_contacts_cube(df, dims, label_object, campaign_par):
+    """
+    Dense cube of the impacts of df, built once per campaign and shared by all the contacts tables, which are then
+    slices and sums of the cube (see _densify_cube).
+    The axes are the dates of df and of the campaign, the targets of the campaign and the labels of the other
+    dimensions; the rows of df with a value out of the axes are dropped, as the scaffolds of the contacts tables do.
+    The rows without a date are kept on a last NaT position, so they only count in the totals over the dates.
+
+    :return: {'axes': {dimension: pd.Index}, 'num_impacts': np.ndarray, 'num_30sec_eq_impacts': np.ndarray}
+    """
+    metrics = ['num_impacts', 'num_30sec_eq_impacts']
+    if df.empty:
+        df = pd.DataFrame({x: pd.Series(dtype=REPORT_TABLE_SCHEMA['impacts_in_target'].get(x, 'object'))
+                           for x in dims + metrics})
+
+    axes = dict()
+    for x in dims:
+        if x == 'date':
+            axes[x] = pd.DatetimeIndex(df['date'].dropna().unique()).union(campaign_par['df_date_range']['date'])
+            if df['date'].hasnans:
+                axes[x] = axes[x].append(pd.DatetimeIndex([pd.NaT]))
+        elif x == 'target_name':
+            axes[x] = pd.Index(campaign_par['target_name']).unique()
+        else:
+            axes[x] = pd.Index(list(label_object['replace'][x].keys()))
+
+    return _build_cube(df, axes, metrics)
+
+
+def _build_cube(df, axes, metrics):
+    """
+    Dense cube of the sums of the metrics of df on the axes: the cell of each row is given by the position of its
+    value on the axis of each column, the rows with a value out of an axis are dropped.
+
+    :param dict axes: column -> pd.Index of its values
+    :return: {'axes': axes, metric: np.ndarray of shape (len(axis) for axis in axes)}
+    """
+    codes = [_axis_codes(axis, df[x]) for x, axis in axes.items()]
+
+    shape = tuple(len(x) for x in axes.values())
+    valid = np.all(np.stack(codes) >= 0, axis=0) if codes else np.zeros(0, dtype=bool)
+    flat = np.ravel_multi_index([x[valid] for x in codes], shape)
+
+    cube = {'axes': axes}
+    for metric in metrics:
+        weights = np.nan_to_num(df[metric].to_numpy(dtype='float64')[valid])
+        cube[metric] = np.bincount(flat, weights=weights, minlength=int(np.prod(shape))).reshape(shape)
+
+    return cube
+
+
+def _axis_codes(axis, values):
+    """
+    Position of each value on the axis, -1 for the values not found; the missing values take the position of the
+    missing value of the axis, if any.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Positions of the categories on the axis, the last one (-1) for the missing values
+        positions = np.append(axis.get_indexer(values.cat.categories), -1)
+        codes = positions[values.cat.codes.to_numpy()]
+    else:
+        codes = axis.get_indexer(values)
+
+    if axis.hasnans:
+        codes[values.isna().to_numpy()] = np.flatnonzero(axis.isna())[0]
+
+    return codes
+
+
+@_memoize_shared
+def _rf_cube(path_tables, label_object, campaign_par):
+    """
+    Cube of rf_in_target_overall, reach by exact frequency on the axes target_name x broadcaster x ad_type x
+    frequency, the frequencies going from 1 to max_freq. Shared by the reach & frequency tables (tabrf, tabsummary
+    and the Excel "Reach & Frequency" sheet) through _rf_kernel.
+    """
+    df_reach_target = _read_table(path_tables, 'rf_in_target_overall', campaign_par)
+    if df_reach_target.empty:
+        df_reach_target = pd.DataFrame({x: pd.Series(dtype=y)
+                                        for x, y in REPORT_TABLE_SCHEMA['rf_in_target_overall'].items()})
+
+    axes = {
+        'target_name': pd.Index(campaign_par['target_name']).unique(),
+        'broadcaster': pd.Index(list(label_object['replace']['broadcaster'].keys())),
+        'ad_type': pd.Index(list(label_object['replace']['ad_type'].keys())),
+        'frequency': pd.RangeIndex(1, campaign_par['max_freq'] + 1)
+    }
+    return _build_cube(df_reach_target, axes, ['reach'])
+
+
+def _rf_kernel(rf_cube, scale=None):
+    """
+    Reach and frequency analytics of a cube of reach by exact frequency (the frequency being its last axis), in one
+    vectorized pass:
+    - reach_plus: reach at N+ frequency, the cumulative sum from the highest frequency;
+    - reach_1plus: reach at 1+ frequency;
+    - average_frequency: average frequency of the reached population, weighted by the reach of each frequency (the
+      frequencies above the last one of the cube are counted as the last one).
+    The effective reach at any threshold is read from reach_plus with _rf_effective_reach.
+
+    :param scale: optional array multiplying the reach, broadcast on the leading axes (e.g. universe by target)
+    :return: dict with the axes of the cube and the arrays above; average_frequency has no frequency axis
+    """
+    reach = rf_cube['reach']
+    if scale is not None:
+        scale = np.asarray(scale, dtype='float64')
+        reach = reach * scale.reshape(scale.shape + (1,) * (reach.ndim - scale.ndim))
+
+    frequency = np.asarray(rf_cube['axes']['frequency'], dtype='float64')
+    reach_plus = np.cumsum(reach[..., ::-1], axis=-1)[..., ::-1]
+    reach_1plus = reach_plus[..., 0] if reach.shape[-1] else np.zeros(reach.shape[:-1])
+    contacts = reach @ frequency
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average_frequency = np.where(reach_1plus != 0, contacts / np.where(reach_1plus != 0, reach_1plus, 1), 0)
+
+    return {'axes': rf_cube['axes'], 'reach_plus': reach_plus, 'reach_1plus': reach_1plus,
+            'average_frequency': average_frequency}
+
+
+def _rf_effective_reach(rf, threshold):
+    """
+    Effective reach at the threshold frequency (reach threshold+), from the output of _rf_kernel.
+    """
+    return rf['reach_plus'][..., list(rf['axes']['frequency']).index(threshold)]
+
+
+def _extract_aggregated_df_from_json_stream(path_tables, table_name):
+    """
+    Return the table aggregated by all its dimensions, summing the metrics found in STREAMING_AGGREGATE_TABLES.
+    The report_table is parsed incrementally and only one accumulator per distinct key is kept in memory, so the
+    full list of rows is never materialised. Every consumer of these tables groups by a subset of the dimensions,
+    hence the aggregated table gives the same results as the original one.
+
+    :param str path_tables: path of the directory which the json files are stored
+    :param str table_name: name of the json file without extension, key of STREAMING_AGGREGATE_TABLES
+    :return: pd.DataFrame
+    """
+    schema = REPORT_TABLE_SCHEMA[table_name]
+    col_value = STREAMING_AGGREGATE_TABLES[table_name]
+    col_key = [x for x in schema if x not in col_value]
+
+    accumulators = dict()
+    for row in _iter_report_table_rows(os.path.join(path_tables, table_name + '.json')):
+        key = tuple(row[x] for x in col_key)
+        acc = accumulators.get(key)
+        if acc is None:
+            acc = accumulators[key] = [0.0] * len(col_value)
+        for i, x in enumerate(col_value):
+            if row[x] is not None:
+                acc[i] += row[x]
+
+    if not accumulators:
+        return pd.DataFrame()
+
+    df_table = pd.DataFrame(list(accumulators.keys()), columns=col_key)
+    df_table[col_value] = pd.DataFrame(list(accumulators.values()), columns=col_value, dtype=np.float64)
+    for col in col_key:
+        if schema[col] == 'datetime64[ns]':
+            df_table[col] = pd.to_datetime(df_table[col])
+
+    return df_table[list(schema)]
+
+
+def _iter_report_table_rows(path_json, chunk_size=1 << 20):
+    """
+    Yield one by one the rows of the report_table array of the json file, reading it by chunks.
+    ijson is used when installed, otherwise each row is decoded with json.JSONDecoder.raw_decode.
+
+    :param str path_json: path of the json file from the API
+    :param int chunk_size: number of characters read from the file at a time
+    """
+    if ijson is not None:
+        with open(path_json, 'rb') as f:
+            yield from ijson.items(f, 'report_table.item', use_float=True)
+        return
+
+    decoder = json.JSONDecoder()
+    with open(path_json) as f:
+        # Move to the opening bracket of the report_table array
+        buffer = ''
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+            pos_key = buffer.find('"report_table"')
+            pos_array = buffer.find('[', pos_key) if pos_key >= 0 else -1
+            if pos_array >= 0:
+                break
+            if not chunk:
+                raise ValueError(f"report_table not found in {path_json}")
+
+        idx = pos_array + 1
+        while True:
+            # Skip separators between rows, reading a new chunk when the buffer is exhausted
+            while idx < len(buffer) and buffer[idx] in ' \t\r\n,':
+                idx += 1
+            if idx == len(buffer):
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise ValueError(f"Unterminated report_table in {path_json}")
+                buffer, idx = buffer[idx:] + chunk, 0
+                continue
+
+            if buffer[idx] == ']':
+                return
+
+            try:
+                row, idx = decoder.raw_decode(buffer, idx)
+            except json.JSONDecodeError:
+                # The row is split between two chunks
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer, idx = buffer[idx:] + chunk, 0
+                continue
+
+            yield row
+
+
+class LabelResolver(dict):
+    """
+    label_objects.json compiled once: behaves as the dict read from the file and holds, for broadcaster, device_type
+    and ad_type, the lookup arrays indexed by the position of each label in label_object['replace'] and ['order']:
+    - the replacement labels and the ranks in label_object['order'];
+    - the "Type" string of the rows of the contacts tables (broadcaster x device_type x ad_type) and of the rf and
+      summary tables (broadcaster x ad_type), with the mask of the ones found in valid_engagement_type.
+    Labelling, ordering and filtering the rows are then array lookups on the positions of the labels.
+    Every lookup array ends with the value used for the unknown labels (position -1).
+    """
+    dimensions = ['broadcaster', 'device_type', 'ad_type']
+
+    def __init__(self, label_object):
+        super().__init__(label_object)
+        # The labels of label_object['order'] without replacement are kept as they are
+        replace = {x: dict({y: y for y in self['order'][x]}, **self['replace'][x]) for x in self.dimensions}
+        self.positions = {x: pd.Index(list(replace[x])) for x in self.dimensions}
+        self.labels = {x: np.array(list(replace[x].values()) + [None], dtype=object) for x in self.dimensions}
+        self.ranks = {x: np.append(_order_codes(self.positions[x], self['order'][x]), -1) for x in self.dimensions}
+
+        # Type of every combination of labels; the device type is not shown for linear_static (TV)
+        labels = {x: self.labels[x][:-1] for x in self.dimensions}
+        is_linear_static = self.positions['ad_type'] == 'linear_static'
+        grid = list(np.meshgrid(labels['broadcaster'], labels['device_type'], labels['ad_type'], indexing='ij'))
+        grid[1] = np.where(is_linear_static[np.newaxis, np.newaxis, :], '', grid[1])
+        self.row_types = {
+            'contacts': _join_labels(grid, ' '),
+            'rf': _join_labels(np.meshgrid(labels['broadcaster'], labels['ad_type'], indexing='ij'), ' ')
+        }
+        self.row_types['summary'] = self.row_types['rf']
+        valid = set(self['valid_engagement_type'])
+        self.valid_types = {k: np.isin(v, list(valid)) for k, v in self.row_types.items()}
+
+        # Code of the ad_type each Type is built from, the totals of the tables of Types being rollups of these codes
+        ad_types = np.asarray(self.positions['ad_type'], dtype=object)
+        self.type_ad_types = dict(zip(self.row_types['rf'].ravel(),
+                                      np.broadcast_to(ad_types, self.row_types['rf'].shape).ravel()))
+        for row_type, ad_type in zip(self.row_types['contacts'].ravel(),
+                                     np.broadcast_to(ad_types, self.row_types['contacts'].shape).ravel()):
+            self.type_ad_types.setdefault(row_type, ad_type)
+
+    @classmethod
+    def compile(cls, label_object):
+        """
+        Return label_object if already compiled, otherwise compile it.
+        """
+        return label_object if isinstance(label_object, cls) else cls(label_object)
+
+    def codes(self, dimension, values):
+        """
+        Position of each value in the labels of the dimension, -1 for the values not found.
+        """
+        values = pd.Series(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            positions = np.append(self.positions[dimension].get_indexer(values.cat.categories), -1)
+            return positions[values.cat.codes.to_numpy()]
+        return self.positions[dimension].get_indexer(values)
+
+    def rank(self, dimension, values):
+        """
+        Position of each value in label_object['order'][dimension], -1 for the values not found.
+        """
+        return self.ranks[dimension][self.codes(dimension, values)]
+
+    def replace(self, dimension, values):
+        """
+        Replacement label of each value, the values without replacement are kept.
+        """
+        codes = self.codes(dimension, values)
+        return np.where(codes >= 0, self.labels[dimension][codes], np.asarray(values, dtype=object))
+
+    def row_type(self, df, tab_type):
+        """
+        "Type" of each row of df and mask of the valid ones, None if a label is unknown.
+        """
+        dimensions = self.dimensions if tab_type == 'contacts' else ['broadcaster', 'ad_type']
+        codes = tuple(self.codes(x, df[x]) for x in dimensions)
+        if any((x < 0).any() for x in codes):
+            return None
+        return self.row_types[tab_type][codes], self.valid_types[tab_type][codes]
+
+    def ad_type(self, types):
+        """
+        Code of the ad_type of each Type of the tables, None for the Types not built from the labels.
+        """
+        return np.array([self.type_ad_types.get(x) for x in types], dtype=object)
+
+
+def _join_labels(grid, sep):
+    """
+    Labels of a grid of combinations joined with sep, skipping the empty ones.
+    """
+    return np.frompyfunc(lambda *x: sep.join([y for y in x if y != '']), len(grid), 1)(*grid).astype(object)
+
+
 def _format_rows(df, label_object, tab_type='contacts'):
     # Filter out rows with all 0s
     if '_total' in df.columns:
@@ -2708,14 +4159,21 @@ def _format_rows(df, label_object, tab_type='contacts'):
     else:
         raise ValueError("Specify a type of metric")
 
-    # Concat labels
-    df['_label_row'] = _concat_labels(df, col_to_use, " ")
+    # Concat labels: lookup of the precompiled Type of the labels, if they are all known
+    row_type = LabelResolver.compile(label_object).row_type(df, tab_type)
+    if row_type is None:
+        df['_label_row'] = _concat_labels(df, col_to_use, " ")
+    else:
+        df['_label_row'] = row_type[0]
 
     # Drop columns
     df = _drop_columns(df)
 
     # Filter only valid engagement types
-    df = _filter_valid_engagement_type(df, label_object, ['Type'])
+    if row_type is None:
+        df = _filter_valid_engagement_type(df, label_object, ['Type'])
+    else:
+        df = df[row_type[1]].reset_index(drop=True)
 
     return df
 
@@ -2749,18 +4207,12 @@ def _normalize_campaign_name(name):
 def _sort_labels(df, label_object, tab_type):
     col_to_sort = list()
     df = df.copy(deep=True)
-    if 'broadcaster' in df.columns:
-        df['_order_broadcaster'] = df['broadcaster'].apply(
-            lambda x: label_object['order']['broadcaster'].index(x))
-        col_to_sort.append('_order_broadcaster')
-    if 'device_type' in df.columns:
-        df['_order_device_type'] = df['device_type'].apply(
-            lambda x: label_object['order']['device_type'].index(x))
-        col_to_sort.append('_order_device_type')
-    if 'ad_type' in df.columns:
-        df['_order_ad_type'] = df['ad_type'].apply(
-            lambda x: label_object['order']['ad_type'].index(x))
-        col_to_sort.append('_order_ad_type')
+    # Rank of the labels in label_object['order']
+    label_resolver = LabelResolver.compile(label_object)
+    for x in label_resolver.dimensions:
+        if x in df.columns:
+            df['_order_' + x] = label_resolver.rank(x, df[x])
+            col_to_sort.append('_order_' + x)
 
     if tab_type == 'contacts':
         sorting_order = label_object['order']['tab_order_contacts']
@@ -2777,18 +4229,24 @@ def _sort_labels(df, label_object, tab_type):
     return df
 
 
+def _order_codes(values, order):
+    """
+    Position of each value in order, -1 for the values not in order.
+    """
+    return pd.Categorical(values, categories=order, ordered=True).codes.astype('int64')
+
+
 def _custom_labels(df, label_object):
+    label_resolver = LabelResolver.compile(label_object)
     if 'broadcaster' in df.columns:
-        df['_label_broadcaster'] = df['broadcaster'].replace(
-            label_object['replace']['broadcaster'])
+        df['_label_broadcaster'] = label_resolver.replace('broadcaster', df['broadcaster'])
 
     if 'device_type' in df.columns:
-        df['_label_device_type'] = df['device_type'].replace(
-            label_object['replace']['device_type'])
+        df['_label_device_type'] = label_resolver.replace('device_type', df['device_type'])
         df.loc[df['ad_type'] == 'linear_static', '_label_device_type'] = ''
 
     if 'ad_type' in df.columns:
-        df['_label_ad_type'] = df['ad_type'].replace(label_object['replace']['ad_type'])
+        df['_label_ad_type'] = label_resolver.replace('ad_type', df['ad_type'])
 
 
 def _compute_summary_table(campaign_par, element_obj, label_attribute_element, label_object, path_output_json,
@@ -2801,8 +4259,7 @@ def _compute_summary_table(campaign_par, element_obj, label_attribute_element, l
                                                                                                  campaign_par)
     df_rf_perc = postprocessing_standard_tabsummary_df_contactreach_reach_target_perc(path_tables, label_object,
                                                                                       campaign_par)
-    df_universe_by_target = _extract_df_from_json_file(path_tables, 'target_universe')
-    df_universe_by_target = df_universe_by_target[['target_name', 'target_universe']].drop_duplicates()
+    df_universe_by_target = _universe_index(path_tables, label_object, campaign_par).universe('target').reset_index()
     df_universe_by_target = df_universe_by_target.rename(columns={'target_name': 'Target name',
                                                                   'target_universe': 'Target universe'})
 
@@ -2832,7 +4289,8 @@ def _compute_summary_table(campaign_par, element_obj, label_attribute_element, l
 
     # Write json
     p = _write_dict(df_merge_rf, path_output_json, label_attribute_element,
-                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']))
+                    (element_obj['min_default_zoom'], element_obj['max_default_zoom']), campaign_par,
+                    element_obj.get('payload', 'records'))
     return p
 
 
@@ -2849,151 +4307,105 @@ def _zip_files(folder_path, zip_name, file_to_zip, children_request):
 
 
 def _compute_avg_frequency(df):
-    df_average_freq = df[['target_name', 'broadcaster', 'ad_type', 'frequency', 'reach']]
-    df_average_freq = df_average_freq.rename(columns={'frequency': 'num_frequency', 'reach': 'num_reach'})
-    wm = lambda x: np.average(x, weights=df_average_freq.loc[x.index, "num_reach"])
-    df_average_freq = df_average_freq.groupby(['target_name', 'broadcaster', 'ad_type'], as_index=False).agg(
-        average_freq=("num_frequency", wm)).round(3)
-    return df_average_freq
+    """
+    Average frequency weighted by the reach, by target, broadcaster and ad type: sum(frequency * reach) / sum(reach)
+    with two grouped sums, as _rf_kernel computes it on the rf cube.
+    """
+    df_average_freq = df[['target_name', 'broadcaster', 'ad_type']].assign(num_contacts=df['frequency'] * df['reach'],
+                                                                            num_reach=df['reach'])
+    df_average_freq = df_average_freq.groupby(['target_name', 'broadcaster', 'ad_type'], as_index=False,
+                                              observed=True).sum()
+    df_average_freq['average_freq'] = (df_average_freq['num_contacts'] / df_average_freq['num_reach']).round(3)
+    return df_average_freq.drop(columns=['num_contacts', 'num_reach'])
 
 
+@_memoize_frame
 def _compute_contacts_abs_target(path_tables, label_object, campaign_par):
-    # Read campaign data
-    target_list = campaign_par['target_name']
-
-    # Read table
-    df_contact_target = _extract_df_from_json_file(path_tables, 'impacts_in_target')
-
-    col_to_group = ['broadcaster', 'ad_type', 'target_name']
-
-    if df_contact_target.empty:
-        df_contact_target[col_to_group + ['num_impacts']] = None
-
-    # Group data
-    df_contact_target = df_contact_target.groupby(col_to_group, as_index=False)['num_impacts'].sum()
-
-    # Compute Contacts Totals including Online video
-    df_target_total_all_onlinevideo = df_contact_target.groupby(['target_name'], as_index=False)['num_impacts'].sum()
-    df_target_total_all_onlinevideo['broadcaster'] = 'all'
-    df_target_total_all_onlinevideo['ad_type'] = 'all_onlinevideo'
-
-    # Compute Contacts Totals Linear and BVOD
-    mask = df_contact_target['ad_type'].isin(['linear_static', 'dynamic'])
-    df_target_total_all = df_contact_target[mask].groupby(['target_name'], as_index=False)['num_impacts'].sum()
-    df_target_total_all['broadcaster'] = 'all'
-    df_target_total_all['ad_type'] = 'all'
-
-    # Compute Contacts Linear Total
-    mask = df_contact_target['ad_type'] == 'linear_static'
-    df_target_total_linear = df_contact_target[mask].groupby(['target_name'], as_index=False)['num_impacts'].sum()
-    df_target_total_linear['broadcaster'] = 'all'
-    df_target_total_linear['ad_type'] = 'linear_static'
-
-    # Compute Contacts BVOD Total
-    mask = df_contact_target['ad_type'] == 'dynamic'
-    df_target_total_dynamic = df_contact_target[mask].groupby(['target_name'], as_index=False)['num_impacts'].sum()
-    df_target_total_dynamic['broadcaster'] = 'all'
-    df_target_total_dynamic['ad_type'] = 'dynamic'
-
-    # Concat Totals
-    df_contact_target_total = pd.concat(
-        [df_contact_target, df_target_total_linear, df_target_total_dynamic, df_target_total_all,
-         df_target_total_all_onlinevideo], ignore_index=True)
-
-    # Scaffolding
-    df_scaffolding = _scaffolding_rf(col_to_group, label_object, target_name=target_list)
-
-    df_contact_target_total = df_scaffolding.merge(df_contact_target_total, how='left', on=col_to_group)
-    df_contact_target_total['num_impacts'] = df_contact_target_total['num_impacts'].fillna(0)
-
-    df_contact_target_total = df_contact_target_total.set_index(['target_name', 'broadcaster', 'ad_type'])
-
-    df_contact_target_total['_total'] = df_contact_target_total.sum(axis=1)
-    df_contact_target_total = df_contact_target_total.reset_index()
-
-    # Add Custom labels
-    _custom_labels(df_contact_target_total, label_object)
-
-    # Flat dataframe
-    concat_index_columns = list(map(lambda x: ''.join(x), df_contact_target_total.columns.values))
-    df_contact_target_total.columns = concat_index_columns
+    """
+    Contacts by target and Type of the summary grouping sets, the same table as the contacts of the summary.
+    """
+    return postprocessing_standard_tabsummary_df_contactreach_contact_target_abs_raw(path_tables, label_object,
+                                                                                     campaign_par)
 
-    # Format rows order
-    df_contact_target_total = _format_rows(df_contact_target_total, label_object, tab_type='summary')
 
-    # Format columns order
-    df_contact_target_total = df_contact_target_total.rename(
-        columns={"target_name": "Target name", 'num_impacts': 'Contacts'})
-    df_contact_target_total = df_contact_target_total.drop(columns=['Total'])
-    col_target = [x for x in df_contact_target_total.columns if not x.startswith("Type")]
-    col_to_use = ['Type'] + col_target
-    df_contact_target_total = df_contact_target_total[col_to_use]
+def _compute_total(df, label_object):
+    """
+    Append the totals TV+Streaming services and TV+Streaming services+Online video to a table of Types.
 
-    return df_contact_target_total
+    :param df: The input dataframe
+    :return: The input dataframe including totals
+    """
+    return _append_type_totals(df, label_object, ['all', 'all_onlinevideo'])
 
 
-def _compute_total(df):
+def _compute_total_buildup(df, label_object):
     """
-    Note that:
-    - 'tv' stands for 'TV'
-    - 'ss' stands for 'Streaming services'
-    - 'ov' stands for 'Online video'
+    Append the totals TV+Streaming services+Online video and TV+Streaming services by target to a build-up table of
+    Types.
 
     :param df: The input dataframe
     :return: The input dataframe including totals
     """
-    # Keep only rows whose Type is Streaming services or TV
-    df_tv_ss = df[df['Type'].str.contains('Streaming services|TV')]
+    return _append_type_totals(df, label_object, ['all_onlinevideo', 'all'], by=['Target name'])
 
-    # Compute Total TV, Streaming services and Online video
-    df_total_tv_ss_ov = df.set_index('Type').sum().round(1).to_frame().T
-    df_total_tv_ss_ov['Type'] = 'TV+Streaming services+Online video'
 
-    is_online_video_present = df['Type'].str.contains('Online video').any()
-
-    # Compute Total TV and Streaming services
-    df_total_tv_ss = df_tv_ss.set_index('Type').sum().round(1).to_frame().T
-    df_total_tv_ss['Type'] = 'TV+Streaming services'
-
-    df = pd.concat([df, df_total_tv_ss, df_total_tv_ss_ov], ignore_index=True)
+def _append_type_totals(df, label_object, totals, by=None):
+    """
+    Append to a table of Types the rows of the totals of ad_type of ROLLUP_HIERARCHY, by the columns by if any,
+    rounded to the first decimal. The ad_type code of each row is the one its Type is built from (see
+    LabelResolver.ad_type), whatever the labels; a total adding up the same ad_types of the table as a narrower total
+    (e.g. TV+Streaming services+Online video without online video) is dropped.
+    Without by, a total none of whose ad_types is in the table (e.g. TV+Streaming services of a campaign of online
+    video only) is a row of zeros, the sum of no rows; with by, the groups are those of the rows added up.
+    """
+    by = list() if by is None else by
+    values = [x for x in df.columns if x not in ['Type'] + by]
+    df_codes = df.assign(ad_type=LabelResolver.compile(label_object).ad_type(df['Type']))
 
-    if not is_online_video_present:
-        df = df[df['Type']!='TV+Streaming services+Online video']
+    hierarchy = ROLLUP_HIERARCHY['ad_type']
+    present = set(df_codes['ad_type'].dropna())
+    added = {x: present if hierarchy[x] is None else present.intersection(hierarchy[x]) for x in totals}
+    size = {x: float('inf') if hierarchy[x] is None else len(hierarchy[x]) for x in totals}
+    totals = [x for x in totals if not any(added[y] == added[x] and size[y] < size[x] for y in totals)]
 
-    return df
+    df_total = _rollup(df_codes, by + ['ad_type'], values, [{'ad_type': x} for x in totals]).round(1)
+    if not by:
+        df_total = df_total.set_index('ad_type').reindex(totals, fill_value=0).rename_axis('ad_type').reset_index()
+    df_total['Type'] = df_total['ad_type'].map(label_object['replace']['ad_type'])
 
+    return pd.concat([df, df_total.drop(columns=['ad_type'])], ignore_index=True)
 
-def _compute_total_buildup(df):
-    """
-    Note that:
-    - 'tv' stands for 'TV'
-    - 'ss' stands for 'Streaming services'
-    - 'ov' stands for 'Online video'
 
-    :param df: The input dataframe
-    :return: The input dataframe including totals
+def _rollup(df, keys, values, grouping_sets, hierarchy=None):
     """
-    # Keep only rows whose Type is Streaming services or TV
-    df_tv_ss = df[df['Type'].str.contains('Streaming services|TV')]
-
-    # Compute Total TV, Streaming services and Online video
-    df_total_tv_ss_ov = df.drop(columns=['Type'])
-    df_total_tv_ss_ov = df_total_tv_ss_ov.groupby(['Target name'], as_index=False).sum().round(1)
-    df_total_tv_ss_ov['Type'] = 'TV+Streaming services+Online video'
+    Rollups of the values of df for each grouping set, computed by a single groupby over the rows of all the sets.
 
-    is_online_video_present = df['Type'].str.contains('Online video').any()
+    A grouping set maps dimensions to a code: a total of the hierarchy (ROLLUP_HIERARCHY by default) adds up its
+    codes, any other code keeps only its rows. The keys not in the set are the groups of the rollup (e.g. target_name,
+    or the dates of a build-up table), sorted as by groupby.
 
-    # Compute Total TV and Streaming services
-    df_total_tv_ss = df_tv_ss.drop(columns=['Type'])
-    df_total_tv_ss = df_total_tv_ss.groupby(['Target name'], as_index=False).sum().round(1)
-    df_total_tv_ss['Type'] = 'TV+Streaming services'
+    :param list keys: key columns of df, the dimensions of the grouping sets and the groups
+    :param list values: columns to add up
+    :param list grouping_sets: list of {dimension: code}
+    :return: one block of rows per grouping set, in order, with the code of the set in its dimensions
+    """
+    hierarchy = ROLLUP_HIERARCHY if hierarchy is None else hierarchy
 
-    df = pd.concat([df, df_total_tv_ss_ov, df_total_tv_ss], ignore_index=True)
+    blocks = list()
+    for n, grouping_set in enumerate(grouping_sets):
+        mask = np.ones(len(df), dtype=bool)
+        for dimension, code in grouping_set.items():
+            codes = hierarchy.get(dimension, dict()).get(code, [code])
+            if codes is not None:
+                mask &= df[dimension].isin(codes).to_numpy()
+        blocks.append(df.loc[mask, keys + values].assign(_grouping_set=n, **grouping_set))
 
-    if not is_online_video_present:
-        df = df[df['Type']!='TV+Streaming services+Online video']
+    if not blocks:
+        return df[keys + values].iloc[:0]
 
-    return df
+    df_rollup = pd.concat(blocks, ignore_index=True)
+    df_rollup = df_rollup.groupby(['_grouping_set'] + keys, as_index=False, observed=True)[values].sum()
+    return df_rollup.drop(columns=['_grouping_set'])
 
 
 def _sort_labels_totals_first(df):
@@ -3045,6 +4457,7 @@ def _sort_by_target_name(df, col_name, tab_type):
     return df
 
 
+@_memoize_frame
 def _compute_contact_total_trp_raw(path_tables, label_object, campaign_par):
     """
 
@@ -3055,9 +4468,8 @@ def _compute_contact_total_trp_raw(path_tables, label_object, campaign_par):
     """
 
     # Read table
-    df_contact_sexage = _extract_df_from_json_file(path_tables, 'impacts_by_sex_age')
-    df_universe_by_sexage = _extract_df_from_json_file(path_tables, 'universe_by_sex_age')
-    df_universe_by_sexage = df_universe_by_sexage[df_universe_by_sexage['date'] == df_universe_by_sexage['date'].min()]
+    df_contact_sexage = _read_table(path_tables, 'impacts_by_sex_age', campaign_par)
+    universe = _universe_index(path_tables, label_object, campaign_par).universe('sexage')
 
     col_to_group = ['broadcaster', 'device_type', 'ad_type']
 
@@ -3065,20 +4477,18 @@ def _compute_contact_total_trp_raw(path_tables, label_object, campaign_par):
         df_contact_sexage[col_to_group + ['num_impacts']] = None
 
     # Group data
-    df_contact_sexage = df_contact_sexage.groupby(col_to_group, as_index=False)['num_impacts'].sum()
+    df_contact_sexage = df_contact_sexage.groupby(col_to_group, as_index=False, observed=True)['num_impacts'].sum()
 
     # Compute TRPs
-    size_universe = df_universe_by_sexage['universe'].sum()
+    size_universe = universe.sum()
     df_contact_sexage['num_trp'] = df_contact_sexage['num_impacts'] / size_universe * 100
     df_contact_sexage = df_contact_sexage.drop(columns=['num_impacts'])
 
     # Scaffolding
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object)
 
-    df_contact_sexage = df_scaffolding.merge(df_contact_sexage, how='left', on=col_to_group)
-    df_contact_sexage['num_trp'] = df_contact_sexage['num_trp'].fillna(0)
-
-    df_contact_sexage = df_contact_sexage.set_index([x for x in df_contact_sexage.columns if x != 'num_trp'])
+    df_contact_sexage = _align_to_scaffold(df_contact_sexage, df_scaffolding, list(df_scaffolding.columns),
+                                           'num_trp').to_frame()
 
     df_contact_sexage['_total'] = df_contact_sexage.sum(axis=1)
     df_contact_sexage = df_contact_sexage.round(1)
@@ -3101,6 +4511,7 @@ def _compute_contact_total_trp_raw(path_tables, label_object, campaign_par):
     return df_contact_sexage
 
 
+@_memoize_frame
 def _compute_contact_total_trp_30eq(path_tables, label_object, campaign_par):
     """
 
@@ -3111,9 +4522,8 @@ def _compute_contact_total_trp_30eq(path_tables, label_object, campaign_par):
     """
 
     # Read table
-    df_contact_sexage = _extract_df_from_json_file(path_tables, 'impacts_by_sex_age')
-    df_universe_by_sexage = _extract_df_from_json_file(path_tables, 'universe_by_sex_age')
-    df_universe_by_sexage = df_universe_by_sexage[df_universe_by_sexage['date'] == df_universe_by_sexage['date'].min()]
+    df_contact_sexage = _read_table(path_tables, 'impacts_by_sex_age', campaign_par)
+    universe = _universe_index(path_tables, label_object, campaign_par).universe('sexage')
 
     col_to_group = ['broadcaster', 'device_type', 'ad_type']
 
@@ -3121,20 +4531,19 @@ def _compute_contact_total_trp_30eq(path_tables, label_object, campaign_par):
         df_contact_sexage[col_to_group + ['num_30sec_eq_impacts']] = None
 
     # Group data
-    df_contact_sexage = df_contact_sexage.groupby(col_to_group, as_index=False)['num_30sec_eq_impacts'].sum()
+    df_contact_sexage = df_contact_sexage.groupby(col_to_group, as_index=False,
+                                                  observed=True)['num_30sec_eq_impacts'].sum()
 
     # Compute TRPs
-    size_universe = df_universe_by_sexage['universe'].sum()
+    size_universe = universe.sum()
     df_contact_sexage['num_trp'] = df_contact_sexage['num_30sec_eq_impacts'] / size_universe * 100
     df_contact_sexage = df_contact_sexage.drop(columns=['num_30sec_eq_impacts'])
 
     # Scaffolding
     df_scaffolding = _scaffolding_contacts(col_to_group, label_object)
 
-    df_contact_sexage = df_scaffolding.merge(df_contact_sexage, how='left', on=col_to_group)
-    df_contact_sexage['num_trp'] = df_contact_sexage['num_trp'].fillna(0)
-
-    df_contact_sexage = df_contact_sexage.set_index([x for x in df_contact_sexage.columns if x != 'num_trp'])
+    df_contact_sexage = _align_to_scaffold(df_contact_sexage, df_scaffolding, list(df_scaffolding.columns),
+                                           'num_trp').to_frame()
 
     df_contact_sexage['_total'] = df_contact_sexage.sum(axis=1)
     df_contact_sexage = df_contact_sexage.round(1)
@@ -3183,7 +4592,620 @@ def _get_sg_codes_no_impressions(df, sg_request, sg_no_impressions):
     return sg_no_impressions
 
 
-def main_postprocess_request(path_tables, path_dir_output, element_config, label_attribute, label_object):
+def _node_dependencies(node):
+    """
+    Return the graph {node: direct inputs} of the node and of all the nodes it depends on.
+    Nodes are the tables from the API (keys of REPORT_TABLE_SCHEMA) and the builders of FRAME_DEPENDENCIES.
+    """
+    graph = dict()
+    to_visit = [node]
+    while to_visit:
+        x = to_visit.pop()
+        if x not in graph:
+            graph[x] = FRAME_DEPENDENCIES.get(x, list())
+            to_visit.extend(graph[x])
+    return graph
+
+
+def _schedule_element_graph(element_objs):
+    """
+    Order the elements of element_config.json on the dependency graph declared in ELEMENT_DEPENDENCIES.
+
+    Each element is paired with the nodes it needs, in topological order. The elements are picked greedily: first
+    the ones whose function is not declared (their inputs are computed on demand), then at each step the element
+    needing the fewest nodes not yet computed, preferring the one which lets more nodes be released. Elements sharing
+    the same intermediate dataframes are therefore run one after the other and the intermediates are kept in memory
+    for the shortest time.
+
+    :param element_objs: values of element_config.json
+    :return: (list of (element_obj, list of nodes), dict node -> number of elements needing it)
+    """
+    element_nodes = list()
+    for element_obj in element_objs:
+        graph = dict()
+        for node in ELEMENT_DEPENDENCIES.get(element_obj['python_function'], list()):
+            graph.update(_node_dependencies(node))
+        element_nodes.append((element_obj, list(graphlib.TopologicalSorter(graph).static_order())))
+
+    node_consumers = dict()
+    for _, nodes in element_nodes:
+        for node in nodes:
+            node_consumers[node] = node_consumers.get(node, 0) + 1
+
+    schedule = [x for x in element_nodes if x[0]['python_function'] not in ELEMENT_DEPENDENCIES]
+    remaining = [x for x in element_nodes if x[0]['python_function'] in ELEMENT_DEPENDENCIES]
+    computed = set()
+    consumers_left = dict(node_consumers)
+    while remaining:
+        def cost(item):
+            nodes = item[1]
+            return (len([x for x in nodes if x not in computed]),
+                    -len([x for x in nodes if consumers_left[x] == 1]))
+
+        next_item = min(remaining, key=cost)
+        remaining.remove(next_item)
+        schedule.append(next_item)
+        computed.update(next_item[1])
+        for node in next_item[1]:
+            consumers_left[node] -= 1
+
+    return schedule, node_consumers
+
+
+def _compute_node(node, path_tables, label_object, campaign_par):
+    """
+    Put the table or the intermediate dataframe of the node in the per-request stores, if not already there.
+    """
+    if node in REPORT_TABLE_SCHEMA:
+        _read_table(path_tables, node, campaign_par)
+    else:
+        builder = getattr(sys.modules[__name__], node).__wrapped__
+        _get_frame(builder, path_tables, label_object, campaign_par, copy=False)
+
+
+def _release_nodes(nodes, node_consumers, path_tables, campaign_par):
+    """
+    Decrease the number of elements still needing each node, and remove from the per-request stores the nodes which
+    are not needed anymore.
+    """
+    path_tables = os.path.normpath(path_tables)
+    for node in nodes:
+        node_consumers[node] -= 1
+        if node_consumers[node] == 0:
+            campaign_par['table_store'].pop((path_tables, node), None)
+            campaign_par['frame_store'].pop((node, path_tables), None)
+
+
+def _start_profile(profile, entry_point):
+    """
+    Return the profile of a run of entry_point, or None if profiling is disabled.
+
+    :param profile: True/"memory" to enable profiling, False to disable it, None to read PROFILE_ENV_VAR
+    """
+    if profile is None:
+        profile = os.environ.get(PROFILE_ENV_VAR, '').strip().lower()
+        if profile != 'memory':
+            profile = profile not in ['', '0', 'false', 'no']
+    if not profile:
+        return None
+
+    memory = profile == 'memory'
+    profile = {'entry_point': entry_point, 'memory': memory, 'records': list(),
+               'tracemalloc_started': memory and not tracemalloc.is_tracing()}
+    if profile['tracemalloc_started']:
+        tracemalloc.start()
+    profile['counters'] = _profile_counters(profile)
+    return profile
+
+
+def _max_rss():
+    if resource is None:
+        return 0
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def _profile_counters(profile):
+    counters = {'wall': time.perf_counter(), 'cpu': time.thread_time(), 'max_rss': _max_rss()}
+    if profile['memory'] and tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        counters['traced'] = tracemalloc.get_traced_memory()[0]
+    return counters
+
+
+def _profile_delta(profile, counters):
+    """
+    Wall and CPU time (of the running thread), growth of the peak RSS of the process and, in memory mode, peak of the
+    Python allocations since counters were taken.
+    """
+    delta = {
+        'wall_s': time.perf_counter() - counters['wall'],
+        'cpu_s': time.thread_time() - counters['cpu'],
+        'peak_rss_delta_bytes': _max_rss() - counters['max_rss']
+    }
+    if 'traced' in counters:
+        delta['tracemalloc_peak_bytes'] = tracemalloc.get_traced_memory()[1] - counters['traced']
+    return delta
+
+
+def _profile_call(profile, name, func, campaign_par=None):
+    """
+    Run func() recording its profile; the output bytes are the size of the file (or files) whose path func returns
+    and the input rows those of the tables from the API read by func through campaign_par.
+    """
+    if not profile:
+        return func()
+
+    table_reads = dict()
+    if campaign_par is not None:
+        campaign_par['table_reads'] = table_reads
+    counters = _profile_counters(profile)
+    try:
+        result = func()
+    finally:
+        if campaign_par is not None:
+            campaign_par.pop('table_reads')
+    record = dict(name=name, **_profile_delta(profile, counters))
+
+    paths_output = [result] if isinstance(result, str) else list(result or list())
+    record['input_rows'] = sum(table_reads.values())
+    record['output_bytes'] = sum(os.path.getsize(x) for x in paths_output if os.path.isfile(x))
+    profile['records'].append(record)
+
+    return result
+
+
+def _finish_profile(profile, path_dir_output):
+    """
+    Write the JSON report of the profile and print its summary, the slowest elements first.
+    """
+    if not profile:
+        return None
+
+    total = _profile_delta(profile, profile['counters'])
+    if profile['tracemalloc_started']:
+        tracemalloc.stop()
+
+    path_dir_report = os.environ.get(PROFILE_DIR_ENV_VAR) or path_dir_output
+    path_report = os.path.join(path_dir_report, f"profiling_{profile['entry_point']}.json")
+    records = sorted(profile['records'], key=lambda x: -x['wall_s'])
+    report = {
+        'entry_point': profile['entry_point'],
+        'created': pd.Timestamp.now().isoformat(),
+        'pid': os.getpid(),
+        'total': total,
+        'elements': records
+    }
+    with open(path_report, 'w') as f:
+        json.dump(report, f, indent=4)
+
+    print(f"Profile of {profile['entry_point']}: {total['wall_s']:.3f} s wall, {total['cpu_s']:.3f} s CPU, "
+          f"{len(records)} elements, report {path_report}")
+    if records:
+        df_summary = pd.DataFrame(records).set_index('name').drop(columns='python_function', errors='ignore')
+        df_summary['share (%)'] = (100 * df_summary['wall_s'] / total['wall_s']).round(1)
+        print(df_summary.round(4).to_string())
+
+    return path_report
+
+
+def _run_element(element_obj, element_nodes, element_state):
+    """
+    Compute the nodes not yet available for the element found in element_config.json, then run its python function.
+    If profiling is enabled return the profile record of the element, otherwise None.
+    """
+    path_tables = element_state['path_tables']
+    campaign_par = element_state['campaign_par']
+    profile = campaign_par.get('profile')
+    if profile:
+        counters = _profile_counters(profile)
+
+    for node in element_nodes:
+        _compute_node(node, path_tables, element_state['label_object'], campaign_par)
+
+    element_name = element_obj['python_element']
+    path_output_json = os.path.join(element_state['path_dir_output'], element_obj['file_name'])
+    label_attribute_element = element_state['label_attribute'][element_name]
+    methodcaller(element_obj['python_function'],
+                 path_tables, path_output_json, element_state['label_object'],
+                 label_attribute_element, campaign_par, element_obj)(sys.modules[__name__])
+
+    if not profile:
+        return None
+
+    # Rows of the tables from the API the element depends on
+    tables = {x for node in ELEMENT_DEPENDENCIES.get(element_obj['python_function'], list())
+              for x in _node_dependencies(node) if x in REPORT_TABLE_SCHEMA}
+    table_store = campaign_par['table_store']
+    input_rows = sum(len(table_store[(os.path.normpath(path_tables), x)]) for x in tables
+                     if (os.path.normpath(path_tables), x) in table_store)
+
+    return dict(name=element_name, python_function=element_obj['python_function'],
+                **_profile_delta(profile, counters), input_rows=input_rows,
+                output_bytes=os.path.getsize(path_output_json) if os.path.isfile(path_output_json) else 0)
+
+
+# State shared by the elements run in a worker process, set once by _init_element_worker
+_element_worker_state = dict()
+
+
+def _init_element_worker(element_state):
+    _element_worker_state.update(element_state)
+
+
+def _run_element_group(element_group, private_nodes, element_state=None):
+    """
+    Run a group of elements sharing the same intermediate dataframes, then release the nodes needed only by them.
+    In a worker process element_state is None and the state set by _init_element_worker is used.
+    Return the profile records of the elements (None if profiling is disabled).
+    """
+    element_state = element_state or _element_worker_state
+    path_tables = element_state['path_tables']
+    campaign_par = element_state['campaign_par']
+
+    profile_records = [_run_element(element_obj, element_nodes, element_state)
+                       for element_obj, element_nodes in element_group]
+
+    _release_nodes(private_nodes, {x: 1 for x in private_nodes}, path_tables, campaign_par)
+
+    return profile_records
+
+
+def _run_element_schedule_parallel(element_schedule, element_state, n_workers, pool_type):
+    """
+    Run the scheduled elements on a pool of n_workers threads or processes.
+
+    The tables from the API, and the intermediate dataframes needed by more than one group of elements, are computed
+    once in the parent before the pool is created: threads share the stores, processes inherit them through fork
+    (copy-on-write) where available, otherwise they receive a copy when they start. Elements needing the same
+    intermediate dataframes are sent to the same worker as a single group, which computes the intermediates only
+    needed by the group, so that each intermediate is computed once. Each element writes its own output file with
+    the same computation of a serial run, so the outputs do not depend on the number of workers.
+
+    :param element_schedule: list of (element_obj, nodes) from _schedule_element_graph
+    :param dict element_state: paths, label objects and campaign_par used to run the elements
+    :param int n_workers: number of workers
+    :param str pool_type: "process" or "thread"
+    """
+    path_tables = element_state['path_tables']
+    campaign_par = element_state['campaign_par']
+
+    # Group the elements by the intermediate dataframes they need
+    dict_group = dict()
+    for element_obj, element_nodes in element_schedule:
+        key = frozenset(x for x in element_nodes if x not in REPORT_TABLE_SCHEMA)
+        dict_group.setdefault(key, list()).append((element_obj, element_nodes))
+
+    node_groups = dict()
+    for key in dict_group:
+        for node in key:
+            node_groups[node] = node_groups.get(node, 0) + 1
+
+    # Load the tables and compute the intermediates shared by several groups once (in topological order), before
+    # the workers start
+    for _, element_nodes in element_schedule:
+        for node in element_nodes:
+            if node in REPORT_TABLE_SCHEMA or node_groups[node] > 1:
+                _compute_node(node, path_tables, element_state['label_object'], campaign_par)
+
+    if pool_type == 'thread':
+        pool = ThreadPoolExecutor(max_workers=n_workers)
+        task_state = element_state
+    elif pool_type == 'process':
+        pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=_get_mp_context(),
+                                   initializer=_init_element_worker, initargs=(element_state,))
+        task_state = None
+    else:
+        raise ValueError(f"Unknown pool type {pool_type}, use 'process' or 'thread'")
+
+    with pool:
+        futures = [pool.submit(_run_element_group, element_group, [x for x in key if node_groups[x] == 1], task_state)
+                   for key, element_group in dict_group.items()]
+        profile_records = [x for future in futures for x in future.result()]
+
+    return profile_records
+
+
+def _open_output_cache(path_cache_dir, max_bytes, path_tables, label_object, universe_policy, json_format):
+    """
+    Return the output cache of a run of main_postprocess_request, or None if path_cache_dir is None.
+
+    The outputs of the elements are stored in the objects subdirectory of path_cache_dir, named by their key (see
+    _output_cache_key), and the hit/miss statistics in OUTPUT_CACHE_STATS_FILE.
+
+    :param str label_object: Path of the label_object.json file
+    """
+    if path_cache_dir is None:
+        return None
+
+    os.makedirs(os.path.join(path_cache_dir, 'objects'), exist_ok=True)
+    return {'path': path_cache_dir, 'max_bytes': max_bytes, 'path_tables': path_tables,
+            'label_object_sha': _file_sha256(label_object), 'code_version': _code_version(), 'table_sha': dict(),
+            'universe_policy': universe_policy, 'json_format': json_format, 'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+@functools.lru_cache(maxsize=None)
+def _code_version():
+    """
+    Version of the code producing the outputs: hash of this module and versions of pandas and numpy.
+    """
+    return '{}-{}-{}'.format(_file_sha256(os.path.abspath(__file__)), pd.__version__, np.__version__)
+
+
+def _output_cache_key(output_cache, element_obj, label_attribute_element):
+    """
+    Key of the output of the element found in element_config.json: hash of the json files from the API it reads
+    (all of them if its function is not in ELEMENT_DEPENDENCIES; json_request.json and target_universe.json, setting
+    the targets and the dates of the campaign, always), of its entry of element_config.json, of its metadata of
+    label_attribute.json, of label_objects.json, of the universe policy, of the json format and of the code version.
+    """
+    nodes = ELEMENT_DEPENDENCIES.get(element_obj['python_function'])
+    if nodes is None:
+        tables = set(REPORT_TABLE_SCHEMA)
+    else:
+        tables = {x for node in nodes for x in _node_dependencies(node) if x in REPORT_TABLE_SCHEMA}
+    tables.update(['json_request', 'target_universe'])
+
+    table_sha = output_cache['table_sha']
+    for table_name in tables - table_sha.keys():
+        path_json = os.path.join(output_cache['path_tables'], table_name + '.json')
+        table_sha[table_name] = _file_sha256(path_json) if os.path.isfile(path_json) else None
+
+    key = {
+        'tables': {x: table_sha[x] for x in sorted(tables)},
+        'element': element_obj,
+        'label_attribute': label_attribute_element,
+        'label_object': output_cache['label_object_sha'],
+        'universe_policy': output_cache['universe_policy'],
+        'json_format': output_cache['json_format'],
+        'code_version': output_cache['code_version']
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _output_cache_fetch(output_cache, key, path_output_json):
+    """
+    Copy the cached output of the key in path_output_json and mark it as recently used.
+    Return False, counting a miss, if the key is not in the cache.
+    """
+    path_entry = os.path.join(output_cache['path'], 'objects', key)
+    try:
+        shutil.copyfile(path_entry, path_output_json)
+        os.utime(path_entry)
+    except FileNotFoundError:
+        output_cache['misses'] += 1
+        return False
+
+    output_cache['hits'] += 1
+    return True
+
+
+def _output_cache_store(output_cache, key, path_output_json):
+    """
+    Store the output of the key in the cache; the file is replaced atomically so that concurrent runs read either
+    the previous or the new entry.
+    """
+    if not os.path.isfile(path_output_json):
+        return
+
+    path_entry = os.path.join(output_cache['path'], 'objects', key)
+    path_tmp = '{}.{}.{}.tmp'.format(path_entry, os.getpid(), threading.get_ident())
+    try:
+        shutil.copyfile(path_output_json, path_tmp)
+        os.replace(path_tmp, path_entry)
+    except OSError:
+        # The cache is an optimisation, the output is produced anyway
+        if os.path.exists(path_tmp):
+            os.remove(path_tmp)
+
+
+def _close_output_cache(output_cache):
+    """
+    Evict the least recently used outputs until the cache fits in its maximum size, then add the hits, misses and
+    evictions of the run to the statistics of the cache.
+    """
+    if output_cache is None:
+        return None
+
+    path_objects = os.path.join(output_cache['path'], 'objects')
+    entries = sorted((x.stat().st_mtime_ns, x.stat().st_size, x.path) for x in os.scandir(path_objects)
+                     if x.is_file() and not x.name.endswith('.tmp'))
+    size_bytes = sum(x[1] for x in entries)
+    for _, size, path_entry in entries:
+        if size_bytes <= output_cache['max_bytes']:
+            break
+        try:
+            os.remove(path_entry)
+        except FileNotFoundError:
+            pass
+        size_bytes -= size
+        output_cache['evictions'] += 1
+
+    last_run = {x: output_cache[x] for x in ['hits', 'misses', 'evictions']}
+    path_stats = os.path.join(output_cache['path'], OUTPUT_CACHE_STATS_FILE)
+    try:
+        with open(path_stats) as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        stats = {x: 0 for x in last_run}
+    for x in last_run:
+        stats[x] = stats.get(x, 0) + last_run[x]
+    stats.update({'size_bytes': size_bytes, 'entries': len(entries) - last_run['evictions'], 'last_run': last_run,
+                  'updated': pd.Timestamp.now().isoformat()})
+
+    path_tmp = '{}.{}.tmp'.format(path_stats, os.getpid())
+    with open(path_tmp, 'w') as f:
+        json.dump(stats, f, indent=4)
+    os.replace(path_tmp, path_stats)
+
+    return stats
+
+
+def _check_compression(compression, compression_level, compressed_only):
+    """
+    Return the list of the codecs of compression (a codec of OUTPUT_COMPRESSIONS, a list of them or None), raising
+    a ValueError if a codec, its level or compressed_only can not be used.
+    """
+    if compression is None:
+        compression = list()
+    elif isinstance(compression, str):
+        compression = [compression]
+    compression = list(dict.fromkeys(compression))
+
+    for codec in compression:
+        if codec not in OUTPUT_COMPRESSIONS:
+            raise ValueError(f"Unknown compression {codec}, use one of {list(OUTPUT_COMPRESSIONS)}")
+        if codec == 'zstd' and zstandard is None:
+            raise ValueError("The zstd compression requires the zstandard package")
+        if compression_level is not None and not 1 <= compression_level <= OUTPUT_COMPRESSIONS[codec][2]:
+            raise ValueError(f"Invalid level {compression_level} of the {codec} compression, use 1 to "
+                             f"{OUTPUT_COMPRESSIONS[codec][2]}")
+    if compressed_only and not compression:
+        raise ValueError("compressed_only requires at least one compression")
+
+    return compression
+
+
+def _compress_output(path_output_json, compression, compression_level, compressed_only):
+    """
+    Write the copies of the json file of an element compressed with each codec of compression, removing the json
+    file if compressed_only. Return the size of the json file and of each copy.
+    """
+    with open(path_output_json, 'rb') as f:
+        data = f.read()
+
+    sizes = {'bytes': len(data)}
+    for codec in compression:
+        extension, level, _ = OUTPUT_COMPRESSIONS[codec]
+        level = level if compression_level is None else compression_level
+        if codec == 'gzip':
+            # No timestamp in the header, the same output is always compressed in the same bytes
+            data_compressed = gzip.compress(data, compresslevel=level, mtime=0)
+        else:
+            data_compressed = zstandard.ZstdCompressor(level=level).compress(data)
+
+        path_tmp = '{}{}.{}.tmp'.format(path_output_json, extension, os.getpid())
+        with open(path_tmp, 'wb') as f:
+            f.write(data_compressed)
+        os.replace(path_tmp, path_output_json + extension)
+        sizes[codec] = len(data_compressed)
+
+    if compressed_only:
+        os.remove(path_output_json)
+
+    return sizes
+
+
+def _compress_outputs(path_dir_output, file_names, compression, compression_level=None, compressed_only=False,
+                      n_workers=1):
+    """
+    Compress the json files of the elements written in path_dir_output (see _compress_output) and write the manifest
+    of the run, OUTPUT_MANIFEST_FILE, with the raw and compressed sizes of every file.
+    zlib and zstandard release the GIL, the files are compressed by n_workers threads.
+    """
+    paths = [os.path.join(path_dir_output, x) for x in file_names]
+    compress = functools.partial(_compress_output, compression=compression, compression_level=compression_level,
+                                 compressed_only=compressed_only)
+    if n_workers > 1:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            sizes = list(executor.map(compress, paths))
+    else:
+        sizes = list(map(compress, paths))
+
+    manifest = {
+        'compression': {x: OUTPUT_COMPRESSIONS[x][1] if compression_level is None else compression_level
+                        for x in compression},
+        'compressed_only': compressed_only,
+        'files': dict(zip(file_names, sizes)),
+        'created': pd.Timestamp.now().isoformat()
+    }
+    manifest['total'] = {x: sum(y[x] for y in sizes) for x in ['bytes'] + compression}
+
+    path_manifest = os.path.join(path_dir_output, OUTPUT_MANIFEST_FILE)
+    path_tmp = '{}.{}.tmp'.format(path_manifest, os.getpid())
+    with open(path_tmp, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(path_tmp, path_manifest)
+
+    return manifest
+
+
+def _write_bundle(path_dir_output, element_objs, remove_outputs=False):
+    """
+    Pack the json files of the elements written in path_dir_output in OUTPUT_BUNDLE_FILE, removing them if
+    remove_outputs. Return the path of the bundle.
+    """
+    index = {'version': OUTPUT_BUNDLE_VERSION, 'elements': dict()}
+    offset = 0
+    for element_obj in element_objs:
+        length = os.path.getsize(os.path.join(path_dir_output, element_obj['file_name']))
+        index['elements'][element_obj['python_element']] = {'file_name': element_obj['file_name'], 'offset': offset,
+                                                             'length': length}
+        offset += length
+    index = json.dumps(index, separators=(',', ':')).encode()
+
+    path_bundle = os.path.join(path_dir_output, OUTPUT_BUNDLE_FILE)
+    path_tmp = '{}.{}.tmp'.format(path_bundle, os.getpid())
+    with open(path_tmp, 'wb') as f:
+        f.write(OUTPUT_BUNDLE_MAGIC + struct.pack('<I', len(index)) + index)
+        for element_obj in element_objs:
+            with open(os.path.join(path_dir_output, element_obj['file_name']), 'rb') as f_element:
+                shutil.copyfileobj(f_element, f)
+    os.replace(path_tmp, path_bundle)
+
+    if remove_outputs:
+        for element_obj in element_objs:
+            os.remove(os.path.join(path_dir_output, element_obj['file_name']))
+
+    return path_bundle
+
+
+def read_bundle_index(path_bundle):
+    """
+    Return the index of a bundle written by main_postprocess_request(bundle=True) and the offset of its first
+    element, reading only the header of the file.
+    """
+    with open(path_bundle, 'rb') as f:
+        header = f.read(len(OUTPUT_BUNDLE_MAGIC) + 4)
+        if header[:len(OUTPUT_BUNDLE_MAGIC)] != OUTPUT_BUNDLE_MAGIC:
+            raise ValueError(f"{path_bundle} is not a bundle of element outputs")
+        if len(header) < len(OUTPUT_BUNDLE_MAGIC) + 4:
+            raise ValueError(f"{path_bundle} is truncated")
+        index_length = struct.unpack('<I', header[len(OUTPUT_BUNDLE_MAGIC):])[0]
+        index = f.read(index_length)
+        if len(index) < index_length:
+            raise ValueError(f"{path_bundle} is truncated")
+        index = json.loads(index)
+    if index['version'] != OUTPUT_BUNDLE_VERSION:
+        raise ValueError(f"Unknown bundle version {index['version']}")
+
+    return index, len(header) + index_length
+
+
+def read_bundle_element(path_bundle, python_element):
+    """
+    Return the json content of the element python_element from a bundle written by
+    main_postprocess_request(bundle=True): only the index and the bytes of the element are read and parsed.
+    """
+    index, data_offset = read_bundle_index(path_bundle)
+    if python_element not in index['elements']:
+        raise ValueError(f"Unknown element {python_element} in {path_bundle}")
+
+    entry = index['elements'][python_element]
+    with open(path_bundle, 'rb') as f:
+        f.seek(data_offset + entry['offset'])
+        data = f.read(entry['length'])
+    if len(data) < entry['length']:
+        raise ValueError(f"{path_bundle} is truncated")
+
+    return json.loads(data)
+
+
+def main_postprocess_request(path_tables, path_dir_output, element_config, label_attribute, label_object,
+                             streaming_ingest=False, n_workers=1, pool_type='process', profile=None,
+                             incremental_state=None, output_cache=None, output_cache_max_bytes=OUTPUT_CACHE_MAX_BYTES,
+                             universe_policy='first_day', json_format='pretty', compression=None,
+                             compression_level=None, compressed_only=False, bundle=False, bundle_only=False):
     """
     This function executes the post-processing functions found in the element_config.json file for producing the
     json files used as input to the graphic library.
@@ -3207,7 +5229,38 @@ def main_postprocess_request(path_tables, path_dir_output, element_config, label
     :param str label_attribute: Path of the label_attribute.json file used to associate specific metadata
         to each label of the graphical label.
     :param str label_object: Path of the label_object.json file used to handle label renaming and ordering.
+    :param bool streaming_ingest: If True the impacts tables are aggregated while streaming the json files, so that
+        very large campaigns are processed in bounded memory.
+    :param int n_workers: Number of workers running the elements; with 1 the elements are run serially.
+    :param str pool_type: Pool of workers used when n_workers > 1, "process" or "thread".
+    :param profile: True (or "memory" to trace the allocations) to write a profiling report of every element,
+        None to read the POSTPROCESSING_PROFILE environment variable.
+    :param str incremental_state: Directory persisting the build-up tables of the campaign between runs: only the
+        days after the previous run are densified and appended to the state, a day restated by the API among the last
+        BUILDUP_RESTATEMENT_DAYS processed rebuilds it. None to recompute every day.
+    :param str output_cache: Directory of the cache of the json files of the elements, keyed by the hash of their
+        inputs, configuration and code: the elements found in the cache are copied instead of computed. None to
+        compute every element.
+    :param int output_cache_max_bytes: Maximum size of the output cache, the least recently used outputs are evicted.
+    :param str universe_policy: Universe used to compute TRPs and absolute reach, one of UNIVERSE_POLICIES (see
+        UniverseIndex).
+    :param str json_format: Format of the json files of the elements, one of JSON_FORMATS: "pretty" (indented) or
+        "compact" (without whitespace).
+    :param compression: Codec of OUTPUT_COMPRESSIONS ("gzip" or "zstd"), or list of codecs, used to write a
+        pre-compressed copy of every json file (file_name.gz, file_name.zst) and the manifest of their sizes,
+        OUTPUT_MANIFEST_FILE. None to write only the json files.
+    :param int compression_level: Level of the compression, None for the default level of each codec.
+    :param bool compressed_only: If True only the compressed copies of the json files are kept.
+    :param bool bundle: If True the json files of all the elements are also packed in OUTPUT_BUNDLE_FILE, with an
+        index of their offsets (see read_bundle_element).
+    :param bool bundle_only: If True only the bundle is kept, the compression then applies to the bundle.
     """
+    compression = _check_compression(compression, compression_level, compressed_only)
+    if bundle_only and not bundle:
+        raise ValueError("bundle_only requires bundle")
+    profile = _start_profile(profile, 'main_postprocess_request')
+    output_cache = _open_output_cache(output_cache, output_cache_max_bytes, path_tables, label_object,
+                                      universe_policy, json_format)
 
     # Read file containing the elements to run
     with open(element_config) as f:
@@ -3219,24 +5272,29 @@ def main_postprocess_request(path_tables, path_dir_output, element_config, label
 
     # Read file containing the mapping table for the replacement
     with open(label_object) as f:
-        label_object = json.load(f)
+        label_object = LabelResolver(json.load(f))
 
     # Read raw request
     with open(os.path.join(path_tables, 'json_request.json')) as f:
         json_request = json.load(f)
 
-    # Read universe table to understand the real period of the campaign
-    with open(os.path.join(path_tables, 'target_universe.json')) as f:
-        universe_json = json.load(f)
-
     # Add target name A3+ if not present in the request
     target_name = [x['name_target'] for x in json_request['target']]
     if 'A3+' not in target_name:
         target_name = target_name + ['A3+']
 
+    # Per-request store of the tables from the API: each json file is read once and shared by all the elements,
+    # with its dimension columns as ordered Categoricals
+    table_store = dict()
+    dimension_categories = _dimension_categories(label_object, target_name)
+
+    # Read universe table to understand the real period of the campaign
+    df_universe = _read_table(path_tables, 'target_universe',
+                              {'table_store': table_store, 'dimension_categories': dimension_categories})
+
     # Compute the min and max date of the period of the campaign
-    min_date = min([pd.to_datetime(x['date']) for x in universe_json['report_table']])
-    max_date = max([pd.to_datetime(x['date']) for x in universe_json['report_table']])
+    min_date = df_universe['date'].min()
+    max_date = df_universe['date'].max()
 
     # Create a dataframe containing all the dates from min_date to max_date
     range_date = pd.date_range(min_date, max_date).tolist()
@@ -3255,24 +5313,72 @@ def main_postprocess_request(path_tables, path_dir_output, element_config, label
         "target_name": target_name,
         "df_date_range": df_date_range,
         "df_period_range": df_period_range,
-        "max_freq": 20
+        "max_freq": 20,
+        "table_store": table_store,
+        "frame_store": dict(),
+        "dimension_categories": dimension_categories,
+        "streaming_ingest": streaming_ingest,
+        "incremental_state": incremental_state,
+        "universe_policy": universe_policy,
+        "json_format": json_format,
+        "profile": profile
     }
 
-    this_mod = sys.modules[__name__]
-
-    # For each python_element found in element_config.json run the appropriate python function
-    # If the python function is not present in the module methodcaller will raise an error
-    # TODO: read the tables one time and send to each functions through campaign_par
-    for element_obj in element_config.values():
-        element_name = element_obj['python_element']
-        path_output_json = os.path.join(path_dir_output, element_obj['file_name'])
-        label_attribute_element = label_attribute[element_name]
-        c = methodcaller(element_obj['python_function'],
-                         path_tables, path_output_json, label_object,
-                         label_attribute_element, campaign_par, element_obj)(this_mod)
-
+    # Copy the outputs found in the cache, only the other elements are computed
+    element_objs = list(element_config.values())
+    if output_cache is not None:
+        element_keys = dict()
+        for element_obj in element_objs:
+            key = _output_cache_key(output_cache, element_obj, label_attribute[element_obj['python_element']])
+            if not _output_cache_fetch(output_cache, key, os.path.join(path_dir_output, element_obj['file_name'])):
+                element_keys[element_obj['file_name']] = key
+        element_objs = [x for x in element_objs if x['file_name'] in element_keys]
+
+    # Order the elements on the dependency graph: the tables and intermediate dataframes of each element are
+    # computed once, before the element, and released as soon as their last element has been run
+    element_schedule, node_consumers = _schedule_element_graph(element_objs)
+
+    element_state = {
+        'path_tables': path_tables,
+        'path_dir_output': path_dir_output,
+        'label_attribute': label_attribute,
+        'label_object': label_object,
+        'campaign_par': campaign_par
+    }
 
-def main_generator_file(path_tables, path_dir_output, export_file, label_object):
+    if n_workers > 1:
+        profile_records = _run_element_schedule_parallel(element_schedule, element_state, n_workers, pool_type)
+    else:
+        # For each python_element found in element_config.json run the appropriate python function
+        # If the python function is not present in the module methodcaller will raise an error
+        profile_records = list()
+        for element_obj, element_nodes in element_schedule:
+            profile_records.append(_run_element(element_obj, element_nodes, element_state))
+
+            _release_nodes(element_nodes, node_consumers, path_tables, campaign_par)
+
+    if output_cache is not None:
+        for file_name, key in element_keys.items():
+            _output_cache_store(output_cache, key, os.path.join(path_dir_output, file_name))
+        _close_output_cache(output_cache)
+
+    # The cache stores the json files, they are bundled and compressed afterwards
+    file_names = [x['file_name'] for x in element_config.values()]
+    if bundle:
+        _write_bundle(path_dir_output, list(element_config.values()), bundle_only)
+        if bundle_only:
+            file_names = [OUTPUT_BUNDLE_FILE]
+    if compression:
+        _compress_outputs(path_dir_output, file_names, compression, compression_level, compressed_only, n_workers)
+
+    if profile:
+        profile['records'].extend(profile_records)
+        _finish_profile(profile, path_dir_output)
+
+
+def main_generator_file(path_tables, path_dir_output, export_file, label_object, streaming_ingest=False,
+                        n_workers=1, print_timing=False, profile=None, incremental_state=None,
+                        universe_policy='first_day', excel_constant_memory=False):
     """
       This function executes the functions found in the exportfile_config.json file for producing the files (ie excel,...)
 
@@ -3288,7 +5394,21 @@ def main_generator_file(path_tables, path_dir_output, export_file, label_object)
       :param str path_dir_output: Path of the output directory where the file will be stored.
       :param str export_file: Path of the exportfile_config.json file used to retrieve the functions to launch.
       :param str label_object: Path of the label_object.json file used to handle label renaming and ordering.
+      :param bool streaming_ingest: If True the impacts tables are aggregated while streaming the json files.
+      :param int n_workers: Number of processes producing the sheets of the Excel file; with 1 the sheets are
+          produced serially.
+      :param bool print_timing: If True the timing of the Excel export, with its critical path, is printed.
+      :param profile: True (or "memory" to trace the allocations) to write a profiling report of every element,
+          None to read the POSTPROCESSING_PROFILE environment variable.
+      :param str incremental_state: Directory persisting the build-up tables of the campaign between runs: only the
+          days after the previous run are densified and appended to the state, a day restated by the API among the
+          last BUILDUP_RESTATEMENT_DAYS processed rebuilds it. None to recompute every day.
+      :param str universe_policy: Universe used to compute TRPs and absolute reach, one of UNIVERSE_POLICIES (see
+          UniverseIndex).
+      :param bool excel_constant_memory: If True the Excel file is written row by row in the constant_memory mode of
+          xlsxwriter, with a memory independent of the size of the sheets.
     """
+    profile = _start_profile(profile, 'main_generator_file')
 
     # Read file containing the elements to run
     with open(export_file) as f:
@@ -3296,7 +5416,7 @@ def main_generator_file(path_tables, path_dir_output, export_file, label_object)
 
     # Read file containing the mapping table for the replacement
     with open(label_object) as f:
-        label_object = json.load(f)
+        label_object = LabelResolver(json.load(f))
 
     # Read raw request
     with open(os.path.join(path_tables, 'json_request.json')) as f:
@@ -3336,25 +5456,39 @@ def main_generator_file(path_tables, path_dir_output, export_file, label_object)
         "max_freq": 20,
         "name_campaign": json_request['name_campaign'],
         'json_request': json_request,
-        'warning_desc': warning_attr
+        'warning_desc': warning_attr,
+        'table_store': dict(),
+        'frame_store': dict(),
+        'dimension_categories': _dimension_categories(label_object, target_name),
+        'streaming_ingest': streaming_ingest,
+        'incremental_state': incremental_state,
+        'universe_policy': universe_policy,
+        'n_workers': n_workers,
+        'print_timing': print_timing,
+        'excel_constant_memory': excel_constant_memory
     }
 
     this_mod = sys.modules[__name__]
 
     # For each element found in exportfile_config.json run the appropriate python function
     # If the python function is not present in the module methodcaller will raise an error
-    for element_obj in export_file.values():
-        c = methodcaller(element_obj['python_function'],
-                         path_tables, path_dir_output, label_object, campaign_par)(this_mod)
+    for element_name, element_obj in export_file.items():
+        run_element = methodcaller(element_obj['python_function'],
+                                   path_tables, path_dir_output, label_object, campaign_par)
+        _profile_call(profile, element_name, lambda: run_element(this_mod), campaign_par)
+
+    _finish_profile(profile, path_dir_output)
 
 
-def main_generator_zip_json_report_to_download(path_tables, path_dir_output):
+def main_generator_zip_json_report_to_download(path_tables, path_dir_output, profile=None):
     """
       This function creates into the folder a zip file named raw_json_tables.zip contained the json table in output of the ApPI and the json request
 
       :param str path_tables: Path of the input directory where the json files from the API are stored.
       :param str path_dir_output: Path of the output directory where the file will be stored.
+      :param profile: True to write a profiling report, None to read the POSTPROCESSING_PROFILE environment variable.
     """
+    profile = _start_profile(profile, 'main_generator_zip_json_report_to_download')
     children_request = _extract_child_id(path_tables)
 
     # Read file containing the elements to run
@@ -3369,4 +5503,48 @@ def main_generator_zip_json_report_to_download(path_tables, path_dir_output):
 
     zip_name = os.path.join(path_dir_output, 'raw_json_tables.zip')
 
-    _zip_files(path_tables, zip_name, file_to_zip, children_request)
+    _profile_call(profile, 'raw_json_tables.zip',
+                  lambda: _zip_files(path_tables, zip_name, file_to_zip, children_request))
+
+    _finish_profile(profile, path_dir_output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Produce the json files of the elements found in element_config.json')
+    parser.add_argument('path_tables', help='directory of the json files from the API')
+    parser.add_argument('path_dir_output', help='directory where the json files of the elements are written')
+    parser.add_argument('element_config', help='path of element_config.json')
+    parser.add_argument('label_attribute', help='path of label_attribute.json')
+    parser.add_argument('label_object', help='path of label_objects.json')
+    parser.add_argument('--streaming_ingest', action='store_true',
+                        help='aggregate the impacts tables while streaming the json files')
+    parser.add_argument('--workers', type=int, default=1, help='number of workers running the elements')
+    parser.add_argument('--pool', choices=['process', 'thread'], default='process',
+                        help='pool of workers used when --workers is greater than 1')
+    parser.add_argument('--profile', nargs='?', const=True, default=None, choices=['memory'],
+                        help='write a profiling report of every element ("memory" also traces the allocations)')
+    parser.add_argument('--output_cache', help='directory of the cache of the json files of the elements')
+    parser.add_argument('--output_cache_max_mb', type=float, default=OUTPUT_CACHE_MAX_BYTES / 2 ** 20,
+                        help='maximum size of the output cache in MB')
+    parser.add_argument('--universe_policy', choices=UNIVERSE_POLICIES, default='first_day',
+                        help='universe used to compute TRPs and absolute reach')
+    parser.add_argument('--json_format', choices=JSON_FORMATS, default='pretty',
+                        help='format of the json files of the elements')
+    parser.add_argument('--compression', nargs='+', choices=list(OUTPUT_COMPRESSIONS),
+                        help='write a pre-compressed copy of the json files of the elements with each codec')
+    parser.add_argument('--compression_level', type=int, help='level of the compression (default of each codec)')
+    parser.add_argument('--compressed_only', action='store_true',
+                        help='keep only the compressed copies of the json files of the elements')
+    parser.add_argument('--bundle', action='store_true',
+                        help='also pack the json files of the elements in a single file with an index of offsets')
+    parser.add_argument('--bundle_only', action='store_true', help='keep only the bundle of the json files')
+    args = parser.parse_args()
+
+    main_postprocess_request(args.path_tables, args.path_dir_output, args.element_config, args.label_attribute,
+                             args.label_object, streaming_ingest=args.streaming_ingest, n_workers=args.workers,
+                             pool_type=args.pool, profile=args.profile, output_cache=args.output_cache,
+                             output_cache_max_bytes=int(args.output_cache_max_mb * 2 ** 20),
+                             universe_policy=args.universe_policy, json_format=args.json_format,
+                             compression=args.compression, compression_level=args.compression_level,
+                             compressed_only=args.compressed_only, bundle=args.bundle or args.bundle_only,
+                             bundle_only=args.bundle_only)
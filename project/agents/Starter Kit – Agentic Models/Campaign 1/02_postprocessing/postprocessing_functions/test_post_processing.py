@@ -0,0 +1,914 @@
+"""
+Equivalence checks of the post-processing functions against their reference implementations, on synthetic tables
+and on the Campaign 1 fixtures.
+
+Usage:
+    python -m pytest test_post_processing.py
+"""
+import gzip
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import post_processing_functions as ppf
+
+PATH_LABEL_OBJECT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'label_objects.json')
+
+# Types of label_object['valid_engagement_type']
+TYPES = ['MTV TV', 'WBD TV', 'MTV Small screen Streaming services', 'Sanoma TV screen Streaming services',
+         'Sanoma Small screen Online video']
+
+
+@pytest.fixture(scope='module')
+def label_object():
+    with open(PATH_LABEL_OBJECT) as f:
+        return ppf.LabelResolver(json.load(f))
+
+
+def _compute_total_reference(df):
+    """
+    Reference implementation: totals of the Types containing TV or Streaming services and of all the Types.
+    """
+    df_tv_ss = df[df['Type'].str.contains('Streaming services|TV')]
+    df_total_tv_ss_ov = df.set_index('Type').sum().round(1).to_frame().T
+    df_total_tv_ss_ov['Type'] = 'TV+Streaming services+Online video'
+    is_online_video_present = df['Type'].str.contains('Online video').any()
+    df_total_tv_ss = df_tv_ss.set_index('Type').sum().round(1).to_frame().T
+    df_total_tv_ss['Type'] = 'TV+Streaming services'
+    df = pd.concat([df, df_total_tv_ss, df_total_tv_ss_ov], ignore_index=True)
+    if not is_online_video_present:
+        df = df[df['Type'] != 'TV+Streaming services+Online video']
+    return df
+
+
+def _compute_total_buildup_reference(df):
+    """
+    Reference implementation: totals by target of the Types containing TV or Streaming services and of all the Types.
+    """
+    df_tv_ss = df[df['Type'].str.contains('Streaming services|TV')]
+    df_total_tv_ss_ov = df.drop(columns=['Type']).groupby(['Target name'], as_index=False).sum().round(1)
+    df_total_tv_ss_ov['Type'] = 'TV+Streaming services+Online video'
+    is_online_video_present = df['Type'].str.contains('Online video').any()
+    df_total_tv_ss = df_tv_ss.drop(columns=['Type']).groupby(['Target name'], as_index=False).sum().round(1)
+    df_total_tv_ss['Type'] = 'TV+Streaming services'
+    df = pd.concat([df, df_total_tv_ss_ov, df_total_tv_ss], ignore_index=True)
+    if not is_online_video_present:
+        df = df[df['Type'] != 'TV+Streaming services+Online video']
+    return df
+
+
+# Types of the tables: all the ad_types, without online video, online video only, no rows
+TYPE_CASES = {
+    'all': TYPES,
+    'no online video': [x for x in TYPES if not x.endswith('Online video')],
+    'online video only': [x for x in TYPES if x.endswith('Online video')],
+    'empty': []
+}
+
+
+@pytest.mark.parametrize('case', TYPE_CASES)
+def test_compute_total(case, label_object):
+    types = TYPE_CASES[case]
+    df = pd.DataFrame({'Type': types, 'A3+': [1.25 * (i + 1) for i in range(len(types))],
+                       'M25-54': [0.5 * i for i in range(len(types))]})
+    df['Type'] = df['Type'].astype(object)
+
+    pd.testing.assert_frame_equal(ppf._compute_total(df, label_object).reset_index(drop=True),
+                                  _compute_total_reference(df).reset_index(drop=True))
+
+
+@pytest.mark.parametrize('case', TYPE_CASES)
+def test_compute_total_buildup(case, label_object):
+    types = TYPE_CASES[case]
+    df = pd.DataFrame([(target, x) for target in ['A3+', 'M25-54'] for x in types], columns=['Target name', 'Type'],
+                      dtype=object)
+    for i, date in enumerate(['01-08-2024', '02-08-2024']):
+        df[date] = [0.75 * (i + j) for j in range(len(df))]
+
+    pd.testing.assert_frame_equal(ppf._compute_total_buildup(df, label_object).reset_index(drop=True),
+                                  _compute_total_buildup_reference(df).reset_index(drop=True))
+
+
+@pytest.mark.parametrize('ad_type_labels', [{'dynamic': 'SVOD', 'linear_static': 'Linear'}, {'dynamic': ''},
+                                            {'onlinevideo': 'Online video TV', 'dynamic': 'TV screen'}])
+def test_compute_total_labels(ad_type_labels, label_object):
+    """
+    The totals add up the ad_types the Types are built from, whatever their labels.
+    """
+    label_object_renamed = json.loads(json.dumps(label_object))
+    label_object_renamed['replace']['ad_type'].update(ad_type_labels)
+    label_object_renamed['valid_engagement_type'] = list()
+    label_object_renamed = ppf.LabelResolver(label_object_renamed)
+
+    df_codes = pd.DataFrame([('mtv', 'big_screen', 'linear_static'), ('sanoma', 'small_screen', 'linear_static'),
+                             ('mtv', 'small_screen', 'dynamic'), ('sanoma', 'big_screen', 'dynamic'),
+                             ('sanoma', 'small_screen', 'onlinevideo'), ('other', 'big_screen', 'onlinevideo')],
+                            columns=['broadcaster', 'device_type', 'ad_type'])
+    values = {'A3+': [1.25, 2.5, 3.75, 5.0, 6.25, 7.5], 'M25-54': [0.5, 0.0, 1.0, 1.5, 2.0, 2.5]}
+    df = pd.DataFrame(dict({'Type': label_object.row_type(df_codes, 'contacts')[0]}, **values))
+    df_renamed = pd.DataFrame(dict({'Type': label_object_renamed.row_type(df_codes, 'contacts')[0]}, **values))
+
+    df_total = ppf._compute_total(df, label_object).iloc[len(df):].reset_index(drop=True)
+    df_total_renamed = ppf._compute_total(df_renamed, label_object_renamed).iloc[len(df):].reset_index(drop=True)
+    pd.testing.assert_frame_equal(df_total_renamed.drop(columns=['Type']), df_total.drop(columns=['Type']))
+    assert df_total_renamed['Type'].tolist() == [label_object_renamed['replace']['ad_type'][x]
+                                                 for x in ['all', 'all_onlinevideo']]
+
+
+PATH_TABLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '01_pre_postprocessing',
+                           'input_from_api')
+
+BUILDUP_BUILDERS = ['postprocessing_standard_tabcontactsbu_df_contactcum_target_abs',
+                    'postprocessing_standard_tabcontactsbu_df_contactcum_target_trp',
+                    'postprocessing_standard_tabr1bu_df_reach_target_abs',
+                    'postprocessing_standard_tabr1bu_df_reach_target_perc']
+
+# Date column of the tables from the API of the build-up tables
+BUILDUP_TABLES = {'impacts_in_target': 'date', 'r1plus_in_target_buildup': 'end_date'}
+
+
+def _campaign_par(path_tables, label_object, incremental_state=None):
+    """
+    Parameters of the campaign, as set by main_postprocess_request.
+    """
+    with open(os.path.join(path_tables, 'json_request.json')) as f:
+        json_request = json.load(f)
+    target_name = [x['name_target'] for x in json_request['target']]
+    if 'A3+' not in target_name:
+        target_name = target_name + ['A3+']
+
+    table_store = dict()
+    dimension_categories = ppf._dimension_categories(label_object, target_name)
+    df_universe = ppf._read_table(path_tables, 'target_universe',
+                                  {'table_store': table_store, 'dimension_categories': dimension_categories})
+    range_date = pd.date_range(df_universe['date'].min(), df_universe['date'].max()).tolist()
+
+    return {
+        'target_name': target_name,
+        'df_date_range': pd.DataFrame(range_date, columns=['date']),
+        'df_period_range': pd.DataFrame({'start_date': [range_date[0]] * len(range_date), 'end_date': range_date}),
+        'max_freq': 20,
+        'table_store': table_store,
+        'frame_store': dict(),
+        'dimension_categories': dimension_categories,
+        'incremental_state': incremental_state
+    }
+
+
+def _buildup_tables(path_tables, label_object, incremental_state=None):
+    campaign_par = _campaign_par(path_tables, label_object, incremental_state)
+    return {x: getattr(ppf, x)(path_tables, label_object, campaign_par) for x in BUILDUP_BUILDERS}
+
+
+def _write_tables(path_tables, last_date=None, restated_date=None):
+    """
+    Copy the tables from the API, keeping the rows of the build-up tables up to last_date and doubling the values of
+    restated_date.
+    """
+    shutil.copytree(PATH_TABLES, path_tables, ignore=shutil.ignore_patterns('*.arrow'))
+    for table_name, date_col in BUILDUP_TABLES.items():
+        with open(os.path.join(PATH_TABLES, table_name + '.json')) as f:
+            table = json.load(f)
+        if last_date is not None:
+            table['report_table'] = [x for x in table['report_table'] if x[date_col] <= last_date]
+        for row in table['report_table']:
+            if row[date_col] == restated_date:
+                row.update({k: v * 2 for k, v in row.items() if isinstance(v, float)})
+        with open(os.path.join(path_tables, table_name + '.json'), 'w') as f:
+            json.dump(table, f)
+
+
+def _assert_tables_equal(tables, tables_expected):
+    for builder_name in BUILDUP_BUILDERS:
+        pd.testing.assert_frame_equal(tables[builder_name], tables_expected[builder_name])
+
+
+@pytest.mark.parametrize('last_date', ['2024-08-11', '2024-08-20'])
+def test_buildup_incremental_truncated_then_full(last_date, label_object, tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    incremental_state = str(tmp_path / 'state')
+    _write_tables(path_tables, last_date=last_date)
+    _buildup_tables(path_tables, label_object, incremental_state)
+
+    # The state is keyed on the directory of the tables: the data of the API are replaced in place
+    shutil.rmtree(path_tables)
+    _write_tables(path_tables)
+
+    _assert_tables_equal(_buildup_tables(path_tables, label_object, incremental_state),
+                         _buildup_tables(path_tables, label_object))
+
+
+def test_buildup_incremental_restated_day(label_object, tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    incremental_state = str(tmp_path / 'state')
+    _write_tables(path_tables)
+    _buildup_tables(path_tables, label_object, incremental_state)
+
+    # One of the last BUILDUP_RESTATEMENT_DAYS processed days, the last one being 2024-08-25
+    shutil.rmtree(path_tables)
+    _write_tables(path_tables, restated_date='2024-08-22')
+
+    _assert_tables_equal(_buildup_tables(path_tables, label_object, incremental_state),
+                         _buildup_tables(path_tables, label_object))
+
+
+def test_buildup_incremental_append_only(label_object, tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    incremental_state = str(tmp_path / 'state')
+    state_files = list()
+    for last_date in ['2024-08-11', '2024-08-20', None]:
+        shutil.rmtree(path_tables, ignore_errors=True)
+        _write_tables(path_tables, last_date=last_date)
+        _buildup_tables(path_tables, label_object, incremental_state)
+        state_files.append({os.path.join(root, x): os.stat(os.path.join(root, x)).st_mtime_ns
+                            for root, _, files in os.walk(incremental_state) for x in files
+                            if x != ppf.BUILDUP_STATE_FILE})
+
+    # Every run adds one column file by table and leaves the files of the previous runs untouched
+    assert len(state_files[0]) == 2 * len(BUILDUP_BUILDERS)
+    for files, next_files in zip(state_files, state_files[1:]):
+        assert len(next_files) == len(files) + len(BUILDUP_BUILDERS)
+        assert {x: next_files[x] for x in files} == files
+    for x in os.listdir(incremental_state):
+        with open(os.path.join(incremental_state, x, ppf.BUILDUP_STATE_FILE)) as f:
+            state = json.load(f)
+        assert state['last_date'] == '2024-08-25T00:00:00'
+        assert len(state['date_hashes']) == ppf.BUILDUP_RESTATEMENT_DAYS
+
+
+PATH_OUTPUT_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '03_post_postprocessing',
+                                'output_json')
+
+# Columns whose json.dumps texts are not those of their numpy values: values equal across types, missing values of
+# the nullable dtypes, non finite floats and non string column names
+WRITE_DICT_COLUMNS = {
+    'Type': pd.Series(['TV', 'Online video', 'TV', 'Streaming services'], dtype=object),
+    'int and bool': pd.Series([1, True, 1, False], dtype=object),
+    'float and int': pd.Series([1.0, 1, 1.0, 1], dtype=object),
+    'zeros': pd.Series([0, False, 0.0, -0.0], dtype=object),
+    'objects with missing': pd.Series(['a', None, np.nan, pd.NA], dtype=object),
+    'Int64': pd.array([1, None, -3, 4], dtype='Int64'),
+    'boolean': pd.array([True, None, False, True], dtype='boolean'),
+    'Float64': pd.array([1.5, None, -0.0, 2.25], dtype='Float64'),
+    'string': pd.array(['x', None, 'z', 'x'], dtype='string'),
+    'float': [0.1, np.nan, np.inf, -np.inf],
+    'int': [1, 2, 3, 4],
+    'bool': [True, False, True, False],
+    5: [1.5, 2.5, 3.5, 4.5]
+}
+
+
+def _write_dict_reference(df, label_attribute_element, zoom_par, json_format):
+    """
+    Reference implementation: json.dump of the row dicts, with indent=3 ("pretty") or without spaces ("compact").
+    """
+    return_dict = dict()
+    return_dict['data'] = df.to_dict(orient='records')
+    return_dict['label_metadata'] = label_attribute_element
+    zoom_par = [0 if x is None else x for x in zoom_par]
+    if sum(zoom_par) == 0:
+        return_dict['zoom'] = None
+    else:
+        return_dict['zoom'] = {'min': zoom_par[0], 'max': zoom_par[1]}
+    if json_format == 'pretty':
+        return json.dumps(return_dict, indent=3)
+    return json.dumps(return_dict, separators=(',', ':'))
+
+
+def _write_dict_cases():
+    cases = {'dtypes': (pd.DataFrame(WRITE_DICT_COLUMNS), {'Type': {'color': '#000000'}}, (1, 10)),
+             'empty': (pd.DataFrame(WRITE_DICT_COLUMNS).iloc[:0], dict(), (None, None))}
+    for file_name in sorted(x for x in os.listdir(PATH_OUTPUT_JSON) if x.endswith('.json')):
+        with open(os.path.join(PATH_OUTPUT_JSON, file_name)) as f:
+            json_element = json.load(f)
+        if 'data' in json_element:
+            cases[file_name] = (pd.DataFrame(json_element['data']), json_element['label_metadata'], (None, None))
+    return cases
+
+
+WRITE_DICT_CASES = _write_dict_cases()
+
+
+@pytest.mark.parametrize('json_format', ppf.JSON_FORMATS)
+@pytest.mark.parametrize('case', WRITE_DICT_CASES)
+def test_write_dict_records(case, json_format, tmp_path):
+    df, label_metadata, zoom_par = WRITE_DICT_CASES[case]
+    path_output_json = str(tmp_path / 'element.json')
+    ppf._write_dict(df, path_output_json, label_metadata, zoom_par, {'json_format': json_format})
+
+    with open(path_output_json) as f:
+        assert f.read() == _write_dict_reference(df, label_metadata, zoom_par, json_format)
+
+
+@pytest.mark.parametrize('json_format', ppf.JSON_FORMATS)
+@pytest.mark.parametrize('case', WRITE_DICT_CASES)
+def test_write_dict_split(case, json_format, tmp_path):
+    df, label_metadata, zoom_par = WRITE_DICT_CASES[case]
+    path_output_json = str(tmp_path / 'element.json')
+    ppf._write_dict(df, path_output_json, label_metadata, zoom_par, {'json_format': json_format}, 'split')
+
+    with open(path_output_json) as f:
+        json_element = json.load(f)
+    json_reference = json.loads(_write_dict_reference(df, label_metadata, zoom_par, json_format))
+
+    assert (json_element['schema'], json_element['version']) == ('split', ppf.SPLIT_PAYLOAD_VERSION)
+    assert len(json_element['dtypes']) == len(json_element['columns']) == df.shape[1]
+    # The rows of the columns are the records, compared as texts (NaN != NaN)
+    records = [dict(zip(json_element['columns'], x)) for x in zip(*json_element['data'])]
+    assert json.dumps(records) == json.dumps(json_reference['data'])
+    assert json_element['label_metadata'] == json_reference['label_metadata']
+    assert json_element['zoom'] == json_reference['zoom']
+
+
+def _compute_avg_frequency_reference(df):
+    """
+    Reference implementation: average frequency weighted by the reach with a per-group np.average.
+    """
+    df_average_freq = df[['target_name', 'broadcaster', 'ad_type', 'frequency', 'reach']]
+    df_average_freq = df_average_freq.rename(columns={'frequency': 'num_frequency', 'reach': 'num_reach'})
+    wm = lambda x: np.average(x, weights=df_average_freq.loc[x.index, "num_reach"])
+    df_average_freq = df_average_freq.groupby(['target_name', 'broadcaster', 'ad_type'], as_index=False).agg(
+        average_freq=("num_frequency", wm)).round(3)
+    return df_average_freq
+
+
+def _rf_reference(path_tables, rf_cube, scale):
+    """
+    Reference implementation: reach N+ by a sort on the frequency descending and groupby().cumsum(), on the axes of
+    the rf cube (the cells without rows are 0), and the rows of rf_in_target_overall with a positive frequency.
+    """
+    with open(os.path.join(path_tables, 'rf_in_target_overall.json')) as f:
+        df_reach_target = pd.DataFrame(json.load(f)['report_table'])
+    df_reach_target = df_reach_target[df_reach_target['frequency'] > 0]
+    df_reach_target['reach'] = df_reach_target['reach'] * df_reach_target['target_name'].map(scale)
+
+    # Scaffold of the frequencies of every group, as the baseline merge on _scaffolding_rf
+    col_to_sort = ['target_name', 'broadcaster', 'ad_type', 'frequency']
+    df_reach_plus = df_reach_target.groupby(col_to_sort)['reach'].sum().unstack('frequency')
+    df_reach_plus = df_reach_plus.reindex(columns=rf_cube['axes']['frequency'], fill_value=0).fillna(0).rename_axis(
+        columns='frequency')
+    df_reach_plus = df_reach_plus.stack().rename('reach').reset_index()
+    df_reach_plus = df_reach_plus.sort_values(col_to_sort, ascending=[True, True, True, False])
+    df_reach_plus['reach'] = df_reach_plus.groupby(['target_name', 'broadcaster', 'ad_type'])['reach'].cumsum()
+
+    axes = rf_cube['axes']
+    reach_plus = np.zeros(tuple(len(x) for x in axes.values()))
+    positions = [axes[x].get_indexer(df_reach_plus[x]) for x in axes]
+    is_in_cube = np.all(np.stack(positions) >= 0, axis=0)
+    reach_plus[tuple(x[is_in_cube] for x in positions)] = df_reach_plus['reach'].to_numpy()[is_in_cube]
+
+    return reach_plus, df_reach_target
+
+
+@pytest.mark.parametrize('scaled', [False, True])
+def test_rf_kernel(scaled, label_object, tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    campaign_par = _campaign_par(path_tables, label_object)
+    rf_cube = ppf._rf_cube(path_tables, label_object, campaign_par)
+
+    targets = rf_cube['axes']['target_name']
+    scale = pd.Series(np.arange(1, len(targets) + 1) * 1000.0, index=targets) if scaled else pd.Series(1.0, targets)
+    rf = ppf._rf_kernel(rf_cube, scale=scale.to_numpy() if scaled else None)
+    reach_plus, df_reach_target = _rf_reference(path_tables, rf_cube, scale)
+
+    np.testing.assert_allclose(rf['reach_plus'], reach_plus, rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(rf['reach_1plus'], reach_plus[..., 0], rtol=1e-12, atol=1e-9)
+    for threshold in [1, 2, 3, 5, 10, campaign_par['max_freq']]:
+        np.testing.assert_allclose(ppf._rf_effective_reach(rf, threshold), reach_plus[..., threshold - 1],
+                                   rtol=1e-12, atol=1e-9)
+
+    # Average frequency of the reached population, on the cells with reach
+    df_average_freq = _compute_avg_frequency_reference(df_reach_target[df_reach_target['reach'] > 0])
+    positions = tuple(rf_cube['axes'][x].get_indexer(df_average_freq[x])
+                      for x in ['target_name', 'broadcaster', 'ad_type'])
+    np.testing.assert_allclose(rf['average_frequency'][positions].round(3), df_average_freq['average_freq'])
+    assert (rf['average_frequency'][rf['reach_1plus'] == 0] == 0).all()
+
+
+def test_compute_avg_frequency(tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    with open(os.path.join(path_tables, 'rf_in_target_overall.json')) as f:
+        df_reach_target = pd.DataFrame(json.load(f)['report_table'])
+    df_reach_target = df_reach_target[df_reach_target['reach'] > 0]
+
+    pd.testing.assert_frame_equal(ppf._compute_avg_frequency(df_reach_target),
+                                  _compute_avg_frequency_reference(df_reach_target))
+
+
+PATH_ELEMENT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'element_config.json')
+
+# Universe of the tables varying by day: the universe of the first day plus UNIVERSE_STEP a day
+UNIVERSE_STEP = 1000
+
+
+def _run_postprocess(path_tables, path_dir_output, **kwargs):
+    """
+    Run main_postprocess_request on all the elements of element_config.json and return the content of its outputs.
+    """
+    with open(PATH_ELEMENT_CONFIG) as f:
+        element_config = json.load(f)
+    path_label_attribute = path_dir_output + '_label_attribute.json'
+    with open(path_label_attribute, 'w') as f:
+        json.dump({x['python_element']: {'element': x['python_element']} for x in element_config.values()}, f)
+
+    os.makedirs(path_dir_output, exist_ok=True)
+    ppf.main_postprocess_request(path_tables, path_dir_output, PATH_ELEMENT_CONFIG, path_label_attribute,
+                                 PATH_LABEL_OBJECT, **kwargs)
+    outputs = dict()
+    for file_name in sorted(os.listdir(path_dir_output)):
+        with open(os.path.join(path_dir_output, file_name), 'rb') as f:
+            outputs[file_name] = f.read()
+    return outputs
+
+
+def _write_universe(path_tables, universe):
+    """
+    Replace the universe of the tables target_universe and universe_by_sex_age by universe(universe of the first
+    day, position of the day).
+    """
+    for table_name, universe_col in [('target_universe', 'target_universe'), ('universe_by_sex_age', 'universe')]:
+        with open(os.path.join(PATH_TABLES, table_name + '.json')) as f:
+            table = json.load(f)
+        dates = sorted({x['date'] for x in table['report_table']})
+        first_day = {tuple(v for k, v in x.items() if k not in ['date', universe_col]): x[universe_col]
+                     for x in table['report_table'] if x['date'] == dates[0]}
+        for x in table['report_table']:
+            x[universe_col] = universe(first_day[tuple(v for k, v in x.items() if k not in ['date', universe_col])],
+                                       dates.index(x['date']))
+        with open(os.path.join(path_tables, table_name + '.json'), 'w') as f:
+            json.dump(table, f)
+
+
+def _universe_tables(path_tables, label_object):
+    campaign_par = _campaign_par(path_tables, label_object)
+    return {kind: ppf._read_table(path_tables, table_name, campaign_par)
+            for kind, (table_name, _, _) in ppf.UniverseIndex.KINDS.items()}
+
+
+@pytest.mark.parametrize('policy', ppf.UNIVERSE_POLICIES)
+def test_universe_index(policy, label_object, tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    _write_universe(path_tables, lambda x, day: x + UNIVERSE_STEP * day)
+    tables = _universe_tables(path_tables, label_object)
+    universe_index = ppf.UniverseIndex(tables, policy)
+
+    for kind, (_, keys, universe_col) in ppf.UniverseIndex.KINDS.items():
+        df = tables[kind]
+        matrix = df.pivot_table(index=keys, columns='date', values=universe_col, aggfunc='first', observed=True)
+        n_days = matrix.shape[1]
+        expected = {'first_day': matrix.iloc[:, 0], 'last_day': matrix.iloc[:, -1],
+                    'mean': matrix.iloc[:, 0] + UNIVERSE_STEP * (n_days - 1) / 2}
+        expected['daily'] = expected['mean']
+
+        universe = universe_index.universe(kind)
+        assert universe.dtype == df[universe_col].dtype
+        pd.testing.assert_series_equal(universe.sort_index(), expected[policy].sort_index().astype(universe.dtype),
+                                       check_names=False)
+
+        # The dates of the table, a date after its last one and a date before its first one
+        dates = pd.DatetimeIndex([matrix.columns[0] - pd.Timedelta(days=1)] + list(matrix.columns)
+                                 + [matrix.columns[-1] + pd.Timedelta(days=1)])
+        by_date = universe_index.by_date(kind, dates).reindex(matrix.index)
+        if policy == 'daily':
+            expected_by_date = np.column_stack([matrix.iloc[:, 0], matrix, matrix.iloc[:, -1]])
+        else:
+            expected_by_date = np.repeat(expected[policy].to_numpy(dtype=float)[:, None], len(dates), axis=1)
+        np.testing.assert_array_equal(by_date.to_numpy(), expected_by_date)
+
+        key_arrays = [matrix.index.get_level_values(x).repeat(len(dates)) for x in keys]
+        np.testing.assert_array_equal(universe_index.lookup(kind, key_arrays, np.tile(dates, len(matrix))),
+                                      expected_by_date.ravel())
+
+
+@pytest.mark.parametrize('policy', ['first_day', 'last_day', 'mean'])
+def test_universe_policy_outputs(policy, tmp_path):
+    """
+    With a universe varying by day, the outputs of a policy are those of a constant universe equal to the universe
+    of the policy: a single universe by target, the reach & frequency and summary tables no longer having one row
+    by distinct universe of the days.
+    """
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    _write_universe(path_tables, lambda x, day: x + UNIVERSE_STEP * day)
+    outputs = _run_postprocess(path_tables, str(tmp_path / 'output'), universe_policy=policy)
+
+    path_tables_constant = str(tmp_path / 'tables_constant')
+    _write_tables(path_tables_constant)
+    n_days = len(pd.date_range('2024-08-11', '2024-08-25'))
+    day = {'first_day': 0, 'last_day': n_days - 1, 'mean': (n_days - 1) // 2}[policy]
+    _write_universe(path_tables_constant, lambda x, _: x + UNIVERSE_STEP * day)
+
+    assert outputs == _run_postprocess(path_tables_constant, str(tmp_path / 'output_constant'))
+
+
+def test_universe_policy_daily_buildup(label_object, tmp_path):
+    """
+    With the daily policy each date of the build-up tables uses the universe of that date: the TRPs added on a date
+    and the absolute reach of a date are those of a constant universe equal to the universe of the date.
+    """
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    _write_universe(path_tables, lambda x, day: x + UNIVERSE_STEP * day)
+    campaign_par = dict(_campaign_par(path_tables, label_object), universe_policy='daily')
+    builders = ['postprocessing_standard_tabcontactsbu_df_contactcum_target_trp',
+                'postprocessing_standard_tabr1bu_df_reach_target_abs']
+    tables = {x: getattr(ppf, x)(path_tables, label_object, campaign_par).set_index(['Type', 'Target name'])
+              for x in builders}
+
+    dates = tables[builders[0]].columns
+    for day, date in enumerate(dates):
+        path_tables_constant = str(tmp_path / 'tables_{}'.format(day))
+        _write_tables(path_tables_constant)
+        _write_universe(path_tables_constant, lambda x, _: x + UNIVERSE_STEP * day)
+        campaign_par = _campaign_par(path_tables_constant, label_object)
+        tables_constant = {x: getattr(ppf, x)(path_tables_constant, label_object, campaign_par).set_index(
+            ['Type', 'Target name']) for x in builders}
+
+        trp_added = tables[builders[0]].diff(axis=1).fillna(tables[builders[0]])
+        trp_added_constant = tables_constant[builders[0]].diff(axis=1).fillna(tables_constant[builders[0]])
+        np.testing.assert_allclose(trp_added[date], trp_added_constant[date], rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(tables[builders[1]][date], tables_constant[builders[1]][date], rtol=1e-12)
+
+
+def _snapshot_reads(monkeypatch):
+    """
+    Count the json files parsed by _extract_df_from_json_file, the other reads being from the snapshots.
+    """
+    parsed = list()
+    load_json_file = ppf._load_json_file
+
+    def _load_json_file_counted(path_json):
+        parsed.append(path_json)
+        return load_json_file(path_json)
+
+    monkeypatch.setattr(ppf, '_load_json_file', _load_json_file_counted)
+    return parsed
+
+
+def _snapshot_metadata(path_json):
+    with ppf.pa.memory_map(os.path.splitext(path_json)[0] + ppf.TABLE_SNAPSHOT_EXTENSION) as source:
+        return ppf.pa.ipc.open_file(source).schema.metadata
+
+
+@pytest.mark.skipif(ppf.pa is None, reason='the snapshots need pyarrow')
+def test_table_snapshot_invalidation(monkeypatch, tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    path_json = os.path.join(path_tables, 'r1plus_in_target_buildup.json')
+    parsed = _snapshot_reads(monkeypatch)
+    df_table = ppf._extract_df_from_json_file(path_tables, 'r1plus_in_target_buildup')
+    assert len(parsed) == 1
+
+    # Same json file: the snapshot is read
+    pd.testing.assert_frame_equal(ppf._extract_df_from_json_file(path_tables, 'r1plus_in_target_buildup'), df_table)
+    assert len(parsed) == 1
+
+    # Modification time changed, same content (e.g. a copy): the snapshot is read and rewritten with the new time
+    stat_json = os.stat(path_json)
+    os.utime(path_json, ns=(stat_json.st_atime_ns, stat_json.st_mtime_ns + 10 ** 9))
+    pd.testing.assert_frame_equal(ppf._extract_df_from_json_file(path_tables, 'r1plus_in_target_buildup'), df_table)
+    assert len(parsed) == 1
+    assert _snapshot_metadata(path_json)[b'json_mtime_ns'] == str(stat_json.st_mtime_ns + 10 ** 9).encode()
+
+    # Same size and a new modification time, another content: the hash invalidates the snapshot
+    with open(path_json) as f:
+        text = f.read()
+    reach = str(df_table['reach'].iloc[0])
+    restated = reach[:-1] + ('1' if reach[-1] != '1' else '2')
+    with open(path_json, 'w') as f:
+        f.write(text.replace(reach, restated, 1))
+    assert os.path.getsize(path_json) == stat_json.st_size
+    df_restated = ppf._extract_df_from_json_file(path_tables, 'r1plus_in_target_buildup')
+    assert len(parsed) == 2
+    assert df_restated['reach'].iloc[0] == float(restated)
+
+    # Another size: the snapshot is invalidated without hashing the json file, only the new snapshot is hashed
+    with open(path_json, 'w') as f:
+        f.write(text.replace(reach, reach + '1', 1))
+    os.utime(path_json, ns=(stat_json.st_atime_ns, stat_json.st_mtime_ns))
+    file_sha256 = ppf._file_sha256
+    monkeypatch.setattr(ppf, '_file_sha256', lambda path_file: parsed.append('sha256') or file_sha256(path_file))
+    assert ppf._extract_df_from_json_file(path_tables, 'r1plus_in_target_buildup')['reach'].iloc[0] == float(
+        reach + '1')
+    assert parsed[2:] == [path_json, 'sha256']
+
+
+@pytest.mark.skipif(ppf.pa is None, reason='the snapshots need pyarrow')
+def test_table_snapshot_read_only_directory(monkeypatch, tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    df_expected = ppf._extract_df_from_json_file(path_tables, 'impacts_in_target')
+    os.remove(os.path.join(path_tables, 'impacts_in_target' + ppf.TABLE_SNAPSHOT_EXTENSION))
+
+    # A directory which is not writable: no snapshot and no temporary file, the json file is parsed every time
+    def _os_file(path, mode='rb'):
+        if 'w' in mode:
+            raise PermissionError(13, 'Permission denied', path)
+        return os_file(path, mode)
+
+    os_file = ppf.pa.OSFile
+    monkeypatch.setattr(ppf.pa, 'OSFile', _os_file)
+    parsed = _snapshot_reads(monkeypatch)
+    for _ in range(2):
+        pd.testing.assert_frame_equal(ppf._extract_df_from_json_file(path_tables, 'impacts_in_target'), df_expected)
+    assert len(parsed) == 2
+    assert not [x for x in os.listdir(path_tables) if not x.endswith('.json')]
+
+
+@pytest.mark.skipif(ppf.pa is None or os.geteuid() == 0, reason='the snapshots need pyarrow, root writes anywhere')
+def test_table_snapshot_read_only_permissions(tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    os.chmod(path_tables, 0o555)
+    try:
+        df_table = ppf._extract_df_from_json_file(path_tables, 'impacts_in_target')
+        assert not [x for x in os.listdir(path_tables) if not x.endswith('.json')]
+    finally:
+        os.chmod(path_tables, 0o755)
+    assert len(df_table)
+
+
+@pytest.mark.skipif(ppf.pa is None, reason='the snapshots need pyarrow')
+def test_table_snapshot_concurrent_writers(tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    path_json = os.path.join(path_tables, 'impacts_in_target.json')
+    df_table = ppf._extract_df_from_json_file(path_tables, 'impacts_in_target')
+
+    # The workers of a pool missing the same snapshot at the same time
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: ppf._write_table_snapshot(path_json, df_table), range(32)))
+
+    assert sorted(x for x in os.listdir(path_tables) if x.startswith('impacts_in_target')) == [
+        'impacts_in_target' + ppf.TABLE_SNAPSHOT_EXTENSION, 'impacts_in_target.json']
+    pd.testing.assert_frame_equal(ppf._read_table_snapshot(path_json), df_table)
+
+
+@pytest.mark.parametrize('n_workers, pool_type', [(4, 'thread'), (4, 'process'), (2, 'process')])
+def test_postprocess_parallel(n_workers, pool_type, tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    outputs = _run_postprocess(path_tables, str(tmp_path / 'serial'))
+    assert _run_postprocess(path_tables, str(tmp_path / 'parallel'), n_workers=n_workers,
+                            pool_type=pool_type) == outputs
+
+
+def _run_generator_file(path_tables, path_dir_output, **kwargs):
+    """
+    Run main_generator_file on the Excel export and return the sheets of the Excel file.
+    """
+    path_export_file = path_dir_output + '_exportfile_config.json'
+    with open(path_export_file, 'w') as f:
+        json.dump({'Standard.ResultExcel': {'python_function': 'generatefile_standard_resultexcel'}}, f)
+
+    os.makedirs(path_dir_output, exist_ok=True)
+    ppf.main_generator_file(path_tables, path_dir_output, path_export_file, PATH_LABEL_OBJECT, **kwargs)
+    file_names = [x for x in os.listdir(path_dir_output) if x.endswith('.xlsx')]
+    assert len(file_names) == 1
+    return pd.read_excel(os.path.join(path_dir_output, file_names[0]), sheet_name=None, header=None)
+
+
+@pytest.mark.parametrize('n_workers, excel_constant_memory', [(4, False), (1, True), (4, True)])
+def test_generator_file_parallel(n_workers, excel_constant_memory, tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    sheets = _run_generator_file(path_tables, str(tmp_path / 'serial'))
+    sheets_parallel = _run_generator_file(path_tables, str(tmp_path / 'parallel'), n_workers=n_workers,
+                                          excel_constant_memory=excel_constant_memory)
+    assert list(sheets_parallel) == list(sheets)
+    for sheet_name, df_sheet in sheets.items():
+        pd.testing.assert_frame_equal(sheets_parallel[sheet_name], df_sheet)
+
+
+@pytest.mark.parametrize('json_format', ppf.JSON_FORMATS)
+@pytest.mark.parametrize('case', sorted(WRITE_DICT_CASES))
+def test_read_split_payload(case, json_format, tmp_path):
+    df, label_metadata, zoom_par = WRITE_DICT_CASES[case]
+    path_output_json = str(tmp_path / 'element.json')
+    ppf._write_dict(df, path_output_json, label_metadata, zoom_par, {'json_format': json_format}, 'split')
+
+    with open(path_output_json) as f:
+        df_payload = ppf.read_split_payload(json.load(f))
+    # The names of the columns are json strings, the missing values of the strings (pd.NA) None
+    df_expected = df.rename(columns=str)
+    for column in df_expected.columns[[ppf._payload_dtype(x) == 'string' for _, x in df_expected.items()]]:
+        df_expected[column] = pd.Series([None if x is pd.NA else x for x in df_expected[column]], dtype=object)
+    pd.testing.assert_frame_equal(df_payload, df_expected, check_dtype=False, check_index_type=False)
+    for column, column_payload in zip(df.items(), df_payload.items()):
+        assert ppf._payload_dtype(column[1]) == ppf._payload_dtype(column_payload[1])
+
+
+def test_read_split_payload_version(tmp_path):
+    df, label_metadata, zoom_par = WRITE_DICT_CASES['dtypes']
+    path_output_json = str(tmp_path / 'element.json')
+    ppf._write_dict(df, path_output_json, label_metadata, zoom_par, payload='split')
+    with open(path_output_json) as f:
+        json_element = json.load(f)
+
+    with pytest.raises(ValueError, match='version'):
+        ppf.read_split_payload(dict(json_element, version=ppf.SPLIT_PAYLOAD_VERSION + 1))
+    with pytest.raises(ValueError, match='not a split payload'):
+        ppf.read_split_payload({'data': [], 'label_metadata': dict(), 'zoom': None})
+
+
+def test_bundle_elements(tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    outputs = _run_postprocess(path_tables, str(tmp_path / 'elements'))
+    outputs_bundle = _run_postprocess(path_tables, str(tmp_path / 'bundle'), bundle=True)
+    path_bundle = str(tmp_path / 'bundle' / ppf.OUTPUT_BUNDLE_FILE)
+
+    index, _ = ppf.read_bundle_index(path_bundle)
+    assert sorted(x['file_name'] for x in index['elements'].values()) == sorted(outputs)
+    for python_element, entry in index['elements'].items():
+        assert ppf.read_bundle_element(path_bundle, python_element) == json.loads(outputs[entry['file_name']])
+        assert outputs_bundle[entry['file_name']] == outputs[entry['file_name']]
+    with pytest.raises(ValueError, match='Unknown element'):
+        ppf.read_bundle_element(path_bundle, 'standard_unknown_element')
+
+
+def test_bundle_corrupted(tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    outputs = _run_postprocess(path_tables, str(tmp_path / 'bundle'), bundle=True, bundle_only=True)
+    assert list(outputs) == [ppf.OUTPUT_BUNDLE_FILE]
+    data = outputs[ppf.OUTPUT_BUNDLE_FILE]
+    index, data_offset = ppf.read_bundle_index(str(tmp_path / 'bundle' / ppf.OUTPUT_BUNDLE_FILE))
+    python_element, entry = max(index['elements'].items(), key=lambda x: x[1]['offset'])
+
+    path_bundle = str(tmp_path / 'corrupted.bundle')
+    # Another magic, a truncated header, index and last element
+    for data_corrupted, message in [(b'XX' + data[2:], 'not a bundle'), (data[:10], 'truncated'),
+                                    (data[:data_offset - 1], 'truncated'), (data[:-1], 'truncated')]:
+        with open(path_bundle, 'wb') as f:
+            f.write(data_corrupted)
+        with pytest.raises(ValueError, match=message):
+            ppf.read_bundle_element(path_bundle, python_element)
+
+
+@pytest.mark.parametrize('compression', [['gzip'], ['zstd'], ['gzip', 'zstd']])
+def test_compressed_bundle_only(compression, tmp_path):
+    if 'zstd' in compression and ppf.zstandard is None:
+        pytest.skip('the zstd compression needs zstandard')
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    outputs = _run_postprocess(path_tables, str(tmp_path / 'elements'))
+    outputs_compressed = _run_postprocess(path_tables, str(tmp_path / 'compressed'), bundle=True, bundle_only=True,
+                                          compression=compression, compressed_only=True)
+
+    extensions = [ppf.OUTPUT_COMPRESSIONS[x][0] for x in compression]
+    assert sorted(outputs_compressed) == sorted([ppf.OUTPUT_BUNDLE_FILE + x for x in extensions]
+                                                + [ppf.OUTPUT_MANIFEST_FILE])
+    manifest = json.loads(outputs_compressed[ppf.OUTPUT_MANIFEST_FILE])
+    assert list(manifest['files']) == [ppf.OUTPUT_BUNDLE_FILE]
+    for codec, extension in zip(compression, extensions):
+        data_compressed = outputs_compressed[ppf.OUTPUT_BUNDLE_FILE + extension]
+        assert manifest['files'][ppf.OUTPUT_BUNDLE_FILE][codec] == len(data_compressed)
+        if codec == 'gzip':
+            data = gzip.decompress(data_compressed)
+        else:
+            data = ppf.zstandard.ZstdDecompressor().decompress(data_compressed)
+        assert manifest['files'][ppf.OUTPUT_BUNDLE_FILE]['bytes'] == len(data)
+
+        path_bundle = str(tmp_path / (codec + '.bundle'))
+        with open(path_bundle, 'wb') as f:
+            f.write(data)
+        index, _ = ppf.read_bundle_index(path_bundle)
+        for python_element, entry in index['elements'].items():
+            assert ppf.read_bundle_element(path_bundle, python_element) == json.loads(outputs[entry['file_name']])
+
+
+# Measures of the tables from the API perturbed by the cache key tests
+CACHE_KEY_MEASURES = {table_name: [x for x, y in table_schema.items() if y in ['float64', 'int64'] and x != 'frequency']
+                      for table_name, table_schema in ppf.REPORT_TABLE_SCHEMA.items()}
+
+
+def _perturb_table(path_tables, table_name):
+    """
+    Scale the measures of the rows of the table by 0.95, 0.85 and 0.75 in turn.
+    """
+    path_json = os.path.join(path_tables, table_name + '.json')
+    with open(path_json) as f:
+        json_table = json.load(f)
+    for i, row in enumerate(json_table['report_table']):
+        for measure in CACHE_KEY_MEASURES[table_name]:
+            value = row[measure] * (0.95 - i % 3 / 10)
+            row[measure] = round(value) if ppf.REPORT_TABLE_SCHEMA[table_name][measure] == 'int64' else value
+    with open(path_json, 'w') as f:
+        json.dump(json_table, f)
+
+
+def _output_cache_keys(path_tables, path_cache_dir):
+    with open(PATH_ELEMENT_CONFIG) as f:
+        element_config = json.load(f)
+    output_cache = ppf._open_output_cache(path_cache_dir, ppf.OUTPUT_CACHE_MAX_BYTES, path_tables, PATH_LABEL_OBJECT,
+                                          'first_day', 'pretty')
+    return {x['file_name']: ppf._output_cache_key(output_cache, x, {'element': x['python_element']})
+            for x in element_config.values()}
+
+
+@pytest.mark.parametrize('table_name', sorted(ppf.REPORT_TABLE_SCHEMA))
+def test_output_cache_key_tables(table_name, tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    outputs = _run_postprocess(path_tables, str(tmp_path / 'outputs'))
+    keys = _output_cache_keys(path_tables, str(tmp_path / 'cache'))
+
+    path_tables_perturbed = str(tmp_path / 'tables_perturbed')
+    _write_tables(path_tables_perturbed)
+    _perturb_table(path_tables_perturbed, table_name)
+    outputs_perturbed = _run_postprocess(path_tables_perturbed, str(tmp_path / 'outputs_perturbed'))
+    keys_perturbed = _output_cache_keys(path_tables_perturbed, str(tmp_path / 'cache'))
+
+    # Every output changed by the table has the table in its key
+    changed = [x for x in outputs if outputs_perturbed[x] != outputs[x]]
+    assert changed or table_name == 'tv_spot_schedule'
+    assert [x for x in changed if keys_perturbed[x] == keys[x]] == list()
+
+
+def test_output_cache_hit(tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    outputs = _run_postprocess(path_tables, str(tmp_path / 'outputs'))
+    path_cache_dir = str(tmp_path / 'cache')
+
+    # The first run stores every output, the second copies them from the cache
+    for run in ['miss', 'hit']:
+        assert _run_postprocess(path_tables, str(tmp_path / run), output_cache=path_cache_dir) == outputs
+    with open(os.path.join(path_cache_dir, ppf.OUTPUT_CACHE_STATS_FILE)) as f:
+        stats = json.load(f)
+    assert (stats['hits'], stats['misses']) == (len(outputs), len(outputs))
+
+
+@pytest.mark.parametrize('n_workers', [1, 4])
+def test_profile_generator_file(n_workers, tmp_path):
+    path_tables = str(tmp_path / 'tables')
+    _write_tables(path_tables)
+    path_dir_output = str(tmp_path / 'output')
+    os.makedirs(path_dir_output)
+    # A file of another run in the output directory is not attributed to the Excel export
+    with open(os.path.join(path_dir_output, 'other.json'), 'w') as f:
+        f.write('{}')
+    _run_generator_file(path_tables, path_dir_output, n_workers=n_workers, profile=True)
+
+    with open(os.path.join(path_dir_output, 'profiling_main_generator_file.json')) as f:
+        record, = json.load(f)['elements']
+    assert record['output_bytes'] == os.path.getsize(os.path.join(path_dir_output, 'Campaign 1.xlsx'))
+    # The Excel export reads every table but the spot schedule
+    input_rows = 0
+    for table_name in ppf.REPORT_TABLE_SCHEMA:
+        if table_name != 'tv_spot_schedule':
+            with open(os.path.join(path_tables, table_name + '.json')) as f:
+                input_rows += len(json.load(f)['report_table'])
+    assert record['input_rows'] == input_rows
+
+
+# Rows with separators and brackets inside the strings, nested values and the other json types
+REPORT_TABLE_ROWS = [{'id': 'a, b]', 'quote': 'say "]"', 'unicode': 'é€😀',
+                      'nested': {'x': [1, [2, {}]], 'y': []}},
+                     {'int': -12, 'float': 1.5e-3, 'big': 12345678901234567890, 'null': None, 'bool': [True, False]},
+                     {}, {'escaped': '\\\\"[{', 'empty': ''}]
+
+
+def _write_report_table(path_json, rows, pretty):
+    with open(path_json, 'w') as f:
+        if pretty:
+            json.dump({'report_table': rows, 'report_name': 'report_table'}, f, indent=3)
+        else:
+            json.dump({'report_name': 'test', 'report_table': rows}, f, ensure_ascii=False)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 1000, 4096])
+def test_iter_report_table_rows_fallback(chunk_size, monkeypatch, tmp_path):
+    monkeypatch.setattr(ppf, 'ijson', None)
+    for table_name in ['impacts_in_target', 'target_universe']:
+        path_json = os.path.join(PATH_TABLES, table_name + '.json')
+        with open(path_json) as f:
+            rows = json.load(f)['report_table']
+        assert list(ppf._iter_report_table_rows(path_json, chunk_size)) == rows
+
+    for pretty in [False, True]:
+        for rows in [REPORT_TABLE_ROWS, list()]:
+            path_json = str(tmp_path / 'report_table.json')
+            _write_report_table(path_json, rows, pretty)
+            with open(path_json) as f:
+                assert list(ppf._iter_report_table_rows(path_json, chunk_size)) == json.load(f)['report_table']
+
+
+def test_iter_report_table_rows_fallback_errors(monkeypatch, tmp_path):
+    monkeypatch.setattr(ppf, 'ijson', None)
+    path_json = str(tmp_path / 'report_table.json')
+    for text, message in [('{"report_name": "test"}', 'report_table not found'),
+                          ('{"report_table": [{"a": 1}, ', 'Unterminated'), ('{"report_table": [{"a": 1', 'Expecting')]:
+        with open(path_json, 'w') as f:
+            f.write(text)
+        with pytest.raises(ValueError, match=message):
+            list(ppf._iter_report_table_rows(path_json, 4))